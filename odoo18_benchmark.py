@@ -0,0 +1,550 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Benchmark harness of the Odoo 18 converter
+
+Generates a synthetic addons tree, times the conversion end to end (in
+sequential and parallel modes) and each rule on its own, and writes the
+results as JSON. Results of two commits can be compared with a regression
+threshold:
+
+    python odoo18_benchmark.py -o before.json
+    python odoo18_benchmark.py -o after.json --compare before.json --threshold 0.1
+
+The startup of the command line (import time of the module, conversion of
+a single file in a fresh interpreter) is checked against a budget:
+
+    python odoo18_benchmark.py --startup --startup-budget 60
+"""
+
+import os
+import io
+import sys
+import json
+import math
+import time
+import random
+import shutil
+import logging
+import argparse
+import platform
+import tempfile
+import statistics
+import subprocess
+import contextlib
+import multiprocessing
+from colorama import Fore, Style
+
+import odoo18_converter
+from odoo18_converter import Odoo18Converter, RuleRegistry, RULES, __version__
+
+# Version of the layout of the results file
+RESULTS_FORMAT = 1
+
+# Modules that importing the converter must not load (imported on first use)
+DEFERRED_MODULES = ('lxml.etree', 'asyncio', 'multiprocessing', 'concurrent.futures', 'colorama', 'json',
+                    'ast', 'argparse', 'xml.sax.saxutils', 'importlib.metadata')
+
+MANIFEST = """{{
+    'name': '{name}',
+    'version': '17.0.1.0.0',
+    'depends': ['base', 'mail'],
+    'data': [{data}],
+}}
+"""
+
+LEGACY_FIELD = """                            <field name="{field}" attrs="{{'{attribute}': [{domain}]}}"/>
+"""
+
+CONVERTED_FIELD = """                            <field name="{field}" {attribute}="{expression}"/>
+"""
+
+LEGACY_DOMAINS = [
+    ("('state', '!=', 'draft')", "state != 'draft'"),
+    ("('state', '=', 'cancelled')", "state == 'cancelled'"),
+    ("('line_ids', '=', [])", "not line_ids"),
+    ("'|', ('state', '=', 'done'), ('type', '=', 'internal')", "state == 'done' or type == 'internal'"),
+    ("('state', '=', 'approved'), ('user_id', '!=', uid)", "state == 'approved' and user_id != uid"),
+    ("'|', '|', '&amp;', ('state', '=', 'done'), ('type', '=', 'service'), ('type', '=', 'consu'), ('parent.state', 'in', ['draft', 'sent'])",
+     "(state == 'done' and type == 'service') or type == 'consu' or parent.state in ['draft', 'sent']"),
+]
+
+CHATTER = """                <div class="oe_chatter">
+                    <field name="message_follower_ids" widget="mail_followers"/>
+                    <field name="activity_ids" widget="mail_activity"/>
+                    <field name="message_ids" widget="mail_thread"/>
+                </div>
+"""
+
+SETTINGS_RECORD = """    <record id="res_config_settings_view_{index}" model="ir.ui.view">
+        <field name="model">res.config.settings</field>
+        <field name="arch" type="xml">
+            <xpath expr="//form" position="inside">
+                <div class="app_settings_block" data-string="{name}" string="{title}" data-key="{name}">
+                    <h2>{title}</h2>
+                    <div class="row mt16 o_settings_container">
+                        <label for="setting_{index}" string="Setting {index}"/>
+                    </div>
+                    <div class="row mt16 o_settings_container" name="setting_{index}_container">
+                        <field name="setting_{index}"/>
+                    </div>
+                </div>
+            </xpath>
+        </field>
+    </record>
+"""
+
+PYTHON_LEGACY_FIELD = """    {field} = fields.Char(
+        string='{title}',
+        states={{'done': [('readonly', True)], 'cancel': [('readonly', True)]}},
+        copy=False,
+    )
+"""
+
+PYTHON_FIELD = """    {field} = fields.Char(string='{title}', copy=False)
+"""
+
+PYTHON_LEGACY_METHODS = """
+    def name_get(self):
+        return [(record.id, record.name) for record in self]
+
+    @api.model
+    def _name_search(self, name, args=None, operator='ilike', limit=100, name_get_uid=None):
+        args = args or []
+        return super()._name_search(name, args=args, operator=operator, limit=limit, name_get_uid=name_get_uid)
+"""
+
+
+class CorpusGenerator:
+    """Generator of a synthetic addons tree with a controlled mix of legacy constructs
+
+    - modules / files_per_module: shape of the tree
+    - views_per_file: mean number of view records per XML file
+    - size_distribution: distribution of the views per file ('fixed',
+      'uniform' or 'lognormal', the latter giving a few very large files)
+    - attrs_density / states_density: probability for a field (button) of a
+      view to carry an attrs (states) attribute
+    - chatter_ratio: share of form views with a legacy chatter block
+    - settings_ratio: share of XML files holding settings blocks
+    - python_ratio: number of Python model files per XML file
+    - converted_ratio: share of files already in the Odoo 17+ syntax
+    """
+    def __init__(self, modules=10, files_per_module=20, views_per_file=5, size_distribution='lognormal',
+                 attrs_density=0.3, states_density=0.2, chatter_ratio=0.3, settings_ratio=0.05,
+                 python_ratio=0.3, converted_ratio=0.5, seed=0):
+        self.modules = modules
+        self.files_per_module = files_per_module
+        self.views_per_file = views_per_file
+        self.size_distribution = size_distribution
+        self.attrs_density = attrs_density
+        self.states_density = states_density
+        self.chatter_ratio = chatter_ratio
+        self.settings_ratio = settings_ratio
+        self.python_ratio = python_ratio
+        self.converted_ratio = converted_ratio
+        self.seed = seed
+
+    def parameters(self):
+        """Generation parameters, recorded in the results"""
+        return dict(vars(self))
+
+    def _views_count(self, rng):
+        if self.size_distribution == 'fixed':
+            return self.views_per_file
+        if self.size_distribution == 'uniform':
+            return rng.randint(1, 2 * self.views_per_file - 1)
+        # Lognormal with the requested mean: mostly small files, a long tail of large ones
+        sigma = 1.0
+        mu = max(0.0, math.log(self.views_per_file) - sigma * sigma / 2)
+        return max(1, int(round(rng.lognormvariate(mu, sigma))))
+
+    def generate(self, root):
+        """Write the tree under root and return (files, bytes) written"""
+        rng = random.Random(self.seed)
+        files = 0
+        size = 0
+        for module_index in range(self.modules):
+            name = f"bench_module_{module_index:03d}"
+            module_dir = os.path.join(root, name)
+            os.makedirs(os.path.join(module_dir, 'views'), exist_ok=True)
+            os.makedirs(os.path.join(module_dir, 'models'), exist_ok=True)
+            data = []
+            for file_index in range(self.files_per_module):
+                legacy = rng.random() >= self.converted_ratio
+                if rng.random() < self.settings_ratio:
+                    content = self._settings_file(rng, file_index, legacy)
+                else:
+                    content = self._views_file(rng, file_index, legacy)
+                path = f"views/view_{file_index:03d}.xml"
+                data.append(f"'{path}'")
+                size += self._write(os.path.join(module_dir, path), content)
+                files += 1
+            for model_index in range(int(round(self.files_per_module * self.python_ratio))):
+                legacy = rng.random() >= self.converted_ratio
+                size += self._write(os.path.join(module_dir, 'models', f"model_{model_index:03d}.py"),
+                                    self._python_file(rng, model_index, legacy))
+                files += 1
+            size += self._write(os.path.join(module_dir, '__manifest__.py'),
+                                MANIFEST.format(name=name, data=', '.join(data)))
+            files += 1
+        return files, size
+
+    @staticmethod
+    def _write(path, content):
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(content)
+        return len(content.encode('utf-8'))
+
+    def _views_file(self, rng, file_index, legacy):
+        parts = ['<?xml version="1.0" encoding="utf-8"?>\n<odoo>\n']
+        for view_index in range(self._views_count(rng)):
+            view_id = f"view_{file_index}_{view_index}"
+            tag = 'tree' if legacy else 'list'
+            parts.append(f'    <record id="{view_id}_list" model="ir.ui.view">\n'
+                         f'        <field name="model">bench.model</field>\n'
+                         f'        <field name="arch" type="xml">\n'
+                         f'            <{tag} string="Records">\n'
+                         f'                <field name="name"/>\n'
+                         f'                <field name="state"/>\n'
+                         f'            </{tag}>\n'
+                         f'        </field>\n'
+                         f'    </record>\n')
+            parts.append(f'    <record id="{view_id}_form" model="ir.ui.view">\n'
+                         f'        <field name="model">bench.model</field>\n'
+                         f'        <field name="arch" type="xml">\n'
+                         f'            <form string="Record">\n'
+                         f'                <header>\n')
+            for button in range(3):
+                if legacy and rng.random() < self.states_density:
+                    parts.append(f'                    <button name="action_{button}" type="object" string="Action" states="draft"/>\n')
+                else:
+                    parts.append(f'                    <button name="action_{button}" type="object" string="Action" invisible="state != \'draft\'"/>\n')
+            parts.append('                </header>\n'
+                         '                <sheet>\n'
+                         '                    <group>\n')
+            for field in range(8):
+                domain, expression = rng.choice(LEGACY_DOMAINS)
+                attribute = rng.choice(('invisible', 'readonly', 'required'))
+                if legacy and rng.random() < self.attrs_density:
+                    parts.append(LEGACY_FIELD.format(field=f"field_{field}", attribute=attribute, domain=domain))
+                else:
+                    parts.append(CONVERTED_FIELD.format(field=f"field_{field}", attribute=attribute,
+                                                        expression=expression.replace('"', '&quot;')))
+            parts.append('                    </group>\n'
+                         '                </sheet>\n')
+            if legacy and rng.random() < self.chatter_ratio:
+                parts.append(CHATTER)
+            else:
+                parts.append('                <chatter/>\n')
+            parts.append('            </form>\n'
+                         '        </field>\n'
+                         '    </record>\n')
+        parts.append('</odoo>\n')
+        return ''.join(parts)
+
+    def _settings_file(self, rng, file_index, legacy):
+        parts = ['<?xml version="1.0" encoding="utf-8"?>\n<odoo>\n']
+        for index in range(max(1, self._views_count(rng) // 2)):
+            name = f"bench_settings_{file_index}_{index}"
+            if legacy:
+                parts.append(SETTINGS_RECORD.format(index=index, name=name, title=f"Settings {index}"))
+            else:
+                parts.append(f'    <record id="res_config_settings_view_{index}" model="ir.ui.view">\n'
+                             f'        <field name="model">res.config.settings</field>\n'
+                             f'        <field name="arch" type="xml">\n'
+                             f'            <app string="Settings {index}" name="{name}"/>\n'
+                             f'        </field>\n'
+                             f'    </record>\n')
+        parts.append('</odoo>\n')
+        return ''.join(parts)
+
+    def _python_file(self, rng, model_index, legacy):
+        parts = ['from odoo import api, fields, models\n\n\n'
+                 f'class BenchModel{model_index}(models.Model):\n'
+                 f"    _name = 'bench.model.{model_index}'\n\n"]
+        for field in range(max(1, self._views_count(rng) * 2)):
+            template = PYTHON_LEGACY_FIELD if legacy and rng.random() < self.states_density * 2 else PYTHON_FIELD
+            parts.append(template.format(field=f"field_{field}", title=f"Field {field}"))
+        if legacy:
+            parts.append(PYTHON_LEGACY_METHODS)
+        return ''.join(parts)
+
+
+@contextlib.contextmanager
+def quiet():
+    """Silence the converter output (banners, reports, progress, log messages)"""
+    logger = logging.getLogger('odoo18_converter')
+    level = logger.level
+    logger.setLevel(logging.ERROR)
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            yield
+    finally:
+        logger.setLevel(level)
+
+
+def time_end_to_end(source_dir, workers, repeat):
+    """Wall times of complete conversions of the tree into a scratch output directory"""
+    runs = []
+    stats = None
+    for _ in range(repeat):
+        output_dir = tempfile.mkdtemp(prefix='odoo18-bench-out-')
+        try:
+            converter = Odoo18Converter(source_dir, output_dir=output_dir, workers=workers,
+                                        convert_python=True, advanced_conditions=True)
+            start = time.perf_counter()
+            with quiet():
+                converter.convert_all()
+            runs.append(time.perf_counter() - start)
+            stats = converter.stats
+        finally:
+            shutil.rmtree(output_dir, ignore_errors=True)
+    return {
+        'workers': workers,
+        'seconds': min(runs),
+        'median_seconds': statistics.median(runs),
+        'runs': runs,
+        'files_changed': stats['files_changed'],
+        'files_per_second': stats['files_processed'] / min(runs) if min(runs) else 0.0
+    }
+
+
+def time_startup(repeat):
+    """Import time of the converter and time of a one-file conversion, each in a fresh interpreter
+
+    The interpreter startup (python -c pass) is subtracted from both. Also
+    lists the DEFERRED_MODULES loaded by the import of the module alone.
+    """
+    here = os.path.dirname(os.path.abspath(__file__))
+    corpus_dir = tempfile.mkdtemp(prefix='odoo18-bench-startup-')
+    try:
+        CorpusGenerator(modules=1, files_per_module=1, views_per_file=5, size_distribution='fixed',
+                        python_ratio=0, converted_ratio=0).generate(corpus_dir)
+        list_file = os.path.join(corpus_dir, 'files.txt')
+        with open(list_file, 'w') as f:
+            for directory, _, names in os.walk(corpus_dir):
+                f.writelines(os.path.join(directory, name) + '\n' for name in names if name.endswith('.xml'))
+
+        def run(args, cwd=here):
+            start = time.perf_counter()
+            subprocess.run([sys.executable] + args, cwd=cwd, check=True,
+                           stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            return time.perf_counter() - start
+
+        # A first import writes the bytecode of the module
+        run(['-c', 'import odoo18_converter'])
+        interpreter = min(run(['-c', 'pass']) for _ in range(repeat))
+        imports = [run(['-c', 'import odoo18_converter']) - interpreter for _ in range(repeat)]
+        one_file = []
+        for _ in range(repeat):
+            output_dir = tempfile.mkdtemp(prefix='odoo18-bench-out-')
+            try:
+                one_file.append(run([os.path.join(here, 'odoo18_cli.py'), '--files-from', list_file,
+                                     '-q', '-o', output_dir], cwd=corpus_dir) - interpreter)
+            finally:
+                shutil.rmtree(output_dir, ignore_errors=True)
+        loaded = subprocess.run([sys.executable, '-c', 'import sys, odoo18_converter; print("\\n".join(sys.modules))'],
+                                cwd=here, check=True, stdout=subprocess.PIPE, universal_newlines=True).stdout.split()
+    finally:
+        shutil.rmtree(corpus_dir, ignore_errors=True)
+    return {
+        'interpreter_seconds': interpreter,
+        'import': {'seconds': min(imports), 'median_seconds': statistics.median(imports)},
+        'one_file': {'seconds': min(one_file), 'median_seconds': statistics.median(one_file)},
+        'eager_modules': [name for name in DEFERRED_MODULES if name in loaded]
+    }
+
+
+def print_startup(startup, budget):
+    """Display the startup measurements; returns whether they are within the budget"""
+    print(f"   interpreter : {startup['interpreter_seconds'] * 1000:.1f} ms")
+    print(f"   import      : {startup['import']['seconds'] * 1000:.1f} ms (budget {budget:.0f} ms)")
+    print(f"   one file    : {startup['one_file']['seconds'] * 1000:.1f} ms")
+    ok = True
+    if startup['import']['seconds'] * 1000 > budget:
+        print(f"{Fore.RED}❌ Importing the converter takes more than {budget:.0f} ms{Style.RESET_ALL}")
+        ok = False
+    if startup['eager_modules']:
+        print(f"{Fore.RED}❌ Modules imported at load time instead of on first use: "
+              f"{', '.join(startup['eager_modules'])}{Style.RESET_ALL}")
+        ok = False
+    return ok
+
+
+def load_contents(source_dir):
+    """(kind, content) of every XML and Python file of the tree"""
+    contents = []
+    for directory, _, names in os.walk(source_dir):
+        for name in sorted(names):
+            if name.endswith('.xml') or (name.endswith('.py') and not name.startswith('__')):
+                with open(os.path.join(directory, name), 'r', encoding='utf-8') as f:
+                    contents.append(('python' if name.endswith('.py') else 'xml', f.read()))
+    return contents
+
+
+def time_rules(contents, repeat):
+    """Time each rule on its own over all the file contents, held in memory"""
+    converter = Odoo18Converter('.', backup=False, convert_python=True, advanced_conditions=True)
+    results = {}
+    for rule in RULES.rules.values():
+        # A registry holding this rule only, so that dispatch and engine are per rule
+        registry = RuleRegistry()
+        registry.register(rule)
+        registry.entry_points_loaded = True
+        files = [content for kind, content in contents if kind == rule.kind]
+        size = sum(len(content) for content in files)
+        runs = []
+        changes = 0
+        for _ in range(repeat):
+            counters = RULES.empty_counters()
+            start = time.perf_counter()
+            with quiet():
+                for content in files:
+                    registry.run(converter, rule.kind, content, counters)
+            runs.append(time.perf_counter() - start)
+            changes = sum(counters[key] for key, _, _ in rule.counters)
+        results[rule.id] = {
+            'kind': rule.kind,
+            'seconds': min(runs),
+            'files': len(files),
+            'changes': changes,
+            'megabytes_per_second': size / min(runs) / (1024 * 1024) if min(runs) else 0.0
+        }
+    return results
+
+
+def compare(results, baseline, threshold):
+    """(metric, baseline seconds, seconds, ratio) of every timing, and the regressions above the threshold"""
+    timings = []
+    for mode, result in results['end_to_end'].items():
+        if mode in baseline.get('end_to_end', {}):
+            timings.append((f"end_to_end.{mode}", baseline['end_to_end'][mode]['seconds'], result['seconds']))
+    for rule_id, result in results['rules'].items():
+        if rule_id in baseline.get('rules', {}):
+            timings.append((f"rules.{rule_id}", baseline['rules'][rule_id]['seconds'], result['seconds']))
+    if results.get('startup') and baseline.get('startup'):
+        for measure in ('import', 'one_file'):
+            timings.append((f"startup.{measure}", baseline['startup'][measure]['seconds'],
+                            results['startup'][measure]['seconds']))
+    rows = [(metric, old, new, new / old if old else 1.0) for metric, old, new in timings]
+    regressions = [row for row in rows if row[3] > 1.0 + threshold]
+    return rows, regressions
+
+
+def print_comparison(rows, regressions, threshold):
+    print(f"\n{Fore.CYAN}{'Metric':<36} {'Baseline':>10} {'Current':>10} {'Change':>8}{Style.RESET_ALL}")
+    for metric, old, new, ratio in rows:
+        color = Fore.RED if ratio > 1.0 + threshold else Fore.GREEN if ratio < 1.0 - threshold else Fore.WHITE
+        print(f"{color}{metric:<36} {old:>9.3f}s {new:>9.3f}s {(ratio - 1.0) * 100:>+7.1f}%{Style.RESET_ALL}")
+    if regressions:
+        print(f"\n{Fore.RED}❌ {len(regressions)} timing(s) regressed by more than {threshold * 100:.0f}%{Style.RESET_ALL}")
+    else:
+        print(f"\n{Fore.GREEN}✅ No regression above {threshold * 100:.0f}%{Style.RESET_ALL}")
+
+
+def run_corpus(generator, corpus_dir, args, results):
+    """Generate the corpus and time the conversions end to end and the rules"""
+    print(f"📦 {Fore.CYAN}Generating the corpus in {corpus_dir}...{Style.RESET_ALL}")
+    files, size = generator.generate(corpus_dir)
+    print(f"   {files} files, {size / (1024 * 1024):.1f} MB")
+    results['corpus'] = dict(generator.parameters(), files=files, bytes=size)
+
+    print(f"⏱️ {Fore.CYAN}End to end, sequential...{Style.RESET_ALL}")
+    results['end_to_end']['sequential'] = time_end_to_end(corpus_dir, 1, args.repeat)
+    print(f"⏱️ {Fore.CYAN}End to end, {args.workers} workers...{Style.RESET_ALL}")
+    results['end_to_end']['parallel'] = time_end_to_end(corpus_dir, args.workers, args.repeat)
+    for mode, result in results['end_to_end'].items():
+        print(f"   {mode:<10}: {result['seconds']:.3f} s ({result['files_per_second']:.0f} files/s)")
+
+    if not args.skip_rules:
+        print(f"⏱️ {Fore.CYAN}Rules one by one...{Style.RESET_ALL}")
+        results['rules'] = time_rules(load_contents(corpus_dir), args.repeat)
+        for rule_id, result in results['rules'].items():
+            print(f"   {rule_id:<24}: {result['seconds']:.3f} s ({result['megabytes_per_second']:.1f} MB/s, {result['changes']} changes)")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=f'{Fore.CYAN}Benchmark the Odoo 18 converter on a synthetic addons tree{Style.RESET_ALL}',
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter
+    )
+    # Corpus
+    parser.add_argument('--modules', type=int, default=10, help='Number of modules')
+    parser.add_argument('--files-per-module', type=int, default=20, help='XML files per module')
+    parser.add_argument('--views-per-file', type=int, default=5, help='Mean number of views per XML file')
+    parser.add_argument('--size-distribution', choices=['fixed', 'uniform', 'lognormal'], default='lognormal',
+                      help='Distribution of the number of views per file')
+    parser.add_argument('--attrs-density', type=float, default=0.3, help='Probability of an attrs attribute on a field')
+    parser.add_argument('--states-density', type=float, default=0.2, help='Probability of a states attribute on a button')
+    parser.add_argument('--chatter-ratio', type=float, default=0.3, help='Share of form views with a legacy chatter')
+    parser.add_argument('--settings-ratio', type=float, default=0.05, help='Share of XML files with settings blocks')
+    parser.add_argument('--python-ratio', type=float, default=0.3, help='Python model files per XML file')
+    parser.add_argument('--converted-ratio', type=float, default=0.5, help='Share of files already converted')
+    parser.add_argument('--seed', type=int, default=0, help='Seed of the generator')
+    parser.add_argument('--corpus-dir', help='Generate the corpus in this directory and keep it')
+    # Runs
+    parser.add_argument('-w', '--workers', type=int, default=max(2, multiprocessing.cpu_count()),
+                      help='Workers of the parallel run')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs of each measurement (the best one is kept)')
+    parser.add_argument('--skip-rules', action='store_true', help='Do not time the rules one by one')
+    parser.add_argument('--startup', action='store_true',
+                      help='Only measure the startup of the command line (import time, one-file conversion)')
+    parser.add_argument('--skip-startup', action='store_true', help='Do not measure the startup of the command line')
+    parser.add_argument('--startup-budget', type=float, default=60.0,
+                      help='Import time of the converter module in milliseconds above which the run fails')
+    # Results
+    parser.add_argument('-o', '--output', help='JSON file receiving the results')
+    parser.add_argument('--compare', help='JSON results of a previous run to compare with')
+    parser.add_argument('--threshold', type=float, default=0.10,
+                      help='Relative slowdown reported as a regression (exit status 1)')
+    args = parser.parse_args()
+
+    generator = CorpusGenerator(
+        modules=args.modules, files_per_module=args.files_per_module, views_per_file=args.views_per_file,
+        size_distribution=args.size_distribution, attrs_density=args.attrs_density,
+        states_density=args.states_density, chatter_ratio=args.chatter_ratio,
+        settings_ratio=args.settings_ratio, python_ratio=args.python_ratio,
+        converted_ratio=args.converted_ratio, seed=args.seed
+    )
+    results = {
+        'format': RESULTS_FORMAT,
+        'converter_version': __version__,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': multiprocessing.cpu_count(),
+        'date': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'corpus': {},
+        'end_to_end': {},
+        'rules': {},
+        'startup': {}
+    }
+    within_budget = True
+    if not args.skip_startup:
+        print(f"⏱️ {Fore.CYAN}Startup of the command line...{Style.RESET_ALL}")
+        results['startup'] = time_startup(max(args.repeat, 5))
+        within_budget = print_startup(results['startup'], args.startup_budget)
+
+    corpus_dir = None if args.startup else args.corpus_dir or tempfile.mkdtemp(prefix='odoo18-bench-')
+    try:
+        if corpus_dir:
+            run_corpus(generator, corpus_dir, args, results)
+    finally:
+        if corpus_dir and not args.corpus_dir:
+            shutil.rmtree(corpus_dir, ignore_errors=True)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+        print(f"{Fore.GREEN}✅ Results saved in: {args.output}{Style.RESET_ALL}")
+
+    if args.compare:
+        with open(args.compare, 'r') as f:
+            baseline = json.load(f)
+        rows, regressions = compare(results, baseline, args.threshold)
+        print_comparison(rows, regressions, args.threshold)
+        if regressions:
+            return 1
+    return 0 if within_budget else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
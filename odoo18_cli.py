@@ -0,0 +1,18 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Lean command line entry point of the Odoo 18 converter
+
+Same options as odoo18_converter.py. A script run directly is compiled on
+every start, while an imported module is loaded from its cached bytecode:
+going through this launcher saves that compilation, which dominates the
+startup of pre-commit hooks converting a few files.
+
+    python odoo18_cli.py --files-from - -0 -q < <(git diff --cached --name-only -z)
+"""
+
+import sys
+
+from odoo18_converter import main
+
+if __name__ == "__main__":
+    sys.exit(main())
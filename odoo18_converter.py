@@ -5,28 +5,2696 @@ import os
 import re
 import sys
 import time
-import argparse
 import logging
-import ast
-from lxml import etree
-import shutil
-from pathlib import Path
+import importlib
 from datetime import datetime
-import colorama
-from colorama import Fore, Style, Back
-import concurrent.futures
-import json
-
-# Initialize colorama for terminal colors
-colorama.init()
-
-# Logger configuration
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    datefmt='%Y-%m-%d %H:%M:%S'
-)
+import contextlib
+import gc
+import zlib
+import mmap
+import io
+import bisect
+import codecs
+from collections import OrderedDict, deque
+import threading
+
+
+class _LazyImport:
+    """Module (or module attribute) imported on its first use
+
+    Keeps the startup of the command line short: a single file converted
+    from a pre-commit hook should not pay for lxml, multiprocessing or asyncio
+    when its rules do not need them. On first use the global name is rebound
+    to the imported object, so the proxy costs nothing afterwards.
+    """
+
+    def __init__(self, name, module, attribute=None, submodules=()):
+        self._name = name
+        self._module = module
+        self._attribute = attribute
+        self._submodules = submodules
+
+    def _load(self):
+        for submodule in self._submodules:
+            importlib.import_module(submodule)
+        value = importlib.import_module(self._module)
+        if self._attribute:
+            value = getattr(value, self._attribute)
+        globals()[self._name] = value
+        return value
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def __call__(self, *args, **kwargs):
+        return self._load()(*args, **kwargs)
+
+
+argparse = _LazyImport('argparse', 'argparse')
+ast = _LazyImport('ast', 'ast')
+etree = _LazyImport('etree', 'lxml.etree')
+shutil = _LazyImport('shutil', 'shutil')
+colorama = _LazyImport('colorama', 'colorama')
+Fore = _LazyImport('Fore', 'colorama', 'Fore')
+Style = _LazyImport('Style', 'colorama', 'Style')
+concurrent = _LazyImport('concurrent', 'concurrent', submodules=('concurrent.futures',))
+multiprocessing = _LazyImport('multiprocessing', 'multiprocessing')
+json = _LazyImport('json', 'json')
+hashlib = _LazyImport('hashlib', 'hashlib')
+tempfile = _LazyImport('tempfile', 'tempfile')
+tokenize = _LazyImport('tokenize', 'tokenize')
+ctypes = _LazyImport('ctypes', 'ctypes', submodules=('ctypes.util',))
+select = _LazyImport('select', 'select')
+struct = _LazyImport('struct', 'struct')
+queue = _LazyImport('queue', 'queue')
+cProfile = _LazyImport('cProfile', 'cProfile')
+tracemalloc = _LazyImport('tracemalloc', 'tracemalloc')
+socket = _LazyImport('socket', 'socket')
+socketserver = _LazyImport('socketserver', 'socketserver')
+difflib = _LazyImport('difflib', 'difflib')
+asyncio = _LazyImport('asyncio', 'asyncio')
+subprocess = _LazyImport('subprocess', 'subprocess')
+
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+__version__ = '1.2.0'
+
+# Logger of the converter: the handlers are set up by the command line
+# (_configure_logging), applications embedding the module keep their own
 logger = logging.getLogger('odoo18_converter')
+logger.addHandler(logging.NullHandler())
+
+LOG_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
+
+# Level of the messages reporting a successful operation (shown in green)
+SUCCESS = 25
+logging.addLevelName(SUCCESS, 'SUCCESS')
+
+LOG_LEVELS = {
+    'debug': logging.DEBUG,
+    'info': logging.INFO,
+    'success': SUCCESS,
+    'warning': logging.WARNING,
+    'error': logging.ERROR,
+}
+
+
+class ConsoleHandler(logging.Handler):
+    """Colored console output of the successes, warnings and errors
+
+    Pool workers do not print: their records are sent to the parent process
+    through a queue and printed there by this handler.
+    """
+    COLORS = {
+        SUCCESS: 'GREEN',
+        logging.WARNING: 'YELLOW',
+        logging.ERROR: 'RED',
+    }
+
+    def __init__(self):
+        super().__init__(SUCCESS)
+
+    def emit(self, record):
+        try:
+            color = getattr(Fore, self.COLORS.get(record.levelno, 'RED'))
+            print(f"{color}{record.getMessage()}{Style.RESET_ALL}")
+        except Exception:
+            self.handleError(record)
+
+
+def _configure_logging(console=True, records=True):
+    """Set up the terminal and the log output of the command line
+
+    Importing the module leaves the terminal and the logging configuration
+    alone: this is only done by main(). records enables the timestamped log
+    records on stderr (off in quiet mode), console the colored messages.
+    """
+    colorama.init()
+    if records:
+        logging.basicConfig(level=logging.INFO, format=LOG_FORMAT, datefmt='%Y-%m-%d %H:%M:%S')
+    else:
+        logger.setLevel(logging.INFO)
+    if console:
+        logger.addHandler(ConsoleHandler())
+
+
+def _add_log_file(path):
+    """Write the log messages to a file (--log-file), separate from the JSON report"""
+    file_handler = logging.FileHandler(path, mode='w', encoding='utf-8')
+    file_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+    logger.addHandler(file_handler)
+
+# Threads scanning directories in parallel while building the discovery index
+DEFAULT_SCAN_WORKERS = 8
+
+# Largest number of files sent to a pool worker in one task
+MAX_CHUNK_SIZE = 64
+
+# Reader threads of the conversion pipeline (0 runs the stages one after the other)
+DEFAULT_IO_THREADS = 4
+
+# Files at least this large are reported as large files by the prefilter
+LARGE_FILE_SIZE = 1024 * 1024
+
+# XML files at least this large are converted in windows of complete
+# top-level elements instead of being loaded whole (streaming mode)
+STREAM_THRESHOLD = 64 * 1024 * 1024
+
+# Target size of the windows of the streaming mode, and of its reads
+STREAM_WINDOW_SIZE = 1024 * 1024
+
+# In parallel runs, XML files at least this large are split at top-level
+# elements and their windows converted across the pool
+SPLIT_THRESHOLD = 4 * 1024 * 1024
+
+# Smallest window of a split file sent to a pool worker
+MIN_SPLIT_WINDOW_SIZE = 64 * 1024
+
+# Field classes of odoo.fields, recognized when imported directly
+ODOO_FIELD_TYPES = frozenset((
+    'Boolean', 'Integer', 'Float', 'Monetary', 'Char', 'Text', 'Html', 'Date', 'Datetime',
+    'Binary', 'Image', 'Selection', 'Reference', 'Many2one', 'Many2oneReference',
+    'One2many', 'Many2many', 'Json', 'Properties', 'PropertiesDefinition', 'Id',
+))
+
+# Compiled attrs domains kept in memory by the domain compiler
+DEFAULT_DOMAIN_CACHE_SIZE = 4096
+
+# Namespace of the refs pointing to the converted commits of --refs
+REFS_PREFIX = 'refs/odoo18/'
+
+# Blobs read from git (and held in memory) at a time by --refs
+BLOB_BATCH_SIZE = 1024
+
+# Patterns shared by the fused engine and the legacy transformation chain
+ATTRS_PATTERN = r'attrs="([^"]*)"'
+STATES_PATTERN = r'states="([^"]*)"'
+DATERANGE_START_PATTERN = r'<field name="([^"]*)" widget="daterange" options="{\'related_end_date\': \'([^\']*)\'}"/>'
+DATERANGE_END_PATTERN = r'<field name="([^"]*)" widget="daterange" options="{\'related_start_date\': \'([^\']*)\'}"/>'
+CHATTER_PATTERNS = [
+    # Standard pattern
+    r'<div class="oe_chatter">\s*<field name="message_follower_ids" widget="mail_followers"/>\s*<field name="activity_ids" widget="mail_activity"/>\s*<field name="message_ids" widget="mail_thread"/>\s*</div>',
+    # Alternative pattern with spaces and order difference
+    r'<div class="oe_chatter">\s*<field name="message_follower_ids"[^>]*widget="mail_followers"[^>]*>\s*</field>\s*<field name="activity_ids"[^>]*widget="mail_activity"[^>]*>\s*</field>\s*<field name="message_ids"[^>]*widget="mail_thread"[^>]*>\s*</field>\s*</div>',
+    # Alternative pattern with order difference of fields
+    r'<div class="oe_chatter">\s*(<field[^>]*widget="mail_followers"[^>]*/>|<field[^>]*widget="mail_followers"[^>]*>\s*</field>)\s*(<field[^>]*widget="mail_thread"[^>]*/>|<field[^>]*widget="mail_thread"[^>]*>\s*</field>)\s*(<field[^>]*widget="mail_activity"[^>]*/>|<field[^>]*widget="mail_activity"[^>]*>\s*</field>)\s*</div>',
+    # Alternative pattern with only message_ids and followers
+    r'<div class="oe_chatter">\s*(<field[^>]*widget="mail_followers"[^>]*/>|<field[^>]*widget="mail_followers"[^>]*>\s*</field>)\s*(<field[^>]*widget="mail_thread"[^>]*/>|<field[^>]*widget="mail_thread"[^>]*>\s*</field>)\s*</div>',
+]
+
+
+class ConversionRule:
+    """A conversion rule declared in the rule registry
+
+    - rule_id: unique identifier, also the key of the rule's main counter
+    - label: text displayed for the main counter in the report
+    - triggers: literals of which at least one must occur in the content for
+      the rule to be dispatched (no triggers: the rule always runs)
+    - kind: type of file the rule applies to ('xml' or 'python')
+    - cost: cost class of the rule ('text' for a scan of the content, 'dom'
+      when the rule may need a parsed XML tree, 'ast' when it needs the
+      Python syntax tree)
+    - patterns: list of (anchor, pattern, handler) applied by the fused engine;
+      anchor is the literal every match of pattern starts with, and handler is
+      called as handler(converter, match, counters) to build the replacement
+    - apply: function run after the fused text pass; for a 'text' rule it is
+      called as apply(converter, content, counters) and returns the new
+      content, for a 'dom' rule as apply(converter, doc, counters) with the
+      DocumentContext shared by the DOM rules of the file, and for an 'ast'
+      rule as apply(converter, module, counters) with the PythonModuleContext
+      shared by the AST rules of the file; 'ast' rules are only run when one
+      of their triggers occurs as a name token of the source
+    - after / before: ids of rules this rule must run after / before
+    - counters: additional (key, label, option) counters updated by the rule;
+      option names a converter option required to display the counter
+    - option: converter option required to display the main counter
+    - version: to be changed when the output of the rule changes, so that
+      cached conversion results are not reused
+    """
+    def __init__(self, rule_id, label, triggers=(), kind='xml', cost='text',
+                 patterns=None, apply=None, after=(), before=(), counters=(),
+                 option=None, version='1'):
+        if cost not in ('text', 'dom', 'ast'):
+            raise ValueError(f"Unknown cost class for rule {rule_id}: {cost}")
+        if not patterns and apply is None:
+            raise ValueError(f"Rule {rule_id} has neither patterns nor apply function")
+        self.id = rule_id
+        self.label = label
+        self.triggers = tuple(triggers)
+        self.kind = kind
+        self.cost = cost
+        self.patterns = list(patterns or [])
+        self.apply = apply
+        self.after = tuple(after)
+        self.before = tuple(before)
+        self.counters = [(rule_id, label, option)] + list(counters)
+        self.version = version
+
+    def __repr__(self):
+        return f"<ConversionRule {self.id} ({self.kind}, {self.cost})>"
+
+
+class TriggerPrefilter:
+    """Multi-literal scanner reporting which trigger literals occur in a text
+
+    Uses an Aho-Corasick automaton when the pyahocorasick module is installed,
+    and a single alternation of the literals otherwise.
+    """
+    def __init__(self, literals):
+        self.literals = sorted(set(literals), key=len, reverse=True)
+        self.automaton = None
+        self.regex = None
+        self.shadowed = []
+        if not self.literals:
+            return
+        if ahocorasick is not None:
+            self.automaton = ahocorasick.Automaton()
+            for literal in self.literals:
+                self.automaton.add_word(literal, literal)
+            self.automaton.make_automaton()
+        else:
+            self.regex = re.compile('|'.join(re.escape(literal) for literal in self.literals))
+            # Non-overlapping matches may hide a literal overlapping another one;
+            # those are checked directly when the scan did not report them
+            self.shadowed = [literal for literal in self.literals
+                             if any(other != literal and self._overlap(other, literal) for other in self.literals)]
+
+    @staticmethod
+    def _overlap(first, second):
+        """Whether a match of first can hide a match of second"""
+        if second in first:
+            return True
+        size = min(len(first), len(second))
+        return any(first.endswith(second[:i]) or second.endswith(first[:i]) for i in range(1, size))
+
+    def scan(self, content):
+        """Return the set of trigger literals found in the content"""
+        found = set()
+        if not self.literals:
+            return found
+        total = len(self.literals)
+        if self.automaton is not None:
+            hits = (value for _, value in self.automaton.iter(content))
+        else:
+            hits = (match.group() for match in self.regex.finditer(content))
+        for literal in hits:
+            found.add(literal)
+            # Stop as soon as every literal has been seen
+            if len(found) == total:
+                break
+        for literal in self.shadowed:
+            if literal not in found and literal in content:
+                found.add(literal)
+        return found
+
+
+class RuleRegistry:
+    """Registry of the conversion rules, with trigger-literal dispatch"""
+    ENTRY_POINT_GROUP = 'odoo18_converter.rules'
+
+    def __init__(self):
+        self.rules = {}
+        self.entry_points_loaded = False
+        self._reset_caches()
+
+    def _reset_caches(self):
+        self._ordered = {}
+        self._prefilters = {}
+        self._engines = {}
+
+    def register(self, rule):
+        """Add a rule to the registry"""
+        if rule.id in self.rules:
+            raise ValueError(f"Rule {rule.id} is already registered")
+        known_keys = {key for key, _, _ in self.counters()}
+        for key, _, _ in rule.counters:
+            if key in known_keys:
+                raise ValueError(f"Counter {key} of rule {rule.id} is already used by another rule")
+        self.rules[rule.id] = rule
+        self._reset_caches()
+        return rule
+
+    def load_entry_points(self):
+        """Register third-party rule packs declared in the odoo18_converter.rules entry point group
+
+        An entry point may refer to a ConversionRule, an iterable of rules, or a
+        callable receiving the registry.
+        """
+        if self.entry_points_loaded:
+            return
+        self.entry_points_loaded = True
+        if not self._declares_entry_points():
+            return
+        try:
+            from importlib.metadata import entry_points
+        except ImportError:
+            return
+        try:
+            found = entry_points()
+            if hasattr(found, 'select'):
+                found = found.select(group=self.ENTRY_POINT_GROUP)
+            else:
+                found = found.get(self.ENTRY_POINT_GROUP, [])
+        except Exception as e:
+            logger.warning("Error listing rule entry points: %s", e)
+            return
+        for entry_point in found:
+            try:
+                loaded = entry_point.load()
+                if isinstance(loaded, ConversionRule):
+                    self.register(loaded)
+                elif callable(loaded):
+                    loaded(self)
+                else:
+                    for rule in loaded:
+                        self.register(rule)
+            except Exception as e:
+                logger.warning("Error loading rule pack %s: %s", entry_point.name, e)
+
+    def _declares_entry_points(self):
+        """Whether an installed distribution may declare rule packs
+
+        Reading the entry_points.txt files of the distributions is much
+        cheaper than importing importlib.metadata, which is only done when a
+        rule pack is installed (or when sys.path holds zipped distributions).
+        """
+        marker = f'[{self.ENTRY_POINT_GROUP}]'
+        for directory in sys.path:
+            directory = directory or '.'
+            if os.path.isfile(directory):
+                return True
+            try:
+                names = os.listdir(directory)
+            except OSError:
+                continue
+            for name in names:
+                if name.endswith(('.dist-info', '.egg-info')):
+                    try:
+                        with open(os.path.join(directory, name, 'entry_points.txt'), encoding='utf-8') as f:
+                            if marker in f.read():
+                                return True
+                    except OSError:
+                        pass
+        return False
+
+    def ordered(self, kind):
+        """Rules of a kind, sorted according to their ordering constraints"""
+        if kind in self._ordered:
+            return self._ordered[kind]
+        rules = [rule for rule in self.rules.values() if rule.kind == kind]
+        ids = {rule.id for rule in rules}
+        # Dependencies: rule id -> ids of the rules that must run before it
+        depends = {rule.id: {rule_id for rule_id in rule.after if rule_id in ids} for rule in rules}
+        for rule in rules:
+            for rule_id in rule.before:
+                if rule_id in ids:
+                    depends[rule_id].add(rule.id)
+        # Stable topological sort (registration order among independent rules)
+        result = []
+        done = set()
+        while len(result) < len(rules):
+            ready = [rule for rule in rules if rule.id not in done and depends[rule.id] <= done]
+            if not ready:
+                pending = [rule.id for rule in rules if rule.id not in done]
+                raise ValueError(f"Cyclic ordering constraints between rules: {', '.join(pending)}")
+            result.append(ready[0])
+            done.add(ready[0].id)
+        self._ordered[kind] = result
+        return result
+
+    def fingerprint(self):
+        """Identifier of the registered rule set, used in cache keys"""
+        return ','.join(f"{rule.id}@{rule.version}" for rule in self.rules.values())
+
+    def counters(self):
+        """All (key, label, option) counters of the registered rules"""
+        return [counter for rule in self.rules.values() for counter in rule.counters]
+
+    def empty_counters(self):
+        """New dictionary with every counter set to zero"""
+        return {key: 0 for key, _, _ in self.counters()}
+
+    def triggers(self, kind):
+        """All trigger literals of the rules of a kind"""
+        return {trigger for rule in self.ordered(kind) for trigger in rule.triggers}
+
+    def byte_triggers(self, kind):
+        """Trigger literals of a kind encoded in UTF-8, or None if a rule of the kind always runs"""
+        if any(not rule.triggers for rule in self.ordered(kind)):
+            return None
+        return [trigger.encode('utf-8') for trigger in self.triggers(kind)]
+
+    def dispatch(self, kind, content):
+        """Rules of a kind whose triggers occur in the content, in execution order"""
+        prefilter = self._prefilters.get(kind)
+        if prefilter is None:
+            prefilter = self._prefilters[kind] = TriggerPrefilter(self.triggers(kind))
+        found = prefilter.scan(content)
+        return [rule for rule in self.ordered(kind)
+                if not rule.triggers or found.intersection(rule.triggers)]
+
+    def engine(self, rules):
+        """Fused engine for a set of dispatched rules (cached by rule set)"""
+        key = tuple(rule.id for rule in rules)
+        engine = self._engines.get(key)
+        if engine is None:
+            engine = self._engines[key] = FusedEngine(rules)
+        return engine
+
+    def run(self, converter, kind, content, counters):
+        """Apply the dispatched rules of a kind to the content"""
+        rules = self.dispatch(kind, content)
+        profiler = converter.profiler
+        text_rules = [rule for rule in rules if rule.patterns]
+        if text_rules:
+            if profiler is None:
+                content = self.engine(text_rules).apply(converter, content, counters)
+            else:
+                # One scan per rule, so that the time of each rule is measured apart
+                for rule in text_rules:
+                    frame = profiler.begin()
+                    content = self.engine([rule]).apply(converter, content, counters)
+                    profiler.add_rule(rule.id, frame)
+        # AST rules share one tokenized module, parsed only if one of their
+        # triggers is a name token (not just text in a string or a comment)
+        module = None
+        ast_rules = [rule for rule in rules if rule.cost == 'ast']
+        if ast_rules:
+            module = PythonModuleContext(content)
+            names = module.names
+            ast_rules = [rule for rule in ast_rules if not rule.triggers or names.intersection(rule.triggers)]
+            if ast_rules and module.tree is not None:
+                for rule in ast_rules:
+                    self._apply(profiler, rule, converter, module, counters)
+                content = module.serialize()
+        
+        # DOM rules share one lazily parsed document, serialized once at the end
+        # (the parsing is measured with the first DOM rule of the file)
+        doc = None
+        for rule in rules:
+            if rule.apply is None or rule.cost == 'ast':
+                continue
+            if rule.cost == 'dom':
+                if doc is None:
+                    doc = DocumentContext(content)
+                self._apply(profiler, rule, converter, doc, counters)
+            else:
+                if doc is not None:
+                    content = doc.serialize()
+                    doc = None
+                content = self._apply(profiler, rule, converter, content, counters)
+        if doc is not None:
+            content = doc.serialize()
+        return content
+
+    @staticmethod
+    def _apply(profiler, rule, converter, target, counters):
+        """Call the apply function of a rule, measured when profiling"""
+        if profiler is None:
+            return rule.apply(converter, target, counters)
+        frame = profiler.begin()
+        try:
+            return rule.apply(converter, target, counters)
+        finally:
+            profiler.add_rule(rule.id, frame)
+
+
+class FusedEngine:
+    """Apply a set of text rules in a single scan of the content
+
+    The anchor literals of every rule pattern are compiled into one combined
+    scanner. The content is walked once; at each anchor hit only the patterns
+    sharing that anchor are tried, and the output is built with a single join.
+    The rule patterns must not overlap each other for the result to match the
+    sequential application of the same rules.
+    """
+    def __init__(self, rules):
+        self.rules = rules
+        self.dispatch = {}
+        for rule in rules:
+            for anchor, pattern, handler in rule.patterns:
+                self.dispatch.setdefault(anchor, []).append((re.compile(pattern), handler))
+        # Longest literals first so that an anchor is never shadowed by its own prefix
+        anchors = sorted(self.dispatch, key=len, reverse=True)
+        self.scanner = re.compile('|'.join(re.escape(anchor) for anchor in anchors))
+
+    def apply(self, converter, content, counters):
+        """Return the transformed content, updating counters in place"""
+        pieces = []
+        last = 0
+        pos = 0
+        search = self.scanner.search
+        while True:
+            found = search(content, pos)
+            if found is None:
+                break
+            start = found.start()
+            pos = found.end()
+            for regex, handler in self.dispatch[found.group()]:
+                match = regex.match(content, start)
+                if match:
+                    pieces.append(content[last:start])
+                    pieces.append(handler(converter, match, counters))
+                    last = pos = match.end()
+                    break
+        if not pieces:
+            return content
+        pieces.append(content[last:])
+        return ''.join(pieces)
+
+
+class DocumentContext:
+    """Per-file XML document shared by the DOM-based rules
+
+    The content is parsed lazily, at most once, and only when a rule asks for
+    the tree. Rules modify the cached tree in place and call mark_modified();
+    the document is serialized once, after the last DOM rule.
+    """
+    XML_DECLARATION = re.compile(r'^\s*<\?xml[^>]*\?>')
+
+    def __init__(self, content):
+        self.content = content
+        self.modified = False
+        self._root = None
+        self._parsed = False
+
+    @property
+    def root(self):
+        """Parsed tree wrapped in an <odoo_root> element, or None if the content cannot be parsed"""
+        if not self._parsed:
+            self._parsed = True
+            # The XML declaration is kept aside: lxml refuses it in a unicode
+            # string, and it could not appear inside the wrapper element
+            declaration = self.XML_DECLARATION.match(self.content)
+            self.prolog = declaration.group() if declaration else ''
+            body = self.content[len(self.prolog):]
+            try:
+                parser = etree.XMLParser(recover=True)
+                self._root = etree.fromstring("<odoo_root>" + body + "</odoo_root>", parser)
+            except Exception as e:
+                logger.debug("File is not a well-formed XML, processing as text: %s", e)
+                self._root = None
+        return self._root
+
+    def mark_modified(self):
+        """Record that a rule changed the tree"""
+        self.modified = True
+
+    def serialize(self):
+        """Current content of the document"""
+        if not self.modified or self._root is None:
+            return self.content
+        text = etree.tostring(self._root, pretty_print=True, encoding='unicode')
+        # Remove the wrapper element added for parsing
+        if text.startswith('<odoo_root>'):
+            text = text[len('<odoo_root>'):]
+        text = text.rstrip('\n')
+        if text.endswith('</odoo_root>'):
+            text = text[:-len('</odoo_root>')]
+        return self.prolog + text
+
+
+class XmlRecordSplitter:
+    """Incremental splitter of an XML document at top-level element boundaries
+
+    The opening and closing tags of the containers (<odoo>, <data>, ...) are
+    returned apart, unconverted; the elements they hold (<record>,
+    <template>, <menuitem>, ...) are grouped, complete, into windows of
+    about window_size characters, each of which can be converted on its own.
+    An element larger than window_size makes a window by itself, so the
+    memory held is bounded by the largest element, not by the document.
+    """
+    CONTAINERS = frozenset(('odoo', 'openerp', 'data', 'templates'))
+    # Comments, CDATA sections, processing instructions and declarations, or
+    # a tag (groups: closing slash, name)
+    MARKUP = re.compile(r'<(?:!--.*?-->|!\[CDATA\[.*?\]\]>|\?.*?\?>|![^>]*>'
+                        r'|(/?)([A-Za-z_][\w:.-]*)(?:[^>"\']|"[^"]*"|\'[^\']*\')*>)', re.S)
+    # Markup starting this close to the end of the data read so far may be
+    # incomplete: it is scanned once more data is fed
+    LOOKAHEAD = 65536
+
+    def __init__(self, window_size=STREAM_WINDOW_SIZE):
+        self.window_size = window_size
+        self.buffer = ''
+        # Start of the pending window and position of the scan in the buffer
+        self.emitted = 0
+        self.scanned = 0
+        # Depth inside the current top-level element
+        self.depth = 0
+
+    def feed(self, text):
+        """Add text, return the (convertible, text) pieces completed by it"""
+        self.buffer += text
+        return self._scan(final=False)
+
+    def close(self):
+        """Return the remaining pieces at the end of the document"""
+        return self._scan(final=True)
+
+    def _scan(self, final):
+        pieces = []
+        buffer = self.buffer
+        limit = len(buffer) if final else len(buffer) - self.LOOKAHEAD
+        pos = self.scanned
+        depth = self.depth
+        for match in self.MARKUP.finditer(buffer, pos):
+            start = match.start()
+            if start >= limit:
+                break
+            pos = match.end()
+            name = match.group(2)
+            if name is None:
+                continue
+            closing = match.group(1)
+            self_closing = buffer[pos - 2] == '/'
+            if depth == 0:
+                if closing or (name in self.CONTAINERS and not self_closing):
+                    if start > self.emitted:
+                        pieces.append((True, buffer[self.emitted:start]))
+                    pieces.append((False, buffer[start:pos]))
+                    self.emitted = pos
+                elif self_closing:
+                    self._boundary(pieces, buffer, pos)
+                else:
+                    depth = 1
+            elif closing:
+                depth -= 1
+                if depth == 0:
+                    self._boundary(pieces, buffer, pos)
+            elif not self_closing:
+                depth += 1
+        self.depth = depth
+        if final:
+            if len(buffer) > self.emitted:
+                pieces.append((True, buffer[self.emitted:]))
+            self.buffer = ''
+            self.emitted = self.scanned = self.depth = 0
+            return pieces
+        # Keep only the pending window
+        self.buffer = buffer[self.emitted:]
+        self.scanned = pos - self.emitted
+        self.emitted = 0
+        return pieces
+
+    def _boundary(self, pieces, buffer, pos):
+        """End of a top-level element: close the window if it is large enough"""
+        if pos - self.emitted >= self.window_size:
+            pieces.append((True, buffer[self.emitted:pos]))
+            self.emitted = pos
+
+
+def xml_unescape(data, entities=None):
+    """Unescape &amp;, &lt;, &gt; and the given entities, like xml.sax.saxutils.unescape
+
+    Kept here: importing xml.sax.saxutils loads urllib and the email package.
+    """
+    data = data.replace('&lt;', '<').replace('&gt;', '>')
+    for entity, char in (entities or {}).items():
+        data = data.replace(entity, char)
+    return data.replace('&amp;', '&')
+
+
+def _atomic_write(path, data):
+    """Write bytes to a file through a temporary file renamed over it"""
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix='.tmp-')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+
+class SourceArgument:
+    """An argument of a call or a parameter of a function definition in a Python source"""
+    __slots__ = ('start', 'end', 'comma', 'name', 'keyword', 'text')
+
+    def __init__(self, start, end, comma, name, keyword, text):
+        # Offsets of the argument in the source, and after its comma (None without comma)
+        self.start = start
+        self.end = end
+        self.comma = comma
+        # Keyword (or parameter) name, None for other positional arguments
+        self.name = name
+        # Whether the argument is written name=value
+        self.keyword = keyword
+        self.text = text
+
+
+class PythonModuleContext:
+    """Per-file Python source shared by the AST-based rules
+
+    The source is tokenized lazily, and parsed only when asked for the tree.
+    The tree is traversed once to index its nodes by type (with the function
+    enclosing each node); rules look up the nodes they handle, map them to
+    source offsets and to token spans, and record text edits. The edits are
+    applied once, after the last rule, so the layout, comments and quotes of
+    the untouched code are preserved.
+    """
+    FUNCTION_TYPES = ('FunctionDef', 'AsyncFunctionDef')
+
+    def __init__(self, content):
+        self.content = content
+        self.lines = io.StringIO(content).readlines()
+        self.line_offsets = [0]
+        for line in self.lines:
+            self.line_offsets.append(self.line_offsets[-1] + len(line))
+        self.edits = []
+        self._tokens = None
+        self._token_starts = None
+        self._names = None
+        self._tree = None
+        self._parsed = False
+        self._index = None
+        self._functions = None
+
+    @property
+    def tokens(self):
+        """Tokens of the source (empty if it cannot be tokenized)"""
+        if self._tokens is None:
+            try:
+                self._tokens = list(tokenize.generate_tokens(io.StringIO(self.content).readline))
+            except (tokenize.TokenError, SyntaxError) as e:
+                logger.debug("File cannot be tokenized, Python rules skipped: %s", e)
+                self._tokens = []
+            self._token_starts = [self.token_offset(token.start) for token in self._tokens]
+        return self._tokens
+
+    @property
+    def names(self):
+        """Set of the name tokens of the source"""
+        if self._names is None:
+            self._names = {token.string for token in self.tokens if token.type == tokenize.NAME}
+        return self._names
+
+    @property
+    def tree(self):
+        """Syntax tree of the source, or None if it cannot be parsed"""
+        if not self._parsed:
+            self._parsed = True
+            try:
+                self._tree = ast.parse(self.content)
+            except (SyntaxError, ValueError) as e:
+                logger.debug("File cannot be parsed, Python rules skipped: %s", e)
+        return self._tree
+
+    def _build_index(self):
+        """Index the nodes of the tree by type in a single traversal"""
+        self._index = {}
+        self._functions = {}
+        stack = [(self.tree, None)]
+        while stack:
+            node, function = stack.pop()
+            self._index.setdefault(type(node).__name__, []).append(node)
+            self._functions[node] = function
+            inner = node if type(node).__name__ in self.FUNCTION_TYPES else function
+            for child in ast.iter_child_nodes(node):
+                stack.append((child, inner))
+        for nodes in self._index.values():
+            nodes.sort(key=lambda node: (getattr(node, 'lineno', 0), getattr(node, 'col_offset', 0)))
+
+    def nodes(self, node_type):
+        """Nodes of a type (class name), in source order"""
+        if self._index is None:
+            self._build_index()
+        return self._index.get(node_type, [])
+
+    def function_of(self, node):
+        """Function definition enclosing a node (the function itself for its parameters)"""
+        if self._index is None:
+            self._build_index()
+        return self._functions.get(node)
+
+    def is_method(self, function):
+        """Whether a function is defined directly in a class body"""
+        return any(function in parent.body for parent in self.nodes('ClassDef'))
+
+    def offset(self, lineno, col_offset):
+        """Offset in the source of an AST position (col_offset counts UTF-8 bytes)"""
+        line = self.lines[lineno - 1] if lineno <= len(self.lines) else ''
+        column = len(line.encode('utf-8')[:col_offset].decode('utf-8', 'ignore'))
+        return self.line_offsets[lineno - 1] + column
+
+    def token_offset(self, position):
+        """Offset in the source of a token (row, column) position"""
+        row, column = position
+        return self.line_offsets[row - 1] + column if row <= len(self.lines) else len(self.content)
+
+    def node_span(self, node):
+        """(start, end) offsets of a node, or None when end positions are unknown (Python < 3.8)"""
+        if getattr(node, 'end_lineno', None) is None:
+            return None
+        return self.offset(node.lineno, node.col_offset), self.offset(node.end_lineno, node.end_col_offset)
+
+    def _token_index(self, offset):
+        """Index of the first token starting at or after an offset"""
+        self.tokens
+        return bisect.bisect_left(self._token_starts, offset)
+
+    def _open_paren(self, index, name):
+        """Index of the '(' following the name token (at bracket depth 0) from a token index"""
+        tokens = self.tokens
+        depth = 0
+        while index < len(tokens) - 1:
+            token = tokens[index]
+            if token.type == tokenize.OP and token.string in '([{':
+                depth += 1
+            elif token.type == tokenize.OP and token.string in ')]}':
+                depth -= 1
+            elif depth == 0 and token.type == tokenize.NAME and token.string == name:
+                following = tokens[index + 1]
+                if following.type == tokenize.OP and following.string == '(':
+                    return index + 1
+            elif depth == 0 and token.type == tokenize.NEWLINE:
+                break
+            index += 1
+        return None
+
+    def _arguments(self, open_index):
+        """(open, close, [SourceArgument]) of the bracketed list opening at a token index"""
+        tokens = self.tokens
+        arguments = []
+        segment = []
+        depth = 0
+        index = open_index
+        while index < len(tokens):
+            token = tokens[index]
+            if token.type == tokenize.OP and token.string in '([{':
+                depth += 1
+                if depth == 1:
+                    index += 1
+                    continue
+            elif token.type == tokenize.OP and token.string in ')]}':
+                depth -= 1
+                if depth == 0:
+                    if segment:
+                        arguments.append(self._argument(segment, None))
+                    return self._token_starts[open_index], self._token_starts[index], arguments
+            if depth == 1 and token.type == tokenize.OP and token.string == ',':
+                if segment:
+                    arguments.append(self._argument(segment, self.token_offset(token.end)))
+                segment = []
+            elif token.type not in (tokenize.NL, tokenize.NEWLINE, tokenize.COMMENT):
+                segment.append(token)
+            index += 1
+        return None
+
+    def _argument(self, segment, comma):
+        start = self.token_offset(segment[0].start)
+        end = self.token_offset(segment[-1].end)
+        keyword = len(segment) > 2 and segment[0].type == tokenize.NAME and segment[1].string == '='
+        name = None
+        if keyword or (len(segment) == 1 and segment[0].type == tokenize.NAME):
+            name = segment[0].string
+        return SourceArgument(start, end, comma, name, keyword, self.content[start:end])
+
+    def call_arguments(self, call):
+        """(open, close, [SourceArgument]) of a call whose function is a name or an attribute"""
+        if isinstance(call.func, ast.Attribute):
+            name = call.func.attr
+        elif isinstance(call.func, ast.Name):
+            name = call.func.id
+        else:
+            return None
+        index = self._open_paren(self._token_index(self.offset(call.lineno, call.col_offset)), name)
+        return self._arguments(index) if index is not None else None
+
+    def def_parameters(self, function):
+        """(open, close, [SourceArgument]) of the parameters of a function definition"""
+        index = self._token_index(self.offset(function.lineno, function.col_offset))
+        # Decorators come first on Python < 3.8, and may contain parentheses
+        tokens = self.tokens
+        while index < len(tokens) and not (tokens[index].type == tokenize.NAME and tokens[index].string == 'def'):
+            index += 1
+        index = self._open_paren(index, function.name)
+        return self._arguments(index) if index is not None else None
+
+    def def_name_offset(self, function):
+        """Offset of the name of a function in its definition"""
+        parameters = self.def_parameters(function)
+        return parameters[0] - len(function.name) if parameters else None
+
+    def line_start(self, offset):
+        return self.content.rfind('\n', 0, offset) + 1
+
+    def indentation(self, offset):
+        """Indentation of the line holding an offset"""
+        start = self.line_start(offset)
+        line = self.content[start:offset]
+        return line[:len(line) - len(line.lstrip())]
+
+    def replace(self, start, end, text):
+        """Record the replacement of a span of the source; False if it overlaps a recorded edit"""
+        for edit_start, edit_end, _ in self.edits:
+            if start < edit_end and edit_start < end or (start == end and edit_start < start < edit_end):
+                return False
+        self.edits.append((start, end, text))
+        return True
+
+    def remove_argument(self, arguments, position):
+        """Remove an argument, with its line when it stands on its own lines"""
+        _, close, items = arguments
+        argument = items[position]
+        content = self.content
+        end = argument.comma if argument.comma is not None else argument.end
+        line_start = self.line_start(argument.start)
+        line_end = content.find('\n', end)
+        if line_end == -1:
+            line_end = len(content)
+        rest = content[end:line_end].strip()
+        if not content[line_start:argument.start].strip() and (not rest or rest.startswith('#')):
+            return self.replace(line_start, min(line_end + 1, len(content)), '')
+        if argument.comma is not None and position + 1 < len(items):
+            return self.replace(argument.start, items[position + 1].start, '')
+        if position > 0:
+            return self.replace(items[position - 1].end, end, '')
+        return self.replace(argument.start, end, '')
+
+    def serialize(self):
+        """Source with the recorded edits applied"""
+        if not self.edits:
+            return self.content
+        pieces = []
+        last = 0
+        for start, end, text in sorted(self.edits, key=lambda edit: (edit[0], edit[1])):
+            pieces.append(self.content[last:start])
+            pieces.append(text)
+            last = end
+        pieces.append(self.content[last:])
+        return ''.join(pieces)
+
+
+class DomainError(ValueError):
+    """A domain that cannot be converted to an expression"""
+
+
+class DomainLeaf:
+    """Leaf (field, operator, value) of a domain, the value kept as source text"""
+    __slots__ = ('field', 'operator', 'value')
+
+    def __init__(self, field, operator, value):
+        self.field = field
+        self.operator = operator
+        self.value = value
+
+
+class DomainNot:
+    """Negation ('!') of a domain"""
+    __slots__ = ('operand',)
+
+    def __init__(self, operand):
+        self.operand = operand
+
+
+class DomainBool:
+    """Conjunction ('&') or disjunction ('|') of domains"""
+    __slots__ = ('operator', 'operands')
+
+    def __init__(self, operator, operands):
+        self.operator = operator
+        self.operands = operands
+
+
+class DomainCompiler:
+    """Compiler of attrs dictionaries into Odoo 17+ attribute expressions
+
+    The attrs value is tokenized, each domain is parsed from its prefix
+    notation (with the implicit '&' between top-level terms) into an
+    expression tree, and the tree is rendered as a Python expression with
+    the minimal parentheses. Leaf values (strings, lists, uid, context.get(),
+    parent.field, ...) are kept as written.
+
+    Compiled results are memoized in a bounded LRU, keyed by the raw attrs
+    text and by its normalized form (tokens without layout), as the same
+    domains repeat across views.
+    """
+    TOKEN_PATTERN = re.compile(r"""\s*(?:
+        (?P<string>'(?:[^'\\]|\\.)*'|"(?:[^"\\]|\\.)*")
+      | (?P<number>\d+(?:\.\d+)?)
+      | (?P<name>[A-Za-z_]\w*)
+      | (?P<punct>[\[\](){},:])
+      | (?P<op>==|!=|<=|>=|\*\*|//|[-+*/%<>.=!])
+    )""", re.VERBOSE)
+    # Comparison operators of domain leaves and their expression counterparts
+    OPERATORS = {
+        '=': '==', '==': '==', '!=': '!=', '<>': '!=',
+        '<': '<', '>': '>', '<=': '<=', '>=': '>=',
+        'in': 'in', 'not in': 'not in',
+    }
+    FALSY_VALUES = ('False', 'None', '[]', '()')
+    # Binding strength of the rendered operators
+    PRECEDENCE = {'|': 1, '&': 2, '!': 3}
+
+    def __init__(self, max_size=DEFAULT_DOMAIN_CACHE_SIZE):
+        self.max_size = max_size
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def compile(self, text):
+        """Compile an attrs value into ((attribute, expression), ...), complex count
+
+        A domain is complex when it nests operators, uses '!' or combines
+        more than two terms with '|'; such domains are only converted with
+        the advanced conditions option.
+        """
+        result = self._lookup(text)
+        if result is None:
+            try:
+                source = xml_unescape(text, {'&quot;': '"', '&apos;': "'"})
+                tokens = self.tokenize(source)
+                normalized = ''.join(value for _, value, _, _ in tokens)
+                result = self._lookup(normalized)
+                if result is None:
+                    self.misses += 1
+                    result = self._compile_attrs(source, tokens)
+                    self._store(normalized, result)
+            except DomainError as e:
+                # Unconvertible domains are remembered as well
+                result = e
+            self._store(text, result)
+        if isinstance(result, DomainError):
+            raise result
+        return result
+
+    def _lookup(self, key):
+        result = self.entries.get(key)
+        if result is not None:
+            self.entries.move_to_end(key)
+            self.hits += 1
+        return result
+
+    def _store(self, key, result):
+        self.entries[key] = result
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+
+    def tokenize(self, source):
+        """(kind, text, start, end) tokens of an attrs value"""
+        tokens = []
+        position = 0
+        length = len(source.rstrip())
+        while position < length:
+            match = self.TOKEN_PATTERN.match(source, position)
+            if not match:
+                raise DomainError(f"unexpected character {source[position:].strip()[:1]!r}")
+            kind = match.lastgroup
+            tokens.append((kind, match.group(kind), match.start(kind), match.end()))
+            position = match.end()
+        return tokens
+
+    def _compile_attrs(self, source, tokens):
+        """Parse the attrs dictionary and compile each of its domains"""
+        parser = _TokenReader(source, tokens)
+        parser.expect('{')
+        attributes = []
+        complex_count = 0
+        while not parser.accept('}'):
+            kind, key = parser.next()
+            if kind != 'string':
+                raise DomainError(f"attribute name expected, got {key}")
+            parser.expect(':')
+            tree = self._parse_domain(parser)
+            if self._is_complex(tree):
+                complex_count += 1
+            attributes.append((key[1:-1], self.render(tree)))
+            if not parser.accept(','):
+                parser.expect('}')
+                break
+        if not parser.at_end():
+            raise DomainError("unexpected text after the attrs dictionary")
+        if not attributes:
+            raise DomainError("empty attrs")
+        return tuple(attributes), complex_count
+
+    def _parse_domain(self, parser):
+        """Parse a domain list into an expression tree"""
+        parser.expect('[')
+        terms = []
+        while not parser.accept(']'):
+            terms.append(self._parse_term(parser))
+            if not parser.accept(','):
+                parser.expect(']')
+                break
+        if not terms:
+            # An empty domain matches every record
+            return DomainLeaf(None, 'true', None)
+        
+        # Prefix notation, with an implicit '&' between the top-level expressions
+        position = 0
+        
+        def parse_prefix():
+            nonlocal position
+            if position >= len(terms):
+                raise DomainError("missing operand")
+            term = terms[position]
+            position += 1
+            if term == '!':
+                return DomainNot(parse_prefix())
+            if term in ('&', '|'):
+                left = parse_prefix()
+                return DomainBool(term, [left, parse_prefix()])
+            return term
+        
+        expressions = []
+        while position < len(terms):
+            expressions.append(parse_prefix())
+        tree = expressions[0] if len(expressions) == 1 else DomainBool('&', expressions)
+        return self._flatten(tree)
+
+    def _parse_term(self, parser):
+        """Parse an operator ('&', '|', '!') or a (field, operator, value) leaf"""
+        kind, text = parser.peek()
+        if kind == 'string':
+            parser.next()
+            operator = text[1:-1]
+            if operator not in ('&', '|', '!'):
+                raise DomainError(f"unknown domain operator {text}")
+            return operator
+        if text not in ('(', '['):
+            raise DomainError(f"domain leaf expected, got {text}")
+        closing = ')' if text == '(' else ']'
+        parser.next()
+        kind, field = parser.next()
+        parser.expect(',')
+        operator_kind, operator = parser.next()
+        parser.expect(',')
+        value = parser.expression(closing)
+        parser.expect(closing)
+        
+        if kind == 'number' and operator_kind == 'string':
+            # TRUE_LEAF (1, '=', 1) and FALSE_LEAF (0, '=', 1)
+            if field in ('0', '1') and operator == "'='" and value == '1':
+                return DomainLeaf(None, 'true' if field == '1' else 'false', None)
+        if kind != 'string' or operator_kind != 'string':
+            raise DomainError(f"invalid domain leaf ({field}, {operator}, {value})")
+        operator = operator[1:-1].strip().lower()
+        if operator not in self.OPERATORS:
+            raise DomainError(f"operator {operator!r} has no expression equivalent")
+        return DomainLeaf(field[1:-1], operator, value)
+
+    def _flatten(self, tree):
+        """Merge nested conjunctions (and disjunctions) into a single node"""
+        if isinstance(tree, DomainNot):
+            return DomainNot(self._flatten(tree.operand))
+        if isinstance(tree, DomainBool):
+            operands = []
+            for operand in tree.operands:
+                operand = self._flatten(operand)
+                if isinstance(operand, DomainBool) and operand.operator == tree.operator:
+                    operands.extend(operand.operands)
+                else:
+                    operands.append(operand)
+            return DomainBool(tree.operator, operands)
+        return tree
+
+    def _is_complex(self, tree):
+        """Whether a domain goes beyond a leaf, an AND of leaves or an OR of two leaves"""
+        if isinstance(tree, DomainLeaf):
+            return False
+        if isinstance(tree, DomainNot):
+            return True
+        if not all(isinstance(operand, DomainLeaf) for operand in tree.operands):
+            return True
+        return tree.operator == '|' and len(tree.operands) > 2
+
+    def render(self, tree, parent=None):
+        """Python expression of an expression tree"""
+        if isinstance(tree, DomainLeaf):
+            return self._render_leaf(tree)
+        if isinstance(tree, DomainNot):
+            operand = self.render(tree.operand, '!')
+            return f"not {operand}"
+        separator = ' and ' if tree.operator == '&' else ' or '
+        expression = separator.join(self.render(operand, tree.operator) for operand in tree.operands)
+        # AND inside OR is parenthesized for readability, although not required
+        if parent is not None and parent != tree.operator:
+            return f"({expression})"
+        return expression
+
+    def _render_leaf(self, leaf):
+        """Expression of a (field, operator, value) leaf"""
+        if leaf.operator in ('true', 'false'):
+            return 'True' if leaf.operator == 'true' else 'False'
+        field = leaf.field
+        value = leaf.value
+        operator = self.OPERATORS[leaf.operator]
+        if operator == '==':
+            if value in self.FALSY_VALUES:
+                return f"not {field}"
+            if value == 'True':
+                return field
+        elif operator == '!=':
+            if value in self.FALSY_VALUES:
+                return field
+            if value == 'True':
+                return f"not {field}"
+        return f"{field} {operator} {value}"
+
+
+class _TokenReader:
+    """Cursor over the tokens of an attrs value"""
+    __slots__ = ('source', 'tokens', 'position')
+
+    def __init__(self, source, tokens):
+        self.source = source
+        self.tokens = tokens
+        self.position = 0
+
+    def at_end(self):
+        return self.position >= len(self.tokens)
+
+    def peek(self):
+        if self.at_end():
+            raise DomainError("unexpected end of attrs")
+        kind, text, _, _ = self.tokens[self.position]
+        return kind, text
+
+    def next(self):
+        token = self.peek()
+        self.position += 1
+        return token
+
+    def accept(self, text):
+        if not self.at_end() and self.tokens[self.position][1] == text:
+            self.position += 1
+            return True
+        return False
+
+    def expect(self, text):
+        if not self.accept(text):
+            found = self.peek()[1] if not self.at_end() else 'end of attrs'
+            raise DomainError(f"expected {text!r}, got {found!r}")
+
+    def expression(self, closing):
+        """Source text of a value, up to the closing bracket of its leaf"""
+        depth = 0
+        start = self.position
+        while True:
+            kind, text = self.peek()
+            if kind == 'punct':
+                if text in '([{':
+                    depth += 1
+                elif text in ')]}':
+                    if depth == 0:
+                        break
+                    depth -= 1
+                elif text == ',' and depth == 0:
+                    raise DomainError("domain leaf with more than three elements")
+            self.position += 1
+        if self.position == start:
+            raise DomainError("missing leaf value")
+        first = self.tokens[start]
+        last = self.tokens[self.position - 1]
+        return self.source[first[2]:last[3]].strip()
+
+
+class ConversionCache:
+    """Persistent content-addressed cache of conversion results
+
+    Entries are keyed by the hash of the file content, the converter version,
+    the rule set and the effective options, and store the converted output
+    with the per-rule change counts. Entries are written atomically, so
+    several processes (or CI runners sharing the directory) can use the same
+    cache. When the cache grows over max_size bytes, the least recently used
+    entries are evicted.
+    """
+    FORMAT = 'v1'
+    DEFAULT_MAX_SIZE = 512 * 1024 * 1024
+
+    def __init__(self, cache_dir, fingerprint, max_size=None):
+        self.cache_dir = os.path.join(cache_dir, self.FORMAT)
+        self.fingerprint = fingerprint.encode('utf-8')
+        self.max_size = max_size or self.DEFAULT_MAX_SIZE
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self.size = None
+
+    def key(self, kind, content):
+        """Cache key of a file content"""
+        digest = hashlib.sha256(self.fingerprint)
+        digest.update(b'\0' + kind.encode('utf-8') + b'\0')
+        digest.update(content.encode('utf-8'))
+        return digest.hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, key[:2], key)
+
+    def get(self, key):
+        """Return (content, changes) for a key, content being None for unchanged files, or None"""
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                entry = json.loads(zlib.decompress(f.read()).decode('utf-8'))
+            # Refresh the entry's position in the LRU order
+            os.utime(path, None)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.debug("Ignoring unreadable cache entry %s: %s", path, e)
+            return None
+        return entry['content'], entry['changes']
+
+    def put(self, key, content, changes):
+        """Store the result of a conversion"""
+        path = self._path(key)
+        data = zlib.compress(json.dumps({'content': content, 'changes': changes}).encode('utf-8'))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Size of the entry replaced, if any
+        try:
+            replaced = os.path.getsize(path)
+        except OSError:
+            replaced = 0
+        _atomic_write(path, data)
+        if self.size is None:
+            self.size = self._disk_usage()
+        else:
+            self.size += len(data) - replaced
+        if self.size > self.max_size:
+            self.evict()
+
+    def _entries(self):
+        """(mtime, size, path) of every entry in the cache"""
+        entries = []
+        for shard in os.scandir(self.cache_dir):
+            if not shard.is_dir():
+                continue
+            for entry in os.scandir(shard.path):
+                if entry.name.startswith('.tmp-'):
+                    continue
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+        return entries
+
+    def _disk_usage(self):
+        return sum(size for _, size, _ in self._entries())
+
+    def evict(self):
+        """Remove the least recently used entries until the cache is under 90% of its maximum size"""
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        target = self.max_size * 0.9
+        for _, size, path in entries:
+            if total <= target:
+                break
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                # Already evicted by another process sharing the cache
+                pass
+            total -= size
+        self.size = total
+
+
+class BackupStore:
+    """Content-addressed store of the original files changed by conversion runs
+
+    Only files that are actually changed are backed up. Each original content
+    is stored once (objects/<ab>/<sha256>, zlib-compressed), however many
+    files or runs share it, and every run writes a manifest (runs/<run-id>.json)
+    mapping the files it changed to the objects holding their originals and
+    to the hashes of the converted contents.
+    """
+    DIR_NAME = '.odoo18_backups'
+
+    def __init__(self, store_dir):
+        self.store_dir = os.path.abspath(store_dir)
+        self.objects_dir = os.path.join(self.store_dir, 'objects')
+        self.runs_dir = os.path.join(self.store_dir, 'runs')
+
+    @staticmethod
+    def new_run_id():
+        """Identifier of a new run, sortable by date"""
+        return f"{datetime.now().strftime('%Y%m%d-%H%M%S')}-{os.urandom(3).hex()}"
+
+    def _object_path(self, digest):
+        return os.path.join(self.objects_dir, digest[:2], digest)
+
+    def put(self, data):
+        """Store a file content (once per content) and return its digest"""
+        digest = hashlib.sha256(data).hexdigest()
+        path = self._object_path(digest)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            _atomic_write(path, zlib.compress(data))
+        return digest
+
+    def put_file(self, path):
+        """Store the content of a file, read and compressed in blocks, and return its digest"""
+        os.makedirs(self.objects_dir, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.objects_dir, prefix='.tmp-')
+        try:
+            sha = hashlib.sha256()
+            compressor = zlib.compressobj()
+            with open(path, 'rb') as source, os.fdopen(fd, 'wb') as f:
+                for block in iter(lambda: source.read(STREAM_WINDOW_SIZE), b''):
+                    sha.update(block)
+                    f.write(compressor.compress(block))
+                f.write(compressor.flush())
+            digest = sha.hexdigest()
+            target = self._object_path(digest)
+            if os.path.exists(target):
+                os.unlink(tmp_path)
+            else:
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+                os.replace(tmp_path, target)
+            return digest
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+
+    def get(self, digest):
+        """Content of an object, checked against its digest"""
+        with open(self._object_path(digest), 'rb') as f:
+            data = zlib.decompress(f.read())
+        if hashlib.sha256(data).hexdigest() != digest:
+            raise ValueError(f"Corrupted backup object {digest}")
+        return data
+
+    def save_manifest(self, manifest):
+        """Write the manifest of a run"""
+        os.makedirs(self.runs_dir, exist_ok=True)
+        path = os.path.join(self.runs_dir, f"{manifest['run_id']}.json")
+        _atomic_write(path, json.dumps(manifest, indent=2).encode('utf-8'))
+
+    def runs(self):
+        """Manifests of all runs, oldest first"""
+        if not os.path.isdir(self.runs_dir):
+            return []
+        manifests = []
+        for name in sorted(os.listdir(self.runs_dir)):
+            if name.endswith('.json'):
+                manifests.append(self.load_manifest(name[:-len('.json')]))
+        return manifests
+
+    def load_manifest(self, run_id):
+        """Manifest of a run ('latest' for the most recent one)"""
+        if run_id == 'latest':
+            runs = self.runs()
+            if not runs:
+                raise ValueError(f"No conversion run in {self.store_dir}")
+            return runs[-1]
+        path = os.path.join(self.runs_dir, f"{run_id}.json")
+        if not os.path.exists(path):
+            raise ValueError(f"Unknown run {run_id} in {self.store_dir}")
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def rollback(self, run_id, force=False):
+        """Restore the originals of every file changed by a run
+
+        All originals are first extracted to temporary files next to their
+        targets, then renamed over them, so that a failure (missing object,
+        full disk) leaves the tree untouched. Files modified since the run are
+        conflicts: nothing is restored unless force is set.
+        Returns (manifest, restored paths, conflicting paths).
+        """
+        manifest = self.load_manifest(run_id)
+        staged = []
+        conflicts = []
+        try:
+            for entry in manifest['files']:
+                path = entry['path']
+                if not force and os.path.exists(path):
+                    with open(path, 'rb') as f:
+                        if hashlib.sha256(f.read()).hexdigest() != entry['converted']:
+                            conflicts.append(path)
+                            continue
+                data = self.get(entry['original'])
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix='.odoo18-rollback-')
+                staged.append((tmp_path, path))
+                with os.fdopen(fd, 'wb') as f:
+                    f.write(data)
+                os.chmod(tmp_path, entry['mode'])
+                os.utime(tmp_path, ns=(entry['mtime_ns'], entry['mtime_ns']))
+            if conflicts:
+                return manifest, [], conflicts
+            for tmp_path, path in staged:
+                os.replace(tmp_path, path)
+            restored = [path for _, path in staged]
+            staged = []
+        finally:
+            for tmp_path, _ in staged:
+                if os.path.exists(tmp_path):
+                    os.unlink(tmp_path)
+        manifest['rolled_back'] = datetime.now().isoformat()
+        self.save_manifest(manifest)
+        return manifest, restored, conflicts
+
+
+class GitRepository:
+    """Plumbing access to the git repository holding a source tree
+
+    Candidate files come from the index and the diff instead of a walk of
+    the tree, and blobs are read from and written to the object database by
+    a single git process per batch, so that the cost follows the size of the
+    change set.
+    """
+
+    def __init__(self, path):
+        self.path = os.path.abspath(path)
+        self.toplevel = None
+        self.toplevel = os.path.abspath(self._git('rev-parse', '--show-toplevel').decode().strip())
+        try:
+            self.object_format = self._git('rev-parse', '--show-object-format').decode().strip() or 'sha1'
+        except RuntimeError:
+            # Older git versions only know SHA-1 repositories
+            self.object_format = 'sha1'
+
+    def _git(self, *args, input=None, env=None):
+        """Output of a git command run at the top of the repository"""
+        try:
+            result = subprocess.run(['git', '-C', self.toplevel or self.path] + list(args), input=input, env=env,
+                                    stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        except OSError as e:
+            raise RuntimeError(f"Cannot run git: {str(e)}")
+        if result.returncode != 0:
+            raise RuntimeError(result.stderr.decode('utf-8', 'replace').strip() or f"git {args[0]} failed")
+        return result.stdout
+
+    def _pathspecs(self, paths):
+        return [os.path.relpath(os.path.abspath(path), self.toplevel) for path in paths]
+
+    def resolve_refs(self, specs):
+        """(name, commit id) of refs, and of each commit of ranges (A..B)
+
+        The name of a ref is its full name without refs/ (heads/main), that of
+        a commit given by its id or reached through a range is commits/<id>.
+        """
+        commits = {}
+        for spec in specs:
+            if '..' in spec:
+                for commit in self._git('rev-list', '--reverse', spec).decode().split():
+                    commits.setdefault(f"commits/{commit}", commit)
+                continue
+            commit = self._git('rev-parse', '--verify', f"{spec}^{{commit}}").decode().strip()
+            full_name = self._git('rev-parse', '--symbolic-full-name', spec).decode().strip()
+            name = full_name[len('refs/'):] if full_name.startswith('refs/') else f"commits/{commit}"
+            commits.setdefault(name, commit)
+        return list(commits.items())
+
+    def list_tree(self, commit, paths):
+        """(mode, blob id, path) of the regular files of a commit under paths"""
+        pathspecs = [path for path in self._pathspecs(paths) if path != '.']
+        output = self._git('ls-tree', '-r', '-z', '--full-tree', commit, '--', *pathspecs)
+        files = []
+        for line in output.split(b'\0'):
+            if not line:
+                continue
+            # <mode> SP <type> SP <object> TAB <path>
+            meta, name = line.split(b'\t', 1)
+            mode, kind, blob_id = meta.decode().split(' ')
+            if kind == 'blob' and mode in ('100644', '100755'):
+                files.append((mode, blob_id, os.path.join(self.toplevel, os.fsdecode(name))))
+        return files
+
+    def changed_files(self, since, paths):
+        """Files under paths added or modified in the working tree since a ref"""
+        output = self._git('diff', '--name-only', '-z', '--no-renames', '--diff-filter=AMT', since, '--',
+                           *self._pathspecs(paths))
+        return [os.path.join(self.toplevel, os.fsdecode(name)) for name in output.split(b'\0') if name]
+
+    def staged_files(self, paths):
+        """(mode, blob id, path) of the files under paths added or modified in the index"""
+        output = self._git('diff', '--cached', '--raw', '-z', '--no-renames', '--no-abbrev', '--diff-filter=AMT',
+                           '--', *self._pathspecs(paths))
+        fields = output.split(b'\0')
+        files = []
+        for meta, name in zip(fields[0::2], fields[1::2]):
+            # :old_mode new_mode old_id new_id status
+            _, mode, _, blob_id, _ = meta.decode().split(' ')
+            # Regular files only, not symbolic links nor submodules
+            if mode in ('100644', '100755'):
+                files.append((mode, blob_id, os.path.join(self.toplevel, os.fsdecode(name))))
+        return files
+
+    def read_blobs(self, blob_ids):
+        """Contents of blobs, read by a single git cat-file --batch"""
+        blob_ids = list(dict.fromkeys(blob_ids))
+        if not blob_ids:
+            return {}
+        output = self._git('cat-file', '--batch', input=''.join(f"{blob_id}\n" for blob_id in blob_ids).encode())
+        blobs = {}
+        position = 0
+        for blob_id in blob_ids:
+            end = output.index(b'\n', position)
+            header = output[position:end].split(b' ')
+            if len(header) != 3:
+                raise RuntimeError(f"Cannot read blob {blob_id}: {output[position:end].decode()}")
+            size = int(header[2])
+            blobs[blob_id] = output[end + 1:end + 1 + size]
+            position = end + 1 + size + 1
+        return blobs
+
+    def blob_id(self, data):
+        """Object id of a blob holding data"""
+        return hashlib.new(self.object_format, b'blob %d\0' % len(data) + data).hexdigest()
+
+    def write_blob(self, data):
+        """Write a blob to the object database and return its id"""
+        return self._git('hash-object', '-w', '--no-filters', '--stdin', input=data).decode().strip()
+
+    def write_blobs(self, contents):
+        """Write blobs to the object database by a single git hash-object, return their ids in order"""
+        contents = list(contents)
+        if len(contents) < 2:
+            return [self.write_blob(data) for data in contents]
+        spool_dir = tempfile.mkdtemp(prefix='odoo18-blobs-')
+        try:
+            paths = []
+            for index, data in enumerate(contents):
+                paths.append(os.path.join(spool_dir, str(index)))
+                with open(paths[-1], 'wb') as f:
+                    f.write(data)
+            output = self._git('hash-object', '-w', '--no-filters', '--stdin-paths',
+                               input=''.join(f"{path}\n" for path in paths).encode())
+        finally:
+            shutil.rmtree(spool_dir, ignore_errors=True)
+        blob_ids = output.decode().split()
+        if len(blob_ids) != len(contents):
+            raise RuntimeError(f"git hash-object wrote {len(blob_ids)} blob(s) out of {len(contents)}")
+        return blob_ids
+
+    def update_index(self, entries, env=None):
+        """Stage blobs as the content of paths: (mode, blob id, path) entries"""
+        if entries:
+            self._git('update-index', '-z', '--index-info', env=env, input=b''.join(
+                f"{mode} {blob_id}\t".encode() + os.fsencode(os.path.relpath(path, self.toplevel)) + b'\0'
+                for mode, blob_id, path in entries))
+
+    def write_tree(self, commit, entries):
+        """Id of the tree of a commit with some files replaced, built in a temporary index"""
+        index_dir = tempfile.mkdtemp(prefix='odoo18-index-')
+        try:
+            env = dict(os.environ, GIT_INDEX_FILE=os.path.join(index_dir, 'index'))
+            self._git('read-tree', commit, env=env)
+            self.update_index(entries, env=env)
+            return self._git('write-tree', env=env).decode().strip()
+        finally:
+            shutil.rmtree(index_dir, ignore_errors=True)
+
+    def commit_tree(self, tree, parent, message):
+        """Id of a new commit of a tree on top of parent"""
+        return self._git('commit-tree', tree, '-p', parent, '-F', '-', input=message.encode('utf-8')).decode().strip()
+
+    def update_refs(self, updates):
+        """Point refs to commits, in a single transaction: (ref, commit id) pairs"""
+        if updates:
+            self._git('update-ref', '--stdin', input=''.join(
+                f"update {ref} {commit}\n" for ref, commit in updates).encode())
+
+
+class FileEntry:
+    """A file of the discovery index"""
+    __slots__ = ('path', 'ext', 'size', 'mtime', 'inode', 'module', 'linked')
+
+    def __init__(self, path, ext, size, mtime, inode, module, linked=False):
+        self.path = path
+        self.ext = ext
+        self.size = size
+        self.mtime = mtime
+        # (device, inode) pair identifying the file behind its path
+        self.inode = inode
+        # Directory of the owning Odoo module (None outside of any module)
+        self.module = module
+        # Whether the path was reached through a symbolic link
+        self.linked = linked
+
+
+class FileIndex:
+    """Compact in-memory index of the files of a source tree
+
+    Built by a single os.scandir() walk (directories are scanned in parallel
+    threads when workers > 1, which pays off on network-mounted trees). Files
+    reached through several paths (symbolic links) are indexed once, by inode.
+    """
+    MANIFEST_FILES = ('__manifest__.py', '__openerp__.py')
+    IGNORED_DIRS = ('.git', '.hg', '.svn', BackupStore.DIR_NAME)
+
+    def __init__(self, root, entries):
+        self.root = root
+        self.entries = entries
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __iter__(self):
+        return iter(self.entries)
+
+    @classmethod
+    def scan(cls, root, workers=1):
+        """Walk a directory tree (or a list of trees) and build its index"""
+        roots = [root] if isinstance(root, str) else list(root)
+        by_inode = {}
+        visited_dirs = set()
+        
+        def scan_dir(path, module, linked):
+            """Scan one directory, return its files and subdirectories"""
+            files = []
+            subdirs = []
+            try:
+                with os.scandir(path) as it:
+                    dir_entries = sorted(it, key=lambda entry: entry.name)
+            except OSError as e:
+                logger.warning("Cannot scan directory %s: %s", path, e)
+                return files, subdirs
+            if any(entry.name in cls.MANIFEST_FILES for entry in dir_entries):
+                module = path
+            for entry in dir_entries:
+                try:
+                    is_link = entry.is_symlink()
+                    if entry.is_dir():
+                        if entry.name not in cls.IGNORED_DIRS:
+                            subdirs.append((entry.path, module, linked or is_link))
+                    elif entry.is_file():
+                        stat = entry.stat()
+                        ext = os.path.splitext(entry.name)[1].lower()
+                        files.append(FileEntry(entry.path, ext, stat.st_size, stat.st_mtime,
+                                               (stat.st_dev, stat.st_ino), module, linked or is_link))
+                except OSError as e:
+                    logger.debug("Cannot stat %s: %s", entry.path, e)
+            return files, subdirs
+        
+        def add(result):
+            files, subdirs = result
+            for file_entry in files:
+                known = by_inode.get(file_entry.inode)
+                # Keep one path per file, preferring a path without symbolic links
+                if known is None or (known.linked and not file_entry.linked):
+                    by_inode[file_entry.inode] = file_entry
+            pending = []
+            for subdir in subdirs:
+                try:
+                    stat = os.stat(subdir[0])
+                except OSError:
+                    continue
+                # Directories reached through symbolic links are walked once (no cycles)
+                if (stat.st_dev, stat.st_ino) not in visited_dirs:
+                    visited_dirs.add((stat.st_dev, stat.st_ino))
+                    pending.append(subdir)
+            return pending
+        
+        pending = []
+        for path in roots:
+            root_stat = os.stat(path)
+            if (root_stat.st_dev, root_stat.st_ino) not in visited_dirs:
+                visited_dirs.add((root_stat.st_dev, root_stat.st_ino))
+                pending.append((path, None, False))
+        if workers > 1:
+            with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+                running = set()
+                while pending or running:
+                    for subdir in pending:
+                        running.add(executor.submit(scan_dir, *subdir))
+                    pending = []
+                    done, running = concurrent.futures.wait(running, return_when=concurrent.futures.FIRST_COMPLETED)
+                    for future in done:
+                        pending.extend(add(future.result()))
+        else:
+            while pending:
+                pending.extend(add(scan_dir(*pending.pop())))
+        
+        entries = sorted(by_inode.values(), key=lambda file_entry: file_entry.path)
+        return cls(root, entries)
+
+    @classmethod
+    def from_paths(cls, paths, root=None):
+        """Index of an explicit list of files, without walking any directory
+
+        The module of a file is the closest directory above it holding a
+        manifest. Paths that are not regular files are left out.
+        """
+        modules = {}
+        
+        def module_of(directory):
+            if directory not in modules:
+                if any(os.path.isfile(os.path.join(directory, name)) for name in cls.MANIFEST_FILES):
+                    modules[directory] = directory
+                else:
+                    parent = os.path.dirname(directory)
+                    modules[directory] = None if parent == directory else module_of(parent)
+            return modules[directory]
+        
+        by_inode = {}
+        for path in paths:
+            path = os.path.abspath(path)
+            try:
+                stat = os.stat(path)
+            except OSError as e:
+                logger.warning("Cannot stat %s: %s", path, e)
+                continue
+            if not os.path.isfile(path):
+                continue
+            inode = (stat.st_dev, stat.st_ino)
+            if inode not in by_inode:
+                ext = os.path.splitext(path)[1].lower()
+                by_inode[inode] = FileEntry(path, ext, stat.st_size, stat.st_mtime, inode,
+                                            module_of(os.path.dirname(path)))
+        entries = sorted(by_inode.values(), key=lambda file_entry: file_entry.path)
+        return cls(root, entries)
+
+
+class PollingWatcher:
+    """Watch trees by comparing successive scans of their discovery index"""
+    def __init__(self, roots, interval=0.5, scan_workers=1):
+        self.roots = roots
+        self.interval = interval
+        self.scan_workers = scan_workers
+        self.snapshot = self._scan()
+        self._next_scan = time.monotonic() + interval
+
+    def _scan(self):
+        return {entry.path: (entry.mtime, entry.size)
+                for entry in FileIndex.scan(self.roots, workers=self.scan_workers)}
+
+    def wait(self, timeout=None):
+        """Paths of the files created or modified, waiting at most timeout seconds"""
+        delay = self._next_scan - time.monotonic()
+        if timeout is not None and delay > timeout:
+            time.sleep(max(0.0, timeout))
+            return set()
+        time.sleep(max(0.0, delay))
+        self._next_scan = time.monotonic() + self.interval
+        snapshot = self._scan()
+        changed = {path for path, state in snapshot.items() if self.snapshot.get(path) != state}
+        self.snapshot = snapshot
+        return changed
+
+    def close(self):
+        pass
+
+
+class InotifyWatcher:
+    """Watch trees with Linux inotify, through ctypes
+
+    Every directory gets a watch (new directories are added as they appear).
+    Files are reported when closed after writing or moved into place, the way
+    editors save. When the kernel queue overflows, the trees are rescanned.
+    """
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+    IN_Q_OVERFLOW = 0x00004000
+    IN_ISDIR = 0x40000000
+    MASK = IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE
+    EVENT_FORMAT = 'iIII'
+
+    def __init__(self, roots, scan_workers=1):
+        if not sys.platform.startswith('linux'):
+            raise OSError("inotify is only available on Linux")
+        self.event = struct.Struct(self.EVENT_FORMAT)
+        self._libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        self.fd = self._libc.inotify_init1(os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.roots = roots
+        self.scan_workers = scan_workers
+        self.directories = {}
+        try:
+            for root in roots:
+                self._add_tree(root)
+        except Exception:
+            self.close()
+            raise
+
+    def _add_tree(self, root):
+        """Watch a directory and all its subdirectories"""
+        for path, dirnames, _ in os.walk(root, followlinks=True):
+            dirnames[:] = [name for name in dirnames if name not in FileIndex.IGNORED_DIRS]
+            wd = self._libc.inotify_add_watch(self.fd, os.fsencode(path), self.MASK)
+            if wd < 0:
+                raise OSError(ctypes.get_errno(), f"Cannot watch {path} (raise fs.inotify.max_user_watches?)")
+            self.directories[wd] = path
+
+    def wait(self, timeout=None):
+        """Paths of the files created or modified, waiting at most timeout seconds"""
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return set()
+        data = os.read(self.fd, 1024 * 1024)
+        changed = set()
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, length = self.event.unpack_from(data, offset)
+            offset += self.event.size
+            name = data[offset:offset + length].rstrip(b'\0')
+            offset += length
+            if mask & self.IN_Q_OVERFLOW:
+                # Events were lost: report every file of the trees
+                changed.update(entry.path for entry in FileIndex.scan(self.roots, workers=self.scan_workers))
+                continue
+            directory = self.directories.get(wd)
+            if directory is None or not name:
+                continue
+            path = os.path.join(directory, os.fsdecode(name))
+            if mask & self.IN_ISDIR:
+                if os.path.basename(path) not in FileIndex.IGNORED_DIRS:
+                    # Files written before the watch was added are picked up by the scan
+                    self._add_tree(path)
+                    changed.update(entry.path for entry in FileIndex.scan(path))
+            elif mask & (self.IN_CLOSE_WRITE | self.IN_MOVED_TO):
+                changed.add(path)
+        return changed
+
+    def close(self):
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+
+
+class ProgressReporter:
+    """Rate-limited progress line showing throughput and estimated time left"""
+    def __init__(self, total, interval=0.5, enabled=True):
+        self.total = total
+        self.interval = interval
+        self.enabled = enabled
+        self.start = time.monotonic()
+        self.last = 0.0
+
+    def update(self, done, force=False):
+        """Display the progress if the last display is older than the interval"""
+        if not self.enabled:
+            return
+        now = time.monotonic()
+        if not force and now - self.last < self.interval:
+            return
+        self.last = now
+        elapsed = max(now - self.start, 1e-6)
+        rate = done / elapsed
+        if rate > 0:
+            eta = int((self.total - done) / rate)
+            eta_text = f"{eta // 60:02d}:{eta % 60:02d}"
+        else:
+            eta_text = "--:--"
+        print(f"\r[{done}/{self.total}] {rate:.1f} files/s - ETA {eta_text}   ", end="", flush=True)
+
+    def finish(self):
+        """Display the final progress and end the line"""
+        if self.enabled:
+            self.update(self.total, force=True)
+            print("")
+
+
+class Profiler:
+    """Wall time, CPU time and peak allocation per rule and per file (--profile)
+
+    Measurements nest (the rules of a file are measured within the file).
+    Peak allocations are traced with tracemalloc, on Python 3.9+ only as
+    they need tracemalloc.reset_peak(). Pool workers return their
+    measurements with their results and can dump their cProfile statistics.
+    """
+    def __init__(self, dump_dir=None):
+        self.rules = {}
+        self.files = []
+        self.dump_dir = dump_dir
+        self.cprofile = cProfile.Profile() if dump_dir else None
+        self.profiled = False
+        self._stack = []
+        self._cpu_time = getattr(time, 'thread_time', time.process_time)
+        self.trace_memory = hasattr(tracemalloc, 'reset_peak')
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    def begin(self):
+        """Start a measurement, returned as a frame for end()"""
+        current = 0
+        if self.trace_memory:
+            current, peak = tracemalloc.get_traced_memory()
+            # The enclosing measurement keeps the peak reached so far
+            if self._stack:
+                self._stack[-1][3] = max(self._stack[-1][3], peak)
+            tracemalloc.reset_peak()
+        frame = [time.perf_counter(), self._cpu_time(), current, current]
+        self._stack.append(frame)
+        return frame
+
+    def end(self, frame):
+        """Stop a measurement, return its (wall time, CPU time, peak allocation)"""
+        wall = time.perf_counter() - frame[0]
+        cpu = self._cpu_time() - frame[1]
+        self._stack.pop()
+        peak = 0
+        if self.trace_memory:
+            frame[3] = max(frame[3], tracemalloc.get_traced_memory()[1])
+            peak = frame[3] - frame[2]
+            if self._stack:
+                self._stack[-1][3] = max(self._stack[-1][3], frame[3])
+        return wall, cpu, peak
+
+    def add_rule(self, rule_id, frame):
+        """End the measurement of a rule applied to a file"""
+        wall, cpu, peak = self.end(frame)
+        entry = self.rules.get(rule_id)
+        if entry is None:
+            entry = self.rules[rule_id] = {'calls': 0, 'wall': 0.0, 'cpu': 0.0, 'peak': 0}
+        entry['calls'] += 1
+        entry['wall'] += wall
+        entry['cpu'] += cpu
+        entry['peak'] = max(entry['peak'], peak)
+
+    def add_file(self, path, frame):
+        """End the measurement of the transformation of a file"""
+        wall, cpu, peak = self.end(frame)
+        self.files.append((path, wall, cpu, peak))
+
+    def enable(self):
+        if self.cprofile is not None:
+            self.cprofile.enable()
+            self.profiled = True
+
+    def disable(self):
+        if self.cprofile is not None:
+            self.cprofile.disable()
+
+    def dump(self, name):
+        """Write the cProfile statistics of this process in the dump directory"""
+        if not self.profiled:
+            return None
+        os.makedirs(self.dump_dir, exist_ok=True)
+        path = os.path.join(self.dump_dir, f"{name}-{os.getpid()}.pstats")
+        self.cprofile.dump_stats(path)
+        return path
+
+    def collect(self):
+        """Measurements recorded since the last call, to be sent to the parent process"""
+        data = {'rules': self.rules, 'files': self.files}
+        self.rules = {}
+        self.files = []
+        return data
+
+    def merge(self, data):
+        """Add the measurements collected by a pool worker"""
+        for rule_id, measured in data['rules'].items():
+            entry = self.rules.setdefault(rule_id, {'calls': 0, 'wall': 0.0, 'cpu': 0.0, 'peak': 0})
+            for key in ('calls', 'wall', 'cpu'):
+                entry[key] += measured[key]
+            entry['peak'] = max(entry['peak'], measured['peak'])
+        self.files.extend(data['files'])
+
+    def slowest_files(self, limit):
+        return sorted(self.files, key=lambda item: item[1], reverse=True)[:limit]
+
+    def slowest_rules(self, limit):
+        return sorted(self.rules.items(), key=lambda item: item[1]['wall'], reverse=True)[:limit]
+
+
+class ResultsStream:
+    """NDJSON stream of the per-file results of a run (--results-file)
+
+    The first line describes the run, then one line is appended per file as
+    it completes and a last line marks the end of the run. Lines are
+    buffered and flushed every flush_interval seconds, so an interrupted run
+    leaves a stream that can still be summarized, at most its last
+    (truncated) line being lost.
+    """
+    FORMAT = 1
+
+    def __init__(self, path, flush_interval=1.0):
+        self.path = path
+        self.flush_interval = flush_interval
+        self.count = 0
+        self.file = open(path, 'w', encoding='utf-8')
+        self._last_flush = time.monotonic()
+
+    def _write(self, record):
+        self.file.write(json.dumps(record, separators=(',', ':')) + '\n')
+        now = time.monotonic()
+        if now - self._last_flush >= self.flush_interval:
+            self.file.flush()
+            self._last_flush = now
+
+    def start(self, run):
+        self._write(dict(run, type='run', format=self.FORMAT))
+
+    def append(self, record):
+        """Write the result of a file"""
+        self._write(record)
+        self.count += 1
+
+    def close(self, end=None):
+        """Write the end of the run and close the stream"""
+        self._write(dict(end or {}, type='end', files=self.count))
+        self.file.close()
+
+    @staticmethod
+    def summarize(path):
+        """Rebuild the aggregate report of a run from its stream, complete or not"""
+        summary = {
+            'run': {},
+            'complete': False,
+            'invalid_lines': 0,
+            'files_processed': 0,
+            'files_changed': 0,
+            'files_error': 0,
+            'files_skipped_by_prefilter': 0,
+            'cache_hits': 0,
+            'bytes_in': 0,
+            'bytes_out': 0,
+            'duration_seconds': 0.0,
+            'changes': {},
+            'errors': [],
+            'slowest_files': []
+        }
+        slowest = []
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # Line truncated by an interrupted run
+                    summary['invalid_lines'] += 1
+                    continue
+                kind = record.get('type')
+                if kind == 'run':
+                    summary['run'] = record
+                elif kind == 'end':
+                    summary['complete'] = True
+                    summary['end'] = record
+                elif kind == 'file':
+                    summary['files_processed'] += 1
+                    status = record['status']
+                    if status == 'changed':
+                        summary['files_changed'] += 1
+                    elif status == 'error':
+                        summary['files_error'] += 1
+                        summary['errors'].append({'path': record['path'], 'error': record.get('error')})
+                    elif status == 'skipped':
+                        summary['files_skipped_by_prefilter'] += 1
+                    if record.get('cache_hit'):
+                        summary['cache_hits'] += 1
+                    summary['bytes_in'] += record.get('bytes_in', 0)
+                    summary['bytes_out'] += record.get('bytes_out', 0)
+                    summary['duration_seconds'] += record.get('duration', 0.0)
+                    for rule_id, count in record.get('changes', {}).items():
+                        summary['changes'][rule_id] = summary['changes'].get(rule_id, 0) + count
+                    slowest.append((record.get('duration', 0.0), record['path']))
+                    if len(slowest) > 100:
+                        slowest = sorted(slowest, reverse=True)[:10]
+        summary['slowest_files'] = [{'path': path, 'duration': duration}
+                                    for duration, path in sorted(slowest, reverse=True)[:10]]
+        return summary
+
+
+class PatchWriter:
+    """Unified diff of the changes of a run (--patch)
+
+    The diffs are computed where the files are converted (in the pool
+    workers for parallel runs) and collected here as (path, diff, changes)
+    entries, diff being None for the files converted in streaming mode (listed
+    in the header as missing from the patch); the patch is written at the end of the run, ordered by path whatever the
+    order of completion. It starts with the per-file and per-rule change
+    counts, which patch and git apply ignore.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.entries = []
+
+    def append(self, entry):
+        self.entries.append(entry)
+
+    def extend(self, entries):
+        self.entries.extend(entries)
+
+    @staticmethod
+    def diff(path, content, new_content):
+        """Unified diff of a file between two contents, paths prefixed with a/ and b/"""
+        lines = []
+        for line in difflib.unified_diff(content.splitlines(True), new_content.splitlines(True),
+                                         f"a/{path}", f"b/{path}"):
+            lines.append(line)
+            if not line.endswith('\n'):
+                lines.append('\n\\ No newline at end of file\n')
+        return f"diff --git a/{path} b/{path}\n" + ''.join(lines)
+
+    def close(self):
+        """Write the patch, ordered by path"""
+        entries = sorted(self.entries, key=lambda entry: entry[0])
+        totals = {}
+        width = max([len(path) for path, _, _ in entries] + [0])
+        with open(self.path, 'w', encoding='utf-8', newline='\n') as f:
+            f.write(f"Odoo 18 conversion: {len(entries)} file(s) changed\n")
+            streamed = sum(1 for _, diff, _ in entries if diff is None)
+            if streamed:
+                # Streamed files are converted window by window, their whole contents are never held
+                f.write(f"WARNING: {streamed} file(s) converted in streaming mode are missing from this patch, "
+                        f"applying it does not convert them\n")
+            f.write('\n')
+            for path, diff, changes in entries:
+                for key, count in changes.items():
+                    totals[key] = totals.get(key, 0) + count
+                details = ', '.join(f"{key}: {count}" for key, count in sorted(changes.items()))
+                f.write(f" {path.ljust(width)} | {sum(changes.values())} change(s) ({details})"
+                        f"{' - streamed, missing from this patch' if diff is None else ''}\n")
+            if totals:
+                f.write("\nChanges by rule:\n")
+                for key, count in sorted(totals.items(), key=lambda item: (-item[1], item[0])):
+                    f.write(f" {key}: {count}\n")
+            f.write('\n')
+            for _, diff, _ in entries:
+                if diff is not None:
+                    f.write(diff)
+        return len(entries)
+
+
+class ConversionServer:
+    """Long-running conversion service for editors and pre-commit hooks (serve)
+
+    Requests and responses are JSON objects, one per line, read from a Unix
+    socket or from stdin/stdout. The converter (rules, compiled domains,
+    prefilters) and its worker pool are built once, so a request only pays
+    for the conversion itself. Methods:
+
+    - convert: 'content' (with 'kind' or a 'path' giving it) or a 'path' read
+      from disk, written back if 'write' is set; returns the converted
+      'content', the per-rule 'changes' and the line 'edits'
+    - convert_many: 'items', a list of convert requests, spread over the pool
+    - ping, shutdown
+    """
+
+    def __init__(self, converter, executor=None):
+        self.converter = converter
+        self.executor = executor
+        self.lock = threading.Lock()
+        self.requests = 0
+        self._socket_server = None
+
+    @staticmethod
+    def default_socket():
+        """Path of the Unix socket of the server of the current user"""
+        if os.environ.get('ODOO18_CONVERTER_SOCKET'):
+            return os.environ['ODOO18_CONVERTER_SOCKET']
+        user = os.getuid() if hasattr(os, 'getuid') else os.environ.get('USERNAME', 'user')
+        return os.path.join(tempfile.gettempdir(), f'odoo18_converter-{user}.sock')
+
+    @staticmethod
+    def edits(content, new_content):
+        """Line edits turning content into new_content
+
+        Each edit replaces the lines [start, end) of the original content
+        (0-based) with text; edits are given in document order.
+        """
+        lines = content.splitlines(True)
+        new_lines = new_content.splitlines(True)
+        matcher = difflib.SequenceMatcher(None, lines, new_lines, autojunk=False)
+        return [{'start': i1, 'end': i2, 'text': ''.join(new_lines[j1:j2])}
+                for tag, i1, i2, j1, j2 in matcher.get_opcodes() if tag != 'equal']
+
+    def handle(self, request):
+        """Response to a request"""
+        self.requests += 1
+        method = request.get('method', 'convert')
+        try:
+            if method == 'convert':
+                response = self.convert(request)
+            elif method == 'convert_many':
+                response = {'results': self.convert_many(request.get('items') or [])}
+            elif method == 'ping':
+                response = {'version': __version__, 'pid': os.getpid(), 'requests': self.requests,
+                            'rules': list(self.converter.registry.rules)}
+            elif method == 'shutdown':
+                response = {'shutdown': True}
+                if self._socket_server is not None:
+                    # Stops the accept loop once this response is sent
+                    threading.Thread(target=self._socket_server.shutdown, daemon=True).start()
+            else:
+                response = {'error': f"Unknown method: {method}"}
+        except Exception as e:
+            response = {'error': str(e)}
+        if 'id' in request:
+            response['id'] = request['id']
+        return response
+
+    def convert(self, request):
+        """Convert the content or the file of a request, in the worker pool when there is one
+
+        The converter of this process is shared by the threads of the
+        clients, hence used under the lock.
+        """
+        if self.executor is not None:
+            return self.executor.submit(_serve_task, dict(request, method='convert')).result()
+        with self.lock:
+            return self._convert(request)
+
+    def _convert(self, request):
+        converter = self.converter
+        path = request.get('path')
+        kind = request.get('kind') or ('python' if path and path.endswith('.py') else 'xml')
+        if kind not in ('xml', 'python'):
+            return {'path': path, 'error': f"Unsupported kind: {kind}"}
+        start_time = time.perf_counter()
+        
+        if 'content' in request:
+            job = converter._text_job(request['content'], kind, path)
+        elif path:
+            job = converter._read_stage(path, '.py' if kind == 'python' else '.xml')
+            converter._transform_stage(job)
+            if request.get('write'):
+                converter._write_stage(job)
+        else:
+            return {'error': "A request needs a content or a path"}
+        
+        result = converter._job_result(job, time.perf_counter() - start_time)
+        response = {'path': path, 'kind': kind}
+        if result.error:
+            response['error'] = result.error
+            return response
+        response['changed'] = result.changed
+        response['changes'] = result.changes
+        response['edits'] = self.edits(job.content, result.content) if result.changed else []
+        if 'content' in request or request.get('return_content'):
+            response['content'] = result.content
+        response['duration'] = round(result.duration, 6)
+        return response
+
+    def convert_many(self, items):
+        """Convert a list of requests, across the worker pool when there is one"""
+        if self.executor is None:
+            return [self.convert(item) for item in items]
+        workers = self.converter.workers
+        chunksize = max(1, min(MAX_CHUNK_SIZE, len(items) // (workers * 4)))
+        return list(self.executor.map(_serve_task, [dict(item, method='convert') for item in items], chunksize=chunksize))
+
+    def warm_up(self):
+        """Start the worker processes now rather than on the first request"""
+        if self.executor is not None:
+            list(self.executor.map(_serve_task, [{'method': 'ping'}] * self.converter.workers))
+
+    def serve_stream(self, rfile, wfile):
+        """Answer the requests of a binary stream until it ends or a shutdown request"""
+        for line in rfile:
+            if not line.strip():
+                continue
+            try:
+                request = json.loads(line)
+                if not isinstance(request, dict):
+                    raise ValueError("A request must be a JSON object")
+            except ValueError as e:
+                request, response = {}, {'error': f"Invalid request: {str(e)}"}
+            else:
+                response = self.handle(request)
+            wfile.write(json.dumps(response, separators=(',', ':')).encode('utf-8') + b'\n')
+            wfile.flush()
+            if request.get('method') == 'shutdown':
+                break
+
+    def serve_socket(self, path):
+        """Answer the requests of the clients of a Unix socket until a shutdown request"""
+        if os.path.exists(path):
+            try:
+                ConversionClient(path).close()
+            except OSError:
+                # Left by a server that did not stop cleanly
+                os.unlink(path)
+            else:
+                raise RuntimeError(f"A conversion server is already listening on {path}")
+        server = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                server.serve_stream(self.rfile, self.wfile)
+
+        class Server(socketserver.ThreadingUnixStreamServer):
+            # Clients still connected do not keep the process alive
+            daemon_threads = True
+
+        self._socket_server = Server(path, Handler)
+        try:
+            os.chmod(path, 0o600)
+            self._socket_server.serve_forever()
+        finally:
+            self._socket_server.server_close()
+            self._socket_server = None
+            if os.path.exists(path):
+                os.unlink(path)
+
+
+class ConversionClient:
+    """Client of a conversion server listening on a Unix socket"""
+
+    def __init__(self, path, timeout=None):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            self.sock.settimeout(timeout)
+            self.sock.connect(path)
+        except OSError:
+            self.sock.close()
+            raise
+        self.rfile = self.sock.makefile('rb')
+
+    def request(self, request):
+        """Send a request and wait for its response"""
+        self.sock.sendall(json.dumps(request, separators=(',', ':')).encode('utf-8') + b'\n')
+        line = self.rfile.readline()
+        if not line:
+            raise ConnectionError("The conversion server closed the connection")
+        return json.loads(line)
+
+    def close(self):
+        self.rfile.close()
+        self.sock.close()
+
+
+class ConversionResult:
+    """Result of the conversion of a content or a file (library API, server)
+
+    changes holds the non-zero counters of the rules, rules the identifiers
+    of the rules that changed the content.
+    """
+    __slots__ = ('path', 'kind', 'content', 'changed', 'changes', 'rules', 'error', 'duration')
+
+    def __init__(self, path, kind, content=None, changed=False, changes=None, rules=None,
+                 error=None, duration=0.0):
+        self.path = path
+        self.kind = kind
+        self.content = content
+        self.changed = changed
+        self.changes = changes or {}
+        self.rules = rules or []
+        self.error = error
+        self.duration = duration
+
+    def __repr__(self):
+        state = f"error={self.error!r}" if self.error else f"changed={self.changed}, changes={self.changes}"
+        return f"ConversionResult({self.path or self.kind!r}, {state})"
+
+
+class FileJob:
+    """A file travelling through the stages of the conversion pipeline"""
+    __slots__ = ('path', 'kind', 'stats', 'raw', 'content', 'new_content', 'elapsed', 'error',
+                 'stream', 'output_size')
+
+    def __init__(self, path, kind, stats):
+        self.path = path
+        self.kind = kind
+        self.stats = stats
+        # Original bytes, kept only when changed files are backed up
+        self.raw = None
+        # Original text, None when the file is skipped or could not be read
+        self.content = None
+        self.new_content = None
+        # Time spent on this file in the stages, in seconds
+        self.elapsed = 0.0
+        # Message of the error that stopped the conversion of this file
+        self.error = None
+        # Large file converted window by window by the transform stage
+        self.stream = False
+        self.output_size = None
+
+
+class ConversionPipeline:
+    """Overlapped read / transform / write stages of the conversion of a list of files
+
+    Reader threads run the prefilter and load the files into a bounded queue,
+    the calling thread transforms them (CPU-bound work, holding the GIL) and
+    a writer thread writes the backups and results. While a file is
+    transformed, the next ones are being read and the previous ones written,
+    so the waits on slow (network) file systems are overlapped with the
+    transformations. The bounded queues give backpressure: at most
+    queue_size files wait between two stages.
+
+    The busy time of every stage is collected so that the report tells
+    whether a run is I/O-bound or CPU-bound.
+    """
+    STAGES = ('read', 'transform', 'write')
+    
+    # Seconds between two checks of the cancel event by a blocked stage
+    POLL_INTERVAL = 0.1
+
+    def __init__(self, converter, readers=DEFAULT_IO_THREADS, queue_size=None):
+        self.converter = converter
+        self.readers = max(0, readers)
+        self.queue_size = queue_size or max(1, self.readers) * 4
+
+    @staticmethod
+    def empty_stats():
+        """Busy time and capacity (wall time x threads) of every stage, in seconds"""
+        stats = {}
+        for stage in ConversionPipeline.STAGES:
+            stats[f'{stage}_busy'] = 0.0
+            stats[f'{stage}_capacity'] = 0.0
+        return stats
+
+    def run(self, files, on_done=None):
+        """Convert (path, extension) files and return their merged statistics
+
+        on_done(count) is called after each file is written, from the writer
+        thread when the stages overlap. An exception raised in any stage
+        stops the others (all the queue operations are timed and check a
+        cancel event, so no thread stays blocked) and is raised here.
+        """
+        if self.readers == 0 or len(files) < 2:
+            return self._run_inline(files, on_done)
+        
+        converter = self.converter
+        stats = converter._empty_file_stats(files_processed=0)
+        busy = dict.fromkeys(self.STAGES, 0.0)
+        lock = threading.Lock()
+        read_queue = queue.Queue(self.queue_size)
+        write_queue = queue.Queue(self.queue_size)
+        pending = iter(files)
+        done = object()
+        readers = min(self.readers, len(files))
+        cancel = threading.Event()
+        errors = []
+        start = time.perf_counter()
+        
+        def fail(e):
+            with lock:
+                errors.append(e)
+            cancel.set()
+        
+        def put(target, item):
+            # Give up once the run is cancelled: the consumer may be gone
+            while not cancel.is_set():
+                try:
+                    target.put(item, timeout=self.POLL_INTERVAL)
+                    return True
+                except queue.Full:
+                    pass
+            return False
+        
+        def reader():
+            elapsed = 0.0
+            try:
+                while not cancel.is_set():
+                    with lock:
+                        file = next(pending, None)
+                    if file is None:
+                        break
+                    begin = time.perf_counter()
+                    job = converter._read_stage(*file)
+                    elapsed += time.perf_counter() - begin
+                    if not put(read_queue, job):
+                        break
+            except BaseException as e:
+                fail(e)
+            finally:
+                with lock:
+                    busy['read'] += elapsed
+                put(read_queue, done)
+        
+        def writer():
+            elapsed = 0.0
+            created_dirs = set()
+            count = 0
+            try:
+                while not cancel.is_set():
+                    try:
+                        job = write_queue.get(timeout=self.POLL_INTERVAL)
+                    except queue.Empty:
+                        continue
+                    if job is done:
+                        break
+                    begin = time.perf_counter()
+                    converter._write_stage(job, created_dirs)
+                    elapsed += time.perf_counter() - begin
+                    converter._record_result(job)
+                    merge_stats(stats, job.stats)
+                    count += 1
+                    if on_done:
+                        on_done(count)
+            except BaseException as e:
+                fail(e)
+            finally:
+                busy['write'] = elapsed
+        
+        threads = [threading.Thread(target=reader, daemon=True) for _ in range(readers)]
+        write_thread = threading.Thread(target=writer, daemon=True)
+        for thread in threads:
+            thread.start()
+        write_thread.start()
+        
+        try:
+            finished = 0
+            while finished < readers and not cancel.is_set():
+                try:
+                    job = read_queue.get(timeout=self.POLL_INTERVAL)
+                except queue.Empty:
+                    continue
+                if job is done:
+                    finished += 1
+                    continue
+                begin = time.perf_counter()
+                converter._transform_stage(job)
+                busy['transform'] += time.perf_counter() - begin
+                put(write_queue, job)
+            put(write_queue, done)
+        except BaseException:
+            cancel.set()
+            raise
+        finally:
+            write_thread.join()
+            for thread in threads:
+                thread.join()
+        if errors:
+            raise errors[0]
+        
+        wall = time.perf_counter() - start
+        pipeline = stats['pipeline']
+        for stage in self.STAGES:
+            pipeline[f'{stage}_busy'] = busy[stage]
+        pipeline['read_capacity'] = wall * readers
+        pipeline['transform_capacity'] = wall
+        pipeline['write_capacity'] = wall
+        return stats
+
+    def _run_inline(self, files, on_done=None):
+        """Run the stages one after the other in the calling thread"""
+        converter = self.converter
+        stats = converter._empty_file_stats(files_processed=0)
+        pipeline = stats['pipeline']
+        created_dirs = set()
+        start = time.perf_counter()
+        for count, file in enumerate(files, 1):
+            begin = time.perf_counter()
+            job = converter._read_stage(*file)
+            read_end = time.perf_counter()
+            converter._transform_stage(job)
+            transform_end = time.perf_counter()
+            converter._write_stage(job, created_dirs)
+            pipeline['read_busy'] += read_end - begin
+            pipeline['transform_busy'] += transform_end - read_end
+            pipeline['write_busy'] += time.perf_counter() - transform_end
+            converter._record_result(job)
+            merge_stats(stats, job.stats)
+            if on_done:
+                on_done(count)
+        wall = time.perf_counter() - start
+        for stage in self.STAGES:
+            pipeline[f'{stage}_capacity'] = wall
+        return stats
+
 
 class InteractiveMode:
     """Class to manage the application's interactive mode"""
@@ -63,7 +2731,7 @@ class InteractiveMode:
 {Fore.CYAN}███████║   ██║   ██║ ╚████║   ██║   ██║  ██║██╔╝ ██╗                         
 {Fore.CYAN}╚══════╝   ╚═╝   ╚═╝  ╚═══╝   ╚═╝   ╚═╝  ╚═╝╚═╝  ╚═╝                         
 
-{Fore.YELLOW}Version 1.2.0 - Interactive Mode{Style.RESET_ALL}
+{Fore.YELLOW}Version {__version__} - Interactive Mode{Style.RESET_ALL}
 
 This mode guides you step by step through the conversion process.
 You can exit at any time by pressing Ctrl+C.
@@ -160,7 +2828,7 @@ You can exit at any time by pressing Ctrl+C.
             print(f"   - Mode: In-place modification")
             
         if self.options['backup']:
-            print(f"   - Backup: Yes (.bak)")
+            print(f"   - Backup: Yes (backup store, changed files only)")
         else:
             print(f"   - Backup: No")
             
@@ -219,7 +2887,14 @@ class Odoo18Converter:
     def __init__(self, source_dir, output_dir=None, backup=True, verbose=False, 
                 extensions=None, skip_patterns=None, report_file=None, 
                 workers=1, dry_run=False, interactive=False, 
-                convert_python=False, advanced_conditions=False):
+                convert_python=False, advanced_conditions=False,
+                legacy_engine=False, registry=None, cache_dir=None,
+                cache_max_size=None, prefilter=True, scan_workers=DEFAULT_SCAN_WORKERS,
+                addons_paths=None, io_threads=DEFAULT_IO_THREADS, backup_dir=None,
+                domain_cache_size=DEFAULT_DOMAIN_CACHE_SIZE, profile=0, profile_dir=None,
+                log_file=None, results_file=None, stream_threshold=STREAM_THRESHOLD,
+                split_threshold=SPLIT_THRESHOLD, quiet=False, files=None, since=None,
+                patch_file=None):
         self.source_dir = source_dir
         self.output_dir = output_dir
         self.backup = backup
@@ -232,6 +2907,57 @@ class Odoo18Converter:
         self.interactive = interactive
         self.convert_python = convert_python
         self.advanced_conditions = advanced_conditions
+        self.legacy_engine = legacy_engine
+        
+        # Conversion rules, including third-party rule packs
+        self.registry = registry or RULES
+        self.registry.load_entry_points()
+        
+        # Byte-level prefilter classifying files without trigger literals as clean
+        self.prefilter = prefilter
+        self._byte_triggers = {}
+        
+        # Discovery index of the source tree, built once by convert_all()
+        self.scan_workers = max(1, scan_workers)
+        self.index = None
+        
+        # Batch mode: addons paths holding several modules
+        self.addons_paths = addons_paths
+        self.roots = [os.path.abspath(path) for path in (addons_paths or [source_dir])]
+        self.module_stats = {}
+        
+        # Reader threads of the read/transform/write pipeline
+        self.io_threads = max(0, io_threads)
+        
+        # Compiler of attrs domains, memoizing the compiled expressions
+        self.domain_cache_size = domain_cache_size
+        self.domains = DomainCompiler(max_size=domain_cache_size)
+        
+        # Profiling of the rules and files (top N in the report, cProfile dumps)
+        self.profile = profile
+        self.profile_dir = profile_dir
+        self.profiler = Profiler(profile_dir) if profile or profile_dir else None
+        
+        # Originals of the files changed in place go to the backup store
+        self.backup_store = None
+        self.run_id = None
+        if self.backup and not self.dry_run and self.output_dir is None:
+            self.backup_store = BackupStore(backup_dir or os.path.join(self.roots[0], BackupStore.DIR_NAME))
+            self.run_id = BackupStore.new_run_id()
+        
+        # Persistent conversion cache, keyed by content and effective options
+        self.cache_dir = cache_dir
+        self.cache_max_size = cache_max_size
+        self.cache = None
+        if cache_dir:
+            fingerprint = json.dumps({
+                'version': __version__,
+                'rules': self.registry.fingerprint(),
+                'advanced_conditions': self.advanced_conditions,
+                'convert_python': self.convert_python,
+                'legacy_engine': self.legacy_engine
+            }, sort_keys=True)
+            self.cache = ConversionCache(cache_dir, fingerprint, cache_max_size)
         
         # Statistics
         self.stats = {
@@ -239,15 +2965,17 @@ class Odoo18Converter:
             'files_changed': 0,
             'files_skipped': 0,
             'files_error': 0,
-            'changes': {
-                'tree_to_list': 0,
-                'attrs_conversion': 0,
-                'states_conversion': 0,
-                'daterange_update': 0,
-                'chatter_simplified': 0,
-                'settings_structure': 0,
-                'python_states_removed': 0,
-                'complex_conditions': 0
+            'changes': self.registry.empty_counters(),
+            'cache': {
+                'hits': 0,
+                'misses': 0
+            },
+            'prefilter': self._empty_prefilter_stats(),
+            'pipeline': ConversionPipeline.empty_stats(),
+            'backups': [],
+            'domains': {
+                'hits': 0,
+                'misses': 0
             },
             'start_time': datetime.now(),
             'end_time': None,
@@ -255,35 +2983,49 @@ class Odoo18Converter:
         }
         
         # Output configuration
-        if output_dir:
+        if output_dir and not dry_run:
             os.makedirs(output_dir, exist_ok=True)
             
-        # Create a log file handler if specified
-        if report_file:
-            file_handler = logging.FileHandler(report_file, mode='w')
-            file_handler.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s'))
-            logger.addHandler(file_handler)
+        # XML files converted window by window (0 disables the streaming mode),
+        # and files split across the pool in parallel runs (0 disables splitting)
+        self.stream_threshold = stream_threshold
+        self.split_threshold = split_threshold
+        
+        # Streaming per-file results, opened when the files are processed
+        self.results_file = results_file
+        self.results = None
+        
+        # Unified diff of the changes (--patch), paths relative to the source trees
+        self.patch_file = patch_file
+        self.patch = None
+        self.patch_root = os.path.commonpath(self.roots)
+        
+        # Log file written by the command line (mentioned in the report)
+        self.log_file = log_file
+        
+        # Headless output: no banners nor progress line when quiet or when
+        # the output is not a terminal, and a one-line summary when quiet
+        self.quiet = quiet
+        self.headless = quiet or not sys.stdout.isatty()
+        
+        # Explicit list of the files to convert (--files-from), instead of a walk,
+        # or the files changed since a git ref (--since)
+        self.files = files
+        self.since = since
             
-    def log(self, message, level='info', file_path=None):
-        """Log a message with the specified level"""
-        if self.verbose or level != 'debug':
-            formatted_message = message
-            if file_path:
-                formatted_message = f"{file_path}: {message}"
-                
-            if level == 'debug':
-                logger.debug(formatted_message)
-            elif level == 'info':
-                logger.info(formatted_message)
-            elif level == 'warning':
-                logger.warning(formatted_message)
-                print(f"{Fore.YELLOW}{formatted_message}{Style.RESET_ALL}")
-            elif level == 'error':
-                logger.error(formatted_message)
-                print(f"{Fore.RED}{formatted_message}{Style.RESET_ALL}")
-            elif level == 'success':
-                logger.info(formatted_message)
-                print(f"{Fore.GREEN}{formatted_message}{Style.RESET_ALL}")
+    def log(self, message, *args, level='info', file_path=None):
+        """Log a message with the specified level
+
+        The message is %-formatted with args by the logging handlers, only if
+        the level is enabled: debug messages cost a level check otherwise.
+        """
+        levelno = LOG_LEVELS[level]
+        if (levelno == logging.DEBUG and not self.verbose) or not logger.isEnabledFor(levelno):
+            return
+        if file_path:
+            message = "%s: " + message
+            args = (file_path,) + args
+        logger.log(levelno, message, *args)
 
     def print_banner(self):
         """Display a stylized banner at startup"""
@@ -309,7 +3051,7 @@ class Odoo18Converter:
 {Fore.CYAN}╚██████╗╚██████╔╝██║ ╚████║ ╚████╔╝ ███████╗██║  ██║   ██║   ███████╗██║  ██║
 {Fore.CYAN} ╚═════╝ ╚═════╝ ╚═╝  ╚═══╝  ╚═══╝  ╚══════╝╚═╝  ╚═╝   ╚═╝   ╚══════╝╚═╝  ╚═╝
 
-{Fore.WHITE}Version 1.2.0{Style.RESET_ALL}
+{Fore.WHITE}Version {__version__}{Style.RESET_ALL}
 """
         print(banner)
 
@@ -321,184 +3063,988 @@ class Odoo18Converter:
                 return True
         return False
 
-    def convert_all(self):
-        """Go through all files and apply conversions"""
-        self.print_banner()
-        
-        # Display script limitations (if not overcome)
-        if not self.convert_python and not self.advanced_conditions and not self.dry_run:
-            self.show_limitations()
-        else:
-            self.show_advanced_features()
+    def _start_run(self):
+        """Display the banners and return the extensions of the files to process"""
+        if not self.headless:
+            self.print_banner()
+            
+            # Display script limitations (if not overcome)
+            if not self.convert_python and not self.advanced_conditions and not self.dry_run:
+                self.show_limitations()
+            else:
+                self.show_advanced_features()
         
         self.stats['start_time'] = datetime.now()
-        
-        # Determine file types to process
+        return self._extensions()
+
+    def _extensions(self):
+        """Extensions of the files to process"""
         all_extensions = list(self.extensions)
         if self.convert_python:
             if '.py' not in all_extensions:
                 all_extensions.append('.py')
-        
-        print(f"📋 {Fore.CYAN}Searching for {', '.join(all_extensions)} files in {self.source_dir}...{Style.RESET_ALL}")
+        return all_extensions
+
+    def _discover(self, all_extensions):
+        """Build the discovery index and return the entries of the files to process"""
+        if self.since is not None:
+            try:
+                self.files = GitRepository(self.roots[0]).changed_files(self.since, self.roots)
+            except Exception as e:
+                self.log(f"Cannot list the files changed since {self.since}: {str(e)}", level='error')
+                return None
+            if not self.headless:
+                print(f"📋 {Fore.CYAN}{len(self.files)} file(s) changed since {self.since}{Style.RESET_ALL}")
+        if self.files is not None:
+            # Files listed explicitly: no directory is walked
+            self.index = FileIndex.from_paths(self.files, self.roots)
+        else:
+            if not self.headless:
+                print(f"📋 {Fore.CYAN}Searching for {', '.join(all_extensions)} files in {', '.join(self.roots)}...{Style.RESET_ALL}")
+            
+            # Ensure the source directories exist
+            for root in self.roots:
+                if not os.path.exists(root):
+                    self.log(f"Source directory {root} does not exist.", level='error')
+                    return None
+            
+            # Build the discovery index, shared by processing and statistics
+            self.index = FileIndex.scan(self.roots, workers=self.scan_workers)
+        total_files_found = len(self.index)
         
         # Collect all files to process
-        files_to_process = []
-        total_files_found = 0
-        
-        # Standard Odoo directories to check first (more complete list)
-        odoo_standard_dirs = [
-            'views', 'security', 'data', 'wizard', 'report', 
-            'static/src/xml', 'static/src/js', 'static/description',
-            'controllers', 'demo', 'i18n', 'templates', 'tests'
-        ]
-        
-        # Function to add a file to the processing list
-        def process_file_path(file_path):
-            nonlocal total_files_found
-            total_files_found += 1
-            file_ext = os.path.splitext(file_path)[1].lower()
+        entries = []
+        xml_files_found = 0
+        py_files_found = 0
+        for entry in self.index:
+            # Count files by type
+            if entry.ext == '.xml':
+                xml_files_found += 1
+            elif entry.ext == '.py':
+                py_files_found += 1
             
             # Process according to file type
-            if file_ext in all_extensions:
-                if not self.should_skip_file(file_path):
-                    files_to_process.append((file_path, file_ext))
-                    return True
+            if entry.ext in all_extensions:
+                if not self.should_skip_file(entry.path):
+                    entries.append(entry)
                 else:
                     self.stats['files_skipped'] += 1
-                    self.log(f"File skipped according to patterns: {file_path}", level='debug')
+                    self.log("File skipped according to patterns: %s", entry.path, level='debug')
             else:
                 # File with an unprocessed extension
                 self.stats['files_skipped'] += 1
-                self.log(f"File skipped (unprocessed extension): {file_path}", level='debug')
-            return False
-        
-        # Ensure the source directory exists
-        if not os.path.exists(self.source_dir):
-            self.log(f"Source directory {self.source_dir} does not exist.", level='error')
-            return
-            
-        # Perform an exhaustive search for all XML and Python files in the directory
-        xml_files_found = 0
-        py_files_found = 0
-        
-        # First, check each standard Odoo folder
-        for standard_dir in odoo_standard_dirs:
-            standard_path = os.path.join(self.source_dir, standard_dir)
-            if os.path.isdir(standard_path):
-                self.log(f"Checking standard Odoo folder: {standard_dir}", level='info')
-                for root, _, files in os.walk(standard_path):
-                    for file in files:
-                        file_path = os.path.join(root, file)
-                        file_ext = os.path.splitext(file)[1].lower()
-                        if file_ext == '.xml':
-                            xml_files_found += 1
-                        elif file_ext == '.py':
-                            py_files_found += 1
-                        process_file_path(file_path)
-        
-        # Then, go through all other files in the source directory
-        # to find XML or Python files that might be in non-standard locations
-        processed_paths = set()
-        for root, dirs, files in os.walk(self.source_dir):
-            # Check if we're in a standard folder already processed
-            is_standard_subdir = False
-            for standard_dir in odoo_standard_dirs:
-                standard_path = os.path.join(self.source_dir, standard_dir)
-                if root.startswith(standard_path):
-                    is_standard_subdir = True
-                    break
-            
-            # If it's a standard subfolder already processed, skip it
-            if is_standard_subdir:
-                continue
-                
-            # Process files in this folder
-            for file in files:
-                file_path = os.path.join(root, file)
-                
-                # Avoid processing the same file twice
-                if file_path in processed_paths:
-                    continue
-                processed_paths.add(file_path)
-                
-                # Count files by type
-                file_ext = os.path.splitext(file)[1].lower()
-                if file_ext == '.xml':
-                    xml_files_found += 1
-                elif file_ext == '.py':
-                    py_files_found += 1
-                
-                # Add to the processing list if it's a valid type
-                process_file_path(file_path)
+                self.log("File skipped (unprocessed extension): %s", entry.path, level='debug')
         
         # Display statistics on files found
         self.log(f"XML files found: {xml_files_found}", level='info')
         if self.convert_python:
             self.log(f"Python files found: {py_files_found}", level='info')
-        
-        total_files = len(files_to_process)
         self.log(f"Total files found: {total_files_found}", level='info')
+        return entries
+
+    def _list_files(self, files_to_process):
+        """Display the files that will be processed (verbose mode)"""
+        total_files = len(files_to_process)
         self.log(f"Files to process: {total_files}", level='info')
         self.log(f"Files skipped: {self.stats['files_skipped']}", level='info')
-        print(f"🔍 {Fore.CYAN}Found {total_files} file(s) to process{Style.RESET_ALL}")
+        if not self.headless:
+            print(f"🔍 {Fore.CYAN}Found {total_files} file(s) to process{Style.RESET_ALL}")
         
         # Display files that will be processed in verbose mode
         if self.verbose:
             print(f"\n{Fore.CYAN}List of files to process:{Style.RESET_ALL}")
             for i, (file_path, _) in enumerate(files_to_process):
-                rel_path = os.path.relpath(file_path, self.source_dir)
+                rel_path = self._relative_path(file_path)
                 print(f"  {Fore.WHITE}{i+1}. {rel_path}{Style.RESET_ALL}")
             print("")
+
+    def _finish_run(self, total_files):
+        """Display and save the final report"""
+        # Update the total number of files processed
+        self.stats['files_processed'] = total_files
+                
+        # Display the final report
+        self.stats['end_time'] = datetime.now()
+        self.stats['duration'] = (self.stats['end_time'] - self.stats['start_time']).total_seconds()
+        if self.backup_store is not None and self.stats['backups']:
+            self._save_backup_manifest()
+        if self.profiler is not None:
+            self.profiler.dump('main')
+        if self.results is not None:
+            self.results.close({
+                'end_time': self.stats['end_time'].isoformat(),
+                'duration': self.stats['duration'],
+                'files_skipped': self.stats['files_skipped']
+            })
+            self.results = None
+        if self.patch is not None:
+            try:
+                count = self.patch.close()
+                self.log("Patch of %d file(s) written to %s", count, self.patch_file, level='success')
+            except Exception as e:
+                self.log(f"Error while writing the patch {self.patch_file}: {str(e)}", level='error')
+            self.patch = None
+        if self.quiet:
+            self.print_summary()
+            if self.profiler is not None:
+                self.show_profile()
+        else:
+            self.print_report()
+        
+        # Save the report if requested
+        if self.report_file:
+            self.save_report()
+            
+        # Remind limitations at the end (if not overcome)
+        if not self.headless and not self.convert_python and not self.advanced_conditions:
+            self.show_limitations()
+
+    def _relative_path(self, file_path):
+        """Path of a file relative to the source directory (or addons path) holding it"""
+        for root in self.roots:
+            if file_path == root or file_path.startswith(root + os.sep):
+                return os.path.relpath(file_path, root)
+        return os.path.relpath(file_path, self.source_dir)
+
+    def convert_all(self):
+        """Go through all files and apply conversions"""
+        all_extensions = self._start_run()
+        entries = self._discover(all_extensions)
+        if entries is None:
+            return
+        files_to_process = [(entry.path, entry.ext) for entry in entries]
+        total_files = len(files_to_process)
+        self._list_files(files_to_process)
+        
+        # Test mode converts the files all the same, only nothing is written
+        if self.dry_run and not self.headless:
+            print(f"\n{Fore.YELLOW}Test mode enabled - no changes will be applied{Style.RESET_ALL}")
+            
+        # File processing
+        self._open_results()
+        progress = ProgressReporter(total_files, enabled=not self.headless)
+        giant = [(entry.path, entry.ext) for entry in entries if self._splits(entry)]
+        if self.workers > 1 and (total_files > 1 or giant):
+            if not self.headless:
+                print(f"⚙️ {Fore.CYAN}Parallel processing with {self.workers} workers{Style.RESET_ALL}")
+                if giant:
+                    print(f"✂️ {Fore.CYAN}Splitting {len(giant)} large file(s) across the workers{Style.RESET_ALL}")
+            self._process_parallel(files_to_process, progress, giant)
+        else:
+            if not self.headless:
+                print(f"⚙️ {Fore.CYAN}Sequential file processing{Style.RESET_ALL}")
+            self.update_stats(self._profiled(self._pipeline().run, files_to_process, progress.update))
+        progress.finish()
+        
+        self._finish_run(total_files)
+
+    def convert_batch(self):
+        """Convert every Odoo module found in the addons paths
+
+        Modules are detected by their manifest and deduplicated by real path
+        (a module symlinked into several addons paths is converted once).
+        Whole modules are scheduled on the workers, largest first, so that
+        the files of a module are converted by the same worker; a failing
+        module is reported without stopping the rest of the batch.
+        """
+        all_extensions = self._start_run()
+        entries = self._discover(all_extensions)
+        if entries is None:
+            return
+        
+        # Group the files by owning module
+        modules = {}
+        outside = 0
+        for entry in entries:
+            if entry.module is None:
+                outside += 1
+                continue
+            key = os.path.realpath(entry.module)
+            if key not in modules:
+                modules[key] = {'name': os.path.basename(entry.module), 'files': [], 'size': 0}
+            modules[key]['files'].append((entry.path, entry.ext))
+            modules[key]['size'] += entry.size
+        if outside:
+            self.stats['files_skipped'] += outside
+            self.log(f"Files outside of any module skipped: {outside}", level='info')
+        
+        files_to_process = [file for module in modules.values() for file in module['files']]
+        total_files = len(files_to_process)
+        self._list_files(files_to_process)
+        if not self.headless:
+            print(f"📦 {Fore.CYAN}Found {len(modules)} module(s) in {len(self.roots)} addons path(s){Style.RESET_ALL}")
+        
+        if self.dry_run and not self.headless:
+            print(f"\n{Fore.YELLOW}Test mode enabled - no changes will be applied{Style.RESET_ALL}")
+        
+        # Largest modules first, so that they do not set the end of the run
+        order = sorted(modules, key=lambda key: modules[key]['size'], reverse=True)
+        self._open_results()
+        progress = ProgressReporter(total_files, enabled=not self.headless)
+        if self.workers > 1 and len(modules) > 1:
+            if not self.headless:
+                print(f"⚙️ {Fore.CYAN}Parallel processing of modules with {self.workers} workers{Style.RESET_ALL}")
+            self._process_modules_parallel(order, modules, progress)
+        else:
+            if not self.headless:
+                print(f"⚙️ {Fore.CYAN}Sequential module processing{Style.RESET_ALL}")
+            done_files = 0
+            for key in order:
+                self._record_module(modules[key], *self._convert_module(key, modules[key]['files']))
+                done_files += len(modules[key]['files'])
+                progress.update(done_files)
+        progress.finish()
+        
+        self._finish_run(total_files)
+
+    def convert_staged(self):
+        """Convert the files staged in the git index of the source trees
+
+        Only the staged additions and modifications are considered: their
+        blobs are read from the object database by a single git cat-file,
+        converted in memory, written back as new blobs and staged in place of
+        the originals (which stay in the object database). The working copy
+        of a file is updated too when it holds the staged content; partially
+        staged files keep their working copy. In test mode the files are
+        converted, counted and diffed (--patch) but nothing is written.
+        """
+        all_extensions = self._start_run()
+        try:
+            repo = GitRepository(self.roots[0])
+            staged = repo.staged_files(self.roots)
+        except Exception as e:
+            self.log(f"Cannot read the git index: {str(e)}", level='error')
+            return
+        entries = []
+        for mode, blob_id, path in staged:
+            ext = os.path.splitext(path)[1].lower()
+            if ext in all_extensions and not self.should_skip_file(path):
+                entries.append((mode, blob_id, path, ext))
+            else:
+                self.stats['files_skipped'] += 1
+        total_files = len(entries)
+        self._list_files([(path, ext) for _, _, path, ext in entries])
+        
+        if self.dry_run and not self.headless:
+            print(f"\n{Fore.YELLOW}Test mode enabled - no changes will be applied{Style.RESET_ALL}")
+        
+        self._open_results()
+        try:
+            blobs = repo.read_blobs(blob_id for _, blob_id, _, _ in entries)
+        except Exception as e:
+            self.log(f"Cannot read the staged files: {str(e)}", level='error')
+            self.stats['files_error'] += total_files
+            self._finish_run(total_files)
+            return
+        changed = []
+        for mode, blob_id, path, ext in entries:
+            start_time = time.perf_counter()
+            job = FileJob(path, 'python' if ext == '.py' else 'xml', self._empty_file_stats())
+            try:
+                job.content = blobs.pop(blob_id).decode('utf-8').replace('\r\n', '\n').replace('\r', '\n')
+            except Exception as e:
+                self._stage_error(job, e)
+            self._transform_stage(job)
+            job.elapsed = time.perf_counter() - start_time
+            if job.content is not None and job.new_content != job.content:
+                job.stats['files_changed'] = 1
+                self._record_patch(job)
+                if self.dry_run:
+                    self.log("Would be updated: %s", path, level='info')
+                else:
+                    # Written with the other converted files below
+                    changed.append((mode, blob_id, job))
+                    continue
+            self._record_result(job)
+            self.update_stats(job.stats)
+        
+        # The converted blobs are written by a single git process
+        contents = [job.new_content.encode('utf-8') for _, _, job in changed]
+        try:
+            new_ids = repo.write_blobs(contents)
+        except Exception as e:
+            self.log(f"Cannot write the converted files to git: {str(e)}", level='error')
+            new_ids = [None] * len(changed)
+        updates = []
+        for (mode, blob_id, job), data, new_id in zip(changed, contents, new_ids):
+            if new_id is None:
+                job.stats['files_changed'] = 0
+                job.stats['files_error'] = 1
+                job.error = "converted content not written"
+            else:
+                updates.append((mode, new_id, job.path))
+                try:
+                    # The working copy follows when it holds the staged content
+                    try:
+                        with open(job.path, 'rb') as f:
+                            in_sync = repo.blob_id(f.read()) == blob_id
+                    except OSError:
+                        in_sync = False
+                    if in_sync:
+                        with open(job.path, 'wb') as f:
+                            f.write(data)
+                    self.log("Staged file updated: %s%s", job.path, "" if in_sync else " (working copy left unchanged)",
+                             level='success')
+                except Exception as e:
+                    self._stage_error(job, e)
+            self._record_result(job)
+            self.update_stats(job.stats)
+        
+        try:
+            repo.update_index(updates)
+        except Exception as e:
+            self.log(f"Cannot update the git index: {str(e)}", level='error')
+            self.stats['files_error'] += len(updates)
+        self._finish_run(total_files)
+
+    def convert_refs(self, refs, prefix=REFS_PREFIX):
+        """Convert the trees of git refs (or of each commit of ranges) into new commits
+
+        The files of all the commits are listed first and each distinct blob
+        is converted once, across the pool: converting many branches costs
+        about the same as converting the union of their distinct files. Each
+        commit with changes gets a child commit holding its converted tree,
+        pointed to by <prefix><name> (refs/odoo18/heads/main for main). The
+        branches, the index and the working tree are left untouched. In test
+        mode the blobs are converted and the changes reported per ref, but
+        nothing is written to the repository.
+        """
+        all_extensions = self._start_run()
+        try:
+            repo = GitRepository(self.roots[0])
+            commits = repo.resolve_refs(refs)
+            trees = []
+            blobs = {}
+            for name, commit in commits:
+                files = []
+                for mode, blob_id, path in repo.list_tree(commit, self.roots):
+                    ext = os.path.splitext(path)[1].lower()
+                    if ext in all_extensions and not self.should_skip_file(path):
+                        # The same content can be a Python and an XML file: it is converted once per kind
+                        key = (blob_id, 'python' if ext == '.py' else 'xml')
+                        files.append((mode, key, path))
+                        blobs.setdefault(key, path)
+                trees.append((name, commit, files))
+        except Exception as e:
+            self.log(f"Cannot list the files of {', '.join(refs)}: {str(e)}", level='error')
+            self._finish_run(0)
+            return
+        total_files = sum(len(files) for _, _, files in trees)
+        if not self.headless:
+            print(f"🌿 {Fore.CYAN}{len(trees)} commit(s), {total_files} file(s), "
+                  f"{len(blobs)} distinct blob(s) to convert{Style.RESET_ALL}")
+            if self.dry_run:
+                print(f"\n{Fore.YELLOW}Test mode enabled - no changes will be applied{Style.RESET_ALL}")
+        
+        try:
+            if self.workers > 1 and len(blobs) > 1:
+                with self._worker_pool() as executor:
+                    converted = self._convert_blobs(repo, blobs, executor)
+            else:
+                converted = self._convert_blobs(repo, blobs)
+        except Exception as e:
+            self.log(f"Cannot convert the blobs: {str(e)}", level='error')
+            self._finish_run(len(blobs))
+            return
+        
+        # One commit per converted tree, and the refs updated at once
+        updates = []
+        for name, commit, files in trees:
+            entries = [(mode, converted[key], path) for mode, key, path in files if key in converted]
+            if not entries:
+                self.log("Unchanged: %s (%s)", name, commit[:12], level='info')
+                continue
+            if self.dry_run:
+                self.log("Would be converted: %s -> %s%s (%d file(s))", name, prefix, name, len(entries),
+                         level='info')
+                continue
+            try:
+                tree = repo.write_tree(commit, entries)
+                new_commit = repo.commit_tree(tree, commit, (
+                    f"Convert to Odoo 18 syntax\n\n"
+                    f"{len(entries)} file(s) converted by odoo18_converter {__version__}.\n"))
+            except Exception as e:
+                self.log(f"Cannot commit the conversion of {name}: {str(e)}", level='error')
+                continue
+            updates.append((prefix + name, new_commit))
+            self.log("Converted: %s -> %s%s (%d file(s), %s)", name, prefix, name, len(entries), new_commit[:12],
+                     level='success')
+        try:
+            repo.update_refs(updates)
+        except Exception as e:
+            self.log(f"Cannot update the refs: {str(e)}", level='error')
+        self._finish_run(len(blobs))
+
+    def _convert_blobs(self, repo, blobs, executor=None):
+        """Convert distinct blobs ({(blob id, kind): path}), return {(blob id, kind): converted blob id} of the changed ones
+
+        In test mode nothing is written to the object database and the
+        converted blob ids are None.
+        """
+        converted = {}
+        keys = list(blobs)
+        for start in range(0, len(keys), BLOB_BATCH_SIZE):
+            batch = keys[start:start + BLOB_BATCH_SIZE]
+            contents = repo.read_blobs(blob_id for blob_id, _ in batch)
+            items = []
+            for key in batch:
+                blob_id, kind = key
+                try:
+                    items.append((key, contents[blob_id].decode('utf-8')))
+                except UnicodeDecodeError as e:
+                    self.log(f"Error while reading {blobs[key]} ({blob_id[:12]}): {str(e)}", level='error')
+                    self.stats['files_error'] += 1
+            if executor is None:
+                results = [self.convert_text(content, kind) for (_, kind), content in items]
+            else:
+                chunks = [[(content, kind) for (_, kind), content in items[i:i + MAX_CHUNK_SIZE]]
+                          for i in range(0, len(items), MAX_CHUNK_SIZE)]
+                results = [result for chunk in executor.map(_convert_texts, chunks) for result in chunk]
+            written = []
+            for (key, _), result in zip(items, results):
+                path = blobs[key]
+                if result.error:
+                    self.log(f"Error while converting {path} ({key[0][:12]}): {result.error}", level='error')
+                    self.stats['files_error'] += 1
+                    continue
+                merge_stats(self.stats, {'changes': result.changes})
+                if result.changed:
+                    written.append((key, result.content.encode('utf-8')))
+                    self.stats['files_changed'] += 1
+                    self.log("Blob converted: %s (%s)", path, key[0][:12], level='debug')
+            if self.dry_run:
+                converted.update((key, None) for key, _ in written)
+                continue
+            # One git process writes the converted blobs of the batch
+            for (key, _), new_id in zip(written, repo.write_blobs(data for _, data in written)):
+                converted[key] = new_id
+        return converted
+
+    def watch(self, debounce=0.05, poll=False, poll_interval=0.5):
+        """Reconvert the files of the source trees as they are saved, until interrupted
+
+        Meant to follow a complete conversion: the converter stays warm (rule
+        engines, compiled domains, prefilter literals) and only the saved
+        files go through the pipeline, each burst of events being debounced
+        into one batch. inotify is used on Linux, polling elsewhere.
+        """
+        extensions = self._extensions()
+        watcher = None
+        if not poll:
+            try:
+                watcher = InotifyWatcher(self.roots, scan_workers=self.scan_workers)
+            except Exception as e:
+                self.log("inotify unavailable, polling the source trees instead: %s", e, level='warning')
+        if watcher is None:
+            watcher = PollingWatcher(self.roots, interval=poll_interval, scan_workers=self.scan_workers)
+        print(f"\n👀 {Fore.CYAN}Watching {', '.join(self.roots)} for changes (Ctrl+C to stop){Style.RESET_ALL}")
+        
+        session = self._empty_file_stats(files_processed=0)
+        batches = 0
+        pipeline = self._pipeline()
+        try:
+            while True:
+                changed = watcher.wait()
+                if not changed:
+                    continue
+                # Debounce: collect the burst of events until the tree is quiet
+                while True:
+                    more = watcher.wait(debounce)
+                    if not more:
+                        break
+                    changed |= more
+                files = self._watched_files(changed, extensions)
+                if not files:
+                    continue
+                start = time.perf_counter()
+                stats = pipeline.run(files)
+                elapsed = time.perf_counter() - start
+                self.update_stats(stats)
+                merge_stats(session, stats)
+                batches += 1
+                if self.backup_store is not None and stats['backups']:
+                    self._save_backup_manifest()
+                self._report_watch_batch(stats, elapsed)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            watcher.close()
+        
+        changes = ', '.join(f"{key}: {count}" for key, count in session['changes'].items() if count)
+        print(f"\n{Fore.CYAN}Watch stopped: {batches} batch(es), {session['files_processed']} file(s) checked, "
+              f"{session['files_changed']} converted, {session['files_error']} error(s){Style.RESET_ALL}")
+        if changes:
+            print(f"{Fore.CYAN}   {changes}{Style.RESET_ALL}")
+        if self.backup_store is not None and self.stats['backups']:
+            print(f"{Fore.CYAN}   Restore them with: python odoo18_converter.py rollback {self.run_id} --backup-dir {self.backup_store.store_dir}{Style.RESET_ALL}")
+        return session
+
+    def _watched_files(self, paths, extensions):
+        """(path, extension) of the changed paths that are files to convert"""
+        output_dir = os.path.abspath(self.output_dir) + os.sep if self.output_dir else None
+        files = []
+        for path in sorted(paths):
+            ext = os.path.splitext(path)[1].lower()
+            if ext not in extensions or os.path.basename(path).startswith('.tmp-'):
+                continue
+            if output_dir and path.startswith(output_dir):
+                continue
+            if any(part in FileIndex.IGNORED_DIRS for part in path.split(os.sep)):
+                continue
+            if os.path.isfile(path) and not self.should_skip_file(path):
+                files.append((path, ext))
+        return files
+
+    def _report_watch_batch(self, stats, elapsed):
+        """Display the result of a batch of the watch mode"""
+        if not stats['files_changed'] and not stats['files_error']:
+            # Files saved without legacy constructs (including our own writes)
+            return
+        changes = ', '.join(f"{key}: {count}" for key, count in stats['changes'].items() if count)
+        color = Fore.RED if stats['files_error'] else Fore.GREEN
+        print(f"🔁 {color}{stats['files_changed']} file(s) converted, {stats['files_error']} error(s) "
+              f"in {elapsed * 1000:.0f} ms{Style.RESET_ALL}{f' ({changes})' if changes else ''}")
+
+    def _convert_module(self, key, files):
+        """Convert the files of a module, return (key, statistics, duration, error)"""
+        start = time.perf_counter()
+        stats = self._empty_file_stats(files_processed=0)
+        error = None
+        try:
+            stats = self._profiled(self._pipeline().run, files)
+        except Exception as e:
+            error = str(e)
+        return key, stats, time.perf_counter() - start, error
+
+    def _record_module(self, module, key, stats, duration, error):
+        """Merge the result of a module into the statistics and keep its sub-report"""
+        if stats is None:
+            # The module could not be converted at all
+            stats = self._empty_file_stats(files_processed=0)
+            stats['files_error'] = len(module['files'])
+        if error:
+            self.log(f"Error converting module {module['name']}: {error}", level='error')
+        self.update_stats(stats)
+        self.module_stats[module['name'] if module['name'] not in self.module_stats else key] = {
+            'path': key,
+            'files': len(module['files']),
+            'files_changed': stats['files_changed'],
+            'files_error': stats['files_error'],
+            'changes': stats['changes'],
+            'duration_seconds': duration,
+            'error': error
+        }
+
+    def _process_modules_parallel(self, order, modules, progress):
+        """Convert whole modules in the worker pool, merging each module as it completes
+
+        If a worker process dies, the whole pool is broken: the modules that
+        were not completed are then retried one at a time in a pool of their
+        own, so that only the module killing its worker is reported as failed.
+        """
+        done_files = 0
+        
+        def record(key, result):
+            nonlocal done_files
+            self._record_module(modules[key], *result)
+            done_files += len(modules[key]['files'])
+            progress.update(done_files)
+        
+        broken = []
+        with self._worker_pool() as executor:
+            futures = {executor.submit(_convert_module_task, key, modules[key]['files']): key for key in order}
+            for future in concurrent.futures.as_completed(futures):
+                key = futures[future]
+                try:
+                    record(key, future.result())
+                except concurrent.futures.process.BrokenProcessPool:
+                    broken.append(key)
+                except Exception as e:
+                    record(key, (key, None, 0.0, str(e)))
+        
+        if broken:
+            self.log(f"Worker process terminated abruptly, retrying {len(broken)} module(s) one at a time", level='warning')
+        for key in broken:
+            with self._worker_pool(workers=1) as executor:
+                try:
+                    record(key, executor.submit(_convert_module_task, key, modules[key]['files']).result())
+                except concurrent.futures.process.BrokenProcessPool:
+                    record(key, (key, None, 0.0, "worker process terminated abruptly"))
+                except Exception as e:
+                    record(key, (key, None, 0.0, str(e)))
+
+    def _worker_options(self):
+        """Constructor arguments of the converters of the pool workers"""
+        return {
+            'source_dir': self.source_dir,
+            'output_dir': self.output_dir,
+            'backup': self.backup,
+            'verbose': self.verbose,
+            'extensions': self.extensions,
+            'skip_patterns': self.skip_patterns,
+            'dry_run': self.dry_run,
+            'interactive': self.interactive,
+            'convert_python': self.convert_python,
+            'advanced_conditions': self.advanced_conditions,
+            'legacy_engine': self.legacy_engine,
+            'registry': self.registry if self.registry is not RULES else None,
+            'cache_dir': self.cache_dir,
+            'cache_max_size': self.cache_max_size,
+            'prefilter': self.prefilter,
+            'addons_paths': self.addons_paths,
+            'io_threads': self.io_threads,
+            'backup_dir': self.backup_store.store_dir if self.backup_store else None,
+            'domain_cache_size': self.domain_cache_size,
+            'profile': self.profile,
+            'profile_dir': self.profile_dir,
+            'results_file': self.results_file,
+            'patch_file': self.patch_file,
+            'stream_threshold': self.stream_threshold,
+            'split_threshold': self.split_threshold
+        }
+
+    def _iter_chunks(self, files):
+        """Split the files into chunks, large at first and smaller towards the end
+
+        Guided scheduling: each chunk holds a fraction of the remaining files,
+        which keeps IPC round trips low while balancing the end of the run.
+        """
+        position = 0
+        while position < len(files):
+            remaining = len(files) - position
+            size = max(1, min(MAX_CHUNK_SIZE, remaining // (self.workers * 4)))
+            yield files[position:position + size]
+            position += size
+
+
+    @contextlib.contextmanager
+    def _worker_pool(self, workers=None):
+        """Pool of worker processes, each building its converter once
+
+        The log records of the workers are sent through a queue to a listener
+        thread of this process, which hands them to the handlers of the
+        logger: workers never write to the console or the log file themselves.
+        """
+        # Fork is cheaper than spawn; freezing the objects of the parent keeps
+        # the garbage collector from touching (and copying) their memory pages
+        context = None
+        frozen = False
+        if sys.platform.startswith('linux') and 'fork' in multiprocessing.get_all_start_methods():
+            context = multiprocessing.get_context('fork')
+            if hasattr(gc, 'freeze'):
+                gc.freeze()
+                frozen = True
+        log_queue = (context or multiprocessing).Queue()
+        import logging.handlers
+        listener = logging.handlers.QueueListener(log_queue, *self._log_handlers(), respect_handler_level=True)
+        listener.start()
+        try:
+            with concurrent.futures.ProcessPoolExecutor(
+                    max_workers=workers or self.workers, mp_context=context, initializer=_init_worker,
+                    initargs=(self._worker_options(), log_queue, logger.getEffectiveLevel())) as executor:
+                yield executor
+        finally:
+            listener.stop()
+            if frozen:
+                gc.unfreeze()
+
+    @staticmethod
+    def _log_handlers():
+        """Handlers receiving the records of the logger, including those of its ancestors"""
+        handlers = []
+        current = logger
+        while current is not None:
+            handlers.extend(current.handlers)
+            current = current.parent if current.propagate else None
+        return handlers
+
+    def _splits(self, entry):
+        """Whether a file is split across the pool in a parallel run"""
+        return (self.workers > 1 and self.split_threshold and entry.ext == '.xml' and not self.legacy_engine
+                and entry.size >= self.split_threshold
+                and not (self.stream_threshold and entry.size >= self.stream_threshold))
+
+    def _process_parallel(self, files_to_process, progress, giant=()):
+        """Process files in a pool of worker processes, merging results as they complete
+
+        The giant files are read by this process, split at top-level element
+        boundaries and their windows submitted first, so that all the
+        workers share them; each file is reassembled in order once all its
+        windows are converted. The other files are sent in chunks.
         
-        if self.dry_run:
-            print(f"\n{Fore.YELLOW}Test mode enabled - no changes will be applied{Style.RESET_ALL}")
-            return
+        If a worker process dies, the whole pool is broken: the files of the
+        chunks that were not completed are then retried one at a time in a
+        pool of their own, so that only the file killing its worker is
+        reported as failed.
+        """
+        giant_files = set(giant)
+        files_to_process = [file for file in files_to_process if file not in giant_files]
+        done_files = 0
+        # Chunks lost with a broken pool
+        broken = []
+        with self._worker_pool() as executor:
+            chunks = self._iter_chunks(files_to_process)
+            running = set()
+            # Future of a chunk of files -> the chunk
+            submitted = {}
+            # Future of a batch of windows -> [job, pieces, batches left, start time], indexes of the pieces
+            windows = {}
             
-        # File processing
-        if self.workers > 1 and total_files > 1:
-            print(f"⚙️ {Fore.CYAN}Parallel processing with {self.workers} workers{Style.RESET_ALL}")
-            with concurrent.futures.ProcessPoolExecutor(max_workers=self.workers) as executor:
-                results = list(executor.map(self._process_file_wrapper, files_to_process))
+            def submit_next():
+                chunk = next(chunks, None)
+                if chunk:
+                    try:
+                        future = executor.submit(_convert_chunk, chunk)
+                    except concurrent.futures.process.BrokenProcessPool:
+                        broken.append(chunk)
+                        return
+                    submitted[future] = chunk
+                    running.add(future)
+            
+            def finish_split(split):
+                nonlocal done_files
+                job, pieces, _, start = split
+                if not job.stats['changes'].get('chatter_simplified'):
+                    # No chatter matched the regular expressions in the whole file
+                    pieces = [self._chatter_fallback_window(piece, job.stats['changes'])
+                              if '<div class="oe_chatter">' in piece else piece for piece in pieces]
+                job.new_content = ''.join(pieces)
+                job.elapsed += time.perf_counter() - start
+                self._write_stage(job)
+                self._record_result(job)
+                self.update_stats(job.stats)
+                done_files += 1
+                progress.update(done_files)
             
-            # Update statistics
-            for result in results:
-                if result:
+            # Windows of the largest files first, so that they do not set the end of the run
+            for file in sorted(giant, key=lambda file: os.path.getsize(file[0]), reverse=True):
+                job = self._read_stage(*file)
+                if job.content is None:
+                    # Skipped by the prefilter, or unreadable
+                    self._record_result(job)
+                    self.update_stats(job.stats)
+                    done_files += 1
+                    continue
+                window_size = max(MIN_SPLIT_WINDOW_SIZE, len(job.content) // (self.workers * 4))
+                splitter = XmlRecordSplitter(window_size)
+                parts = splitter.feed(job.content) + splitter.close()
+                split = [job, [text for _, text in parts], 0, time.perf_counter()]
+                # Windows cut short by container tags are batched up to the window size
+                batch = []
+                size = 0
+                for index, (convertible, text) in enumerate(parts + [(True, None)]):
+                    if text is not None and not convertible:
+                        continue
+                    if batch and (text is None or size >= window_size):
+                        future = executor.submit(_convert_windows, [split[1][i] for i in batch])
+                        windows[future] = (split, batch)
+                        running.add(future)
+                        split[2] += 1
+                        batch = []
+                        size = 0
+                    if text is not None:
+                        batch.append(index)
+                        size += len(text)
+                if split[2] == 0:
+                    finish_split(split)
+            
+            # Keep a bounded number of chunks in flight
+            for _ in range(self.workers * 2):
+                submit_next()
+            while running:
+                done, running = concurrent.futures.wait(running, return_when=concurrent.futures.FIRST_COMPLETED)
+                for future in done:
+                    if future in windows:
+                        split, indexes = windows.pop(future)
+                        try:
+                            converted, stats = future.result()
+                            for index, text in zip(indexes, converted):
+                                split[1][index] = text
+                            self._merge_worker_stats(split[0].stats, stats)
+                        except Exception as e:
+                            self._stage_error(split[0], e)
+                        split[2] -= 1
+                        if split[2] == 0:
+                            finish_split(split)
+                        continue
+                    chunk = submitted.pop(future)
+                    try:
+                        count, result = future.result()
+                    except concurrent.futures.process.BrokenProcessPool:
+                        broken.append(chunk)
+                        continue
+                    except Exception as e:
+                        for file in chunk:
+                            self._record_failure(file, e)
+                        count, result = len(chunk), None
                     self.update_stats(result)
-        else:
-            print(f"⚙️ {Fore.CYAN}Sequential file processing{Style.RESET_ALL}")
-            for i, (file_path, file_ext) in enumerate(files_to_process):
-                progress = f"[{i+1}/{total_files}]"
-                print(f"{progress} Processing {file_path}...", end="\r")
-                result = self._process_file(file_path, file_ext)
-                self.update_stats(result)
-                
-        # Update the total number of files processed
-        self.stats['files_processed'] = total_files
-                
-        # Display the final report
-        self.stats['end_time'] = datetime.now()
-        self.stats['duration'] = (self.stats['end_time'] - self.stats['start_time']).total_seconds()
-        self.print_report()
+                    done_files += count
+                    progress.update(done_files)
+                    submit_next()
+            # Nothing more can be submitted to a broken pool
+            if broken:
+                broken.extend(chunks)
         
-        # Save the report if requested
-        if self.report_file:
-            self.save_report()
-            
-        # Remind limitations at the end (if not overcome)
-        if not self.convert_python and not self.advanced_conditions:
-            self.show_limitations()
-    
-    def _process_file_wrapper(self, args):
-        """Wrapper to allow use with map() in parallel"""
-        file_path, file_ext = args
-        return self._process_file(file_path, file_ext)
+        files = [file for chunk in broken for file in chunk]
+        if files:
+            self.log(f"Worker process terminated abruptly, retrying {len(files)} file(s) one at a time",
+                     level='warning')
+        while files:
+            with self._worker_pool(workers=1) as executor:
+                while files:
+                    file = files.pop(0)
+                    try:
+                        count, result = executor.submit(_convert_chunk, [file]).result()
+                        self.update_stats(result)
+                    except concurrent.futures.process.BrokenProcessPool:
+                        self._record_failure(file, "worker process terminated abruptly")
+                        # A new pool for the next files
+                        break
+                    except Exception as e:
+                        self._record_failure(file, e)
+                    finally:
+                        done_files += 1
+                        progress.update(done_files)
         
+    def _record_failure(self, file, error):
+        """Record a file whose conversion in a pool worker failed altogether"""
+        file_path, file_ext = file
+        job = FileJob(file_path, 'python' if file_ext == '.py' else 'xml', self._empty_file_stats())
+        self._stage_error(job, error)
+        self._record_result(job)
+        self.update_stats(job.stats)
+
+    def _profiled(self, function, *args):
+        """Call a function under the cProfile profiler of this process, when dumps are requested"""
+        if self.profiler is None:
+            return function(*args)
+        self.profiler.enable()
+        try:
+            return function(*args)
+        finally:
+            self.profiler.disable()
+
+    def _worker_result(self, stats):
+        """Attach the measurements and file results of a pool worker to its result"""
+        if stats is None:
+            return stats
+        if self.profiler is not None:
+            stats['profile'] = self.profiler.collect()
+            self.profiler.dump('worker')
+        if self.results is not None:
+            stats['results'] = self.results
+            self.results = []
+        if self.patch is not None:
+            stats['patch'] = self.patch
+            self.patch = []
+        return stats
+
+    def _convert_windows(self, windows):
+        """Convert windows of a split file, return them with their statistics"""
+        stats = self._empty_file_stats(files_processed=0)
+        hits, misses = self.domains.hits, self.domains.misses
+        converted = [self._convert_window(text, stats['changes']) for text in windows]
+        stats['domains']['hits'] = self.domains.hits - hits
+        stats['domains']['misses'] = self.domains.misses - misses
+        return converted, self._worker_result(stats)
+
+    def _convert_window(self, text, changes):
+        """Convert a window of a split or streamed XML file, adding its counts to changes
+
+        Each window has counters of its own, so that its conversion does not
+        depend on what the windows before it counted. The lxml chatter
+        fallback only applies to a file where the regular expressions
+        simplified no chatter at all, which cannot be known from one window:
+        it is held back (its counter starts at 1) and applied with
+        _chatter_fallback_window() once the whole file is converted.
+        """
+        counters = self.registry.empty_counters()
+        held = 'chatter_simplified' in counters
+        if held:
+            counters['chatter_simplified'] = 1
+        text = self.registry.run(self, 'xml', text, counters)
+        if held:
+            counters['chatter_simplified'] -= 1
+        for key, count in counters.items():
+            if count:
+                changes[key] = changes.get(key, 0) + count
+        return text
+
+    def _chatter_fallback_window(self, text, changes):
+        """Apply the chatter fallback held back by _convert_window() to a converted window"""
+        if 'chatter_simplified' not in changes:
+            return text
+        counters = {'chatter_simplified': 0}
+        doc = DocumentContext(text)
+        self._apply_chatter_fallback(doc, counters)
+        changes['chatter_simplified'] += counters['chatter_simplified']
+        return doc.serialize()
+
+    def _open_results(self):
+        """Start the stream of the per-file results and the patch"""
+        if self.patch_file:
+            self.patch = PatchWriter(self.patch_file)
+        if not self.results_file:
+            return
+        self.results = ResultsStream(self.results_file)
+        self.results.start({
+            'version': __version__,
+            'start_time': self.stats['start_time'].isoformat(),
+            'roots': self.roots,
+            'options': {
+                'convert_python': self.convert_python,
+                'advanced_conditions': self.advanced_conditions,
+                'output_dir': self.output_dir,
+                'workers': self.workers
+            }
+        })
+
+    def _record_patch(self, job):
+        """Add the diff of a changed file to the patch (or to the result of a pool worker)"""
+        if self.patch is None:
+            return
+        path = os.path.relpath(job.path, self.patch_root).replace(os.sep, '/')
+        changes = {key: count for key, count in job.stats['changes'].items() if count}
+        # Streamed files are never held in memory: they are only listed
+        diff = None if job.stream else PatchWriter.diff(path, job.content, job.new_content)
+        self.patch.append((path, diff, changes))
+
+    def _record_result(self, job):
+        """Add the result of a file to the results stream (or to the result of a pool worker)"""
+        if self.results is None:
+            return
+        stats = job.stats
+        prefilter = stats['prefilter']
+        if job.error is not None:
+            status = 'error'
+        elif prefilter['skipped']:
+            status = 'skipped'
+        elif stats['files_changed']:
+            status = 'changed'
+        else:
+            status = 'unchanged'
+        bytes_in = prefilter['processed_bytes'] + prefilter['skipped_bytes']
+        if not bytes_in and job.content is not None:
+            bytes_in = len(job.content.encode('utf-8'))
+        record = {
+            'type': 'file',
+            'path': job.path,
+            'kind': job.kind,
+            'status': status,
+            'changes': {key: count for key, count in stats['changes'].items() if count},
+            'bytes_in': bytes_in,
+            'bytes_out': bytes_in if status != 'changed' else
+                         job.output_size if job.stream else len(job.new_content.encode('utf-8')),
+            'duration': round(job.elapsed, 6),
+            'cache_hit': bool(stats['cache']['hits'])
+        }
+        if job.error is not None:
+            record['error'] = job.error
+        self.results.append(record)
+
     def _process_file(self, file_path, file_ext):
         """Process a file according to its extension"""
-        if file_ext == '.py':
-            return self.convert_python_file(file_path)
-        else:
-            return self.convert_file(file_path)
+        return self._convert_path(file_path, file_ext)
 
     def show_advanced_features(self):
         """Display enabled advanced features"""
@@ -531,175 +4077,441 @@ class Odoo18Converter:
         message += f"{Style.RESET_ALL}\n"
         print(message)
 
-    def convert_python_file(self, file_path):
-        """Convert a Python file for Odoo 18"""
-        file_stats = {
-            'files_processed': 1,
+    def _empty_file_stats(self, files_processed=1):
+        """Statistics of the conversion of one file (or of a chunk of files)"""
+        return {
+            'files_processed': files_processed,
             'files_changed': 0,
             'files_error': 0,
-            'changes': {
-                'tree_to_list': 0,
-                'attrs_conversion': 0,
-                'states_conversion': 0,
-                'daterange_update': 0,
-                'chatter_simplified': 0,
-                'settings_structure': 0,
-                'python_states_removed': 0,
-                'complex_conditions': 0
+            'changes': self.registry.empty_counters(),
+            'cache': {
+                'hits': 0,
+                'misses': 0
+            },
+            'prefilter': self._empty_prefilter_stats(),
+            'pipeline': ConversionPipeline.empty_stats(),
+            'backups': [],
+            'domains': {
+                'hits': 0,
+                'misses': 0
             }
         }
-        
-        try:
-            # Determine output path
-            if self.output_dir:
-                rel_path = os.path.relpath(file_path, self.source_dir)
-                out_path = os.path.join(self.output_dir, rel_path)
-                os.makedirs(os.path.dirname(out_path), exist_ok=True)
-            else:
-                out_path = file_path
-                
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-            
-            # Backup original file if requested
-            if self.backup and not self.dry_run and self.output_dir is None:
-                backup_path = f"{file_path}.bak"
-                shutil.copy2(file_path, backup_path)
-            
-            # Analyze and modify Python code
-            new_content, state_changes = self.process_python_code(content)
-            file_stats['changes']['python_states_removed'] = state_changes
-            
-            # If changes were made, save the file
-            if new_content != content:
-                file_stats['files_changed'] = 1
-                if not self.dry_run:
-                    with open(out_path, 'w', encoding='utf-8') as f:
-                        f.write(new_content)
-                self.log(f"Python file updated: {out_path}", level='success')
-            else:
-                self.log(f"No changes needed in Python file: {file_path}", level='debug')
-                
-            return file_stats
-                
-        except Exception as e:
-            self.log(f"Error processing Python file {file_path}: {str(e)}", level='error')
-            file_stats['files_error'] = 1
-            return file_stats
 
-    def process_python_code(self, content):
-        """Analyze and modify Python code for Odoo 18"""
-        # Counter for changes
-        state_changes = 0
-        
-        # Pattern for states attributes in field definitions
-        states_pattern = r'states\s*=\s*{([^}]*)}'
-        
-        def remove_states_param(match):
-            nonlocal state_changes
-            state_changes += 1
-            # Remove just the states parameter
-            return ""
-        
-        # Replace states attributes in field definitions
-        new_content = re.sub(r',\s*states\s*=\s*{[^}]*}', remove_states_param, content)
+    @staticmethod
+    def _empty_prefilter_stats():
+        """Counters of the byte-level prefilter"""
+        return {
+            'skipped': 0,
+            'large_skipped': 0,
+            'skipped_bytes': 0,
+            'scan_time': 0.0,
+            'processed_bytes': 0,
+            'processed_time': 0.0
+        }
+
+    def _needs_conversion(self, file_path, kind, file_stats):
+        """Scan the raw bytes of a file for the trigger literals of its rules
+
+        The file is memory-mapped, so files without any trigger (most files of
+        a migrated code base, large demo/data files) are classified as clean
+        without being read into memory, decoded, backed up or transformed.
+        """
+        if not self.prefilter:
+            return True
+        if kind not in self._byte_triggers:
+            self._byte_triggers[kind] = self.registry.byte_triggers(kind)
+        literals = self._byte_triggers[kind]
+        if literals is None:
+            return True
         
-        # Advanced processing if needed with AST
-        if new_content == content:
-            try:
-                # Parse code with AST
-                tree = ast.parse(content)
-                
-                # TODO: More advanced implementation with AST manipulation
-                # This part would require more in-depth analysis of the syntax tree
-                # to identify field definitions and modify their parameters
-                
-            except Exception as e:
-                self.log(f"Error parsing AST: {str(e)}", level='warning')
+        start = time.perf_counter()
+        with open(file_path, 'rb') as f:
+            size = os.fstat(f.fileno()).st_size
+            if size == 0:
+                found = False
+            else:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                    found = any(mapped.find(literal) != -1 for literal in literals)
+        stats = file_stats['prefilter']
+        stats['scan_time'] += time.perf_counter() - start
         
-        return new_content, state_changes
+        if found:
+            stats['processed_bytes'] += size
+            return True
+        stats['skipped'] = 1
+        stats['skipped_bytes'] = size
+        if size >= LARGE_FILE_SIZE:
+            stats['large_skipped'] = 1
+            self.log("Large file without legacy constructs skipped (%d KB)", size // 1024, level='debug', file_path=file_path)
+        else:
+            self.log("No legacy constructs, file skipped by prefilter", level='debug', file_path=file_path)
+        return False
+
+    def _pipeline(self):
+        """Read/transform/write pipeline of this converter"""
+        return ConversionPipeline(self, readers=self.io_threads)
+
+    def convert_text(self, content, kind='xml', path=None):
+        """Convert a content in memory: no file is read or written, nothing is printed"""
+        start_time = time.perf_counter()
+        job = self._text_job(content, kind, path)
+        return self._job_result(job, time.perf_counter() - start_time)
+
+    def _text_job(self, content, kind, path=None):
+        """Transform a content in memory as the pipeline would transform a file"""
+        job = FileJob(path or '<buffer>', kind, self._empty_file_stats())
+        job.content = content.replace('\r\n', '\n').replace('\r', '\n')
+        self._transform_stage(job)
+        return job
+
+    def _job_result(self, job, duration):
+        """ConversionResult of a job that went through the transform stage"""
+        path = None if job.path == '<buffer>' else job.path
+        if job.error:
+            return ConversionResult(path, job.kind, error=job.error, duration=duration)
+        # Files without trigger literals are not even read
+        content = job.content
+        new_content = content if job.new_content is None else job.new_content
+        changes = {key: count for key, count in job.stats['changes'].items() if count}
+        rules = [rule.id for rule in self.registry.rules.values()
+                 if any(key in changes for key, _, _ in rule.counters)]
+        return ConversionResult(path, job.kind, new_content, content is not None and new_content != content,
+                                changes, rules, duration=duration)
+
+    def convert_python_file(self, file_path):
+        """Convert a Python file for Odoo 18"""
+        return self._convert_path(file_path, '.py')
 
     def convert_file(self, file_path):
         """Convert an XML file"""
-        file_stats = {
-            'files_processed': 1,
-            'files_changed': 0,
-            'files_error': 0,
-            'changes': {
-                'tree_to_list': 0,
-                'attrs_conversion': 0,
-                'states_conversion': 0,
-                'daterange_update': 0,
-                'chatter_simplified': 0,
-                'settings_structure': 0,
-                'python_states_removed': 0,
-                'complex_conditions': 0
-            }
-        }
-        
+        return self._convert_path(file_path, '.xml')
+
+    def _convert_path(self, file_path, file_ext):
+        """Run the read, transform and write stages on a single file"""
+        job = self._read_stage(file_path, file_ext)
+        self._transform_stage(job)
+        self._write_stage(job)
+        return job.stats
+
+    def _stage_error(self, job, e):
+        """Record the failure of a stage on a file"""
+        if job.kind == 'python':
+            self.log(f"Error processing Python file {job.path}: {str(e)}", level='error')
+        else:
+            self.log(f"Error processing {job.path}: {str(e)}", level='error')
+        job.stats['files_error'] = 1
+        job.error = str(e)
+        job.content = None
+
+    def _read_stage(self, file_path, file_ext):
+        """Pipeline stage: prefilter and read a file"""
+        kind = 'python' if file_ext == '.py' else 'xml'
+        job = FileJob(file_path, kind, self._empty_file_stats())
+        try:
+            # Files without any trigger literal are clean
+            if not self._needs_conversion(file_path, kind, job.stats):
+                return job
+            # Very large XML files are read window by window by the transform stage
+            if (kind == 'xml' and self.stream_threshold and not self.legacy_engine
+                    and os.path.getsize(file_path) >= self.stream_threshold):
+                job.stream = True
+                return job
+            start_time = time.perf_counter()
+            with open(file_path, 'rb') as f:
+                # Ask the kernel to read the whole file ahead in large requests
+                if hasattr(os, 'posix_fadvise'):
+                    try:
+                        os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_WILLNEED)
+                    except OSError:
+                        pass
+                raw = f.read()
+            # Decode with universal newlines, like a file opened in text mode
+            job.content = raw.decode('utf-8').replace('\r\n', '\n').replace('\r', '\n')
+            if self.backup_store is not None:
+                job.raw = raw
+            job.elapsed += time.perf_counter() - start_time
+        except Exception as e:
+            self._stage_error(job, e)
+        return job
+
+    def _transform_stage(self, job):
+        """Pipeline stage: apply the rules to the content of a file"""
+        if job.content is None and not job.stream:
+            return
+        try:
+            start_time = time.perf_counter()
+            profiler = self.profiler
+            frame = None if profiler is None else profiler.begin()
+            try:
+                if job.stream:
+                    self._convert_stream(job)
+                else:
+                    job.new_content = self._transform(job.content, job.kind, job.path, job.stats)
+            finally:
+                if frame is not None:
+                    profiler.add_file(job.path, frame)
+            job.elapsed += time.perf_counter() - start_time
+        except Exception as e:
+            self._stage_error(job, e)
+
+    def _convert_stream(self, job):
+        """Convert a very large XML file window by window (streaming mode)
+
+        The file is read and decoded in blocks, split at top-level element
+        boundaries, and each window goes through the rules on its own and is
+        written to a temporary file renamed over the output at the end. The
+        conversion cache is not used for these files.
+        """
+        file_path = job.path
+        out_path = self._output_path(file_path)
+        if self.dry_run:
+            # Test mode: the converted windows are only counted, nothing is written
+            tmp_path = None
+            sink = io.open(os.devnull, 'w', encoding='utf-8')
+        else:
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(out_path), prefix='.tmp-')
+            sink = io.open(fd, 'w', encoding='utf-8')
+        changes = job.stats['changes']
+        hits, misses = self.domains.hits, self.domains.misses
         try:
-            # Determine output path
-            if self.output_dir:
-                rel_path = os.path.relpath(file_path, self.source_dir)
-                out_path = os.path.join(self.output_dir, rel_path)
-                os.makedirs(os.path.dirname(out_path), exist_ok=True)
+            with sink as out:
+                changed, output_size, digest, held_back = self._stream_windows(file_path, out, changes)
+            if held_back and not changes.get('chatter_simplified'):
+                # No chatter matched the regular expressions in the whole file:
+                # its chatters go through the lxml fallback, as they would in a
+                # file converted at once, and the file is converted again
+                for key in changes:
+                    changes[key] = 0
+                with io.open(tmp_path or os.devnull, 'w', encoding='utf-8') as out:
+                    changed, output_size, digest, _ = self._stream_windows(file_path, out, changes,
+                                                                            chatter_fallback=True)
+            job.stats['domains']['hits'] = self.domains.hits - hits
+            job.stats['domains']['misses'] = self.domains.misses - misses
+            if changed:
+                job.stats['files_changed'] = 1
+                job.output_size = output_size
+                if self.backup_store is not None:
+                    self._backup_original(job, self.backup_store.put_file(file_path), digest)
+                self._record_patch(job)
+                if not self.dry_run:
+                    shutil.copymode(file_path, tmp_path)
+                    os.replace(tmp_path, out_path)
+                    self.log("File updated (streamed): %s", out_path, level='success')
+                else:
+                    self.log("Would be updated (streamed): %s", out_path, level='info')
             else:
-                out_path = file_path
-                
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-            
-            # Backup original file if requested
-            if self.backup and not self.dry_run and self.output_dir is None:
-                backup_path = f"{file_path}.bak"
-                shutil.copy2(file_path, backup_path)
+                self.log("No changes needed: %s", file_path, level='debug')
+        finally:
+            if tmp_path is not None and os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+
+    def _stream_windows(self, file_path, out, changes, chatter_fallback=False):
+        """Convert the windows of a streamed file into out, adding their counts to changes
+
+        Returns whether the content changed, the size and the SHA-256 digest
+        (when backups are made) of the output, and whether windows still hold
+        chatters left to the fallback (see _convert_window()), which is
+        applied to them when chatter_fallback is set.
+        """
+        changed = held_back = False
+        output_size = 0
+        converted = hashlib.sha256() if self.backup_store is not None else None
+        with open(file_path, 'rb') as source:
+            decoder = codecs.getincrementaldecoder('utf-8')()
+            splitter = XmlRecordSplitter(STREAM_WINDOW_SIZE)
+            carry = ''
+            while True:
+                block = source.read(STREAM_WINDOW_SIZE)
+                text = carry + decoder.decode(block, final=not block)
+                # Universal newlines, with a \r\n possibly cut between two blocks
+                carry = ''
+                if block and text.endswith('\r'):
+                    carry = '\r'
+                    text = text[:-1]
+                text = text.replace('\r\n', '\n').replace('\r', '\n')
+                pieces = splitter.feed(text)
+                if not block:
+                    pieces += splitter.close()
+                for convertible, piece in pieces:
+                    if convertible:
+                        new_piece = self._convert_window(piece, changes)
+                        if chatter_fallback:
+                            new_piece = self._chatter_fallback_window(new_piece, changes)
+                        held_back = held_back or '<div class="oe_chatter">' in new_piece
+                        changed = changed or new_piece != piece
+                        piece = new_piece
+                    out.write(piece)
+                    if converted is not None or self.results is not None:
+                        data = piece.replace('\n', os.linesep).encode('utf-8')
+                        output_size += len(data)
+                        if converted is not None:
+                            converted.update(data)
+                if not block:
+                    break
+        return changed, output_size, converted.hexdigest() if converted is not None else None, held_back
+
+    def _write_stage(self, job, created_dirs=None):
+        """Pipeline stage: back up the original file and write the result
+
+        created_dirs holds the output directories already created, so that
+        each directory is created once per batch of files.
+        """
+        if job.content is None:
+            return
+        file_path = job.path
+        try:
+            start_time = time.perf_counter()
             
-            # Perform transformations
-            new_content, change_stats = self.apply_transformations(content, file_path)
+            out_path = self._output_path(file_path, created_dirs)
             
-            # Update statistics
-            for key, value in change_stats.items():
-                file_stats['changes'][key] = value
-                
             # If changes were made, save the file
-            if new_content != content:
-                file_stats['files_changed'] = 1
+            if job.new_content != job.content:
+                job.stats['files_changed'] = 1
+                
+                # Back up the original of the changed file
+                if self.backup_store is not None:
+                    self._backup_original(job)
+                
+                self._record_patch(job)
                 if not self.dry_run:
                     with open(out_path, 'w', encoding='utf-8') as f:
-                        f.write(new_content)
-                    self.log(f"File updated: {out_path}", level='success')
+                        f.write(job.new_content)
+                    if job.kind == 'python':
+                        self.log("Python file updated: %s", out_path, level='success')
+                    else:
+                        self.log("File updated: %s", out_path, level='success')
+                else:
+                    self.log("Would be updated: %s", out_path, level='info')
                 
                 # Display change details in verbose mode
-                if self.verbose:
+                change_stats = job.stats['changes']
+                if self.verbose and job.kind == 'xml':
                     changes_made = sum(change_stats.values())
                     if changes_made > 0:
-                        self.log(f"Changes made in {file_path}:", level='info')
+                        self.log("Changes made in %s:", file_path, level='info')
                         for change_type, count in change_stats.items():
                             if count > 0:
-                                self.log(f"  - {change_type}: {count}", level='info')
+                                self.log("  - %s: %d", change_type, count, level='info')
+            elif job.kind == 'python':
+                self.log("No changes needed in Python file: %s", file_path, level='debug')
             else:
-                self.log(f"No changes needed: {file_path}", level='debug')
-                
-            return file_stats
-                
+                self.log("No changes needed: %s", file_path, level='debug')
+            
+            job.elapsed += time.perf_counter() - start_time
+            job.stats['prefilter']['processed_time'] = job.elapsed
+        except Exception as e:
+            self._stage_error(job, e)
+
+    def _output_path(self, file_path, created_dirs=None):
+        """Path of the converted file, creating its directory in the output directory if needed"""
+        if not self.output_dir:
+            return file_path
+        out_path = os.path.join(self.output_dir, self._relative_path(file_path))
+        out_dir = os.path.dirname(out_path)
+        if self.dry_run:
+            return out_path
+        if created_dirs is None or out_dir not in created_dirs:
+            os.makedirs(out_dir, exist_ok=True)
+            if created_dirs is not None:
+                created_dirs.add(out_dir)
+        return out_path
+
+    def _backup_original(self, job, original=None, converted=None):
+        """Store the original of a file about to be changed and record it for the run manifest
+
+        original and converted are the digests of both contents, computed
+        here from the job unless the file was streamed.
+        """
+        stat = os.stat(job.path)
+        if original is None:
+            original = self.backup_store.put(job.raw)
+        if converted is None:
+            converted = hashlib.sha256(job.new_content.replace('\n', os.linesep).encode('utf-8')).hexdigest()
+        job.stats['backups'].append({
+            'path': os.path.abspath(job.path),
+            'original': original,
+            'converted': converted,
+            'mode': stat.st_mode & 0o7777,
+            'mtime_ns': stat.st_mtime_ns
+        })
+
+    def _save_backup_manifest(self):
+        """Write the manifest of the run, listing the files backed up"""
+        manifest = {
+            'run_id': self.run_id,
+            'version': __version__,
+            'created': self.stats['start_time'].isoformat(),
+            'roots': self.roots,
+            'files': sorted(self.stats['backups'], key=lambda entry: entry['path'])
+        }
+        try:
+            self.backup_store.save_manifest(manifest)
         except Exception as e:
-            self.log(f"Error processing {file_path}: {str(e)}", level='error')
-            file_stats['files_error'] = 1
-            return file_stats
+            self.log(f"Error saving backup manifest: {str(e)}", level='error')
+
+    def _transform(self, content, kind, file_path, file_stats):
+        """Apply the rules of a kind to the content, through the conversion cache when enabled"""
+        key = None
+        if self.cache is not None:
+            try:
+                key = self.cache.key(kind, content)
+                entry = self.cache.get(key)
+            except Exception as e:
+                self.log("Conversion cache unavailable: %s", e, level='debug')
+                entry = None
+            if entry is not None:
+                file_stats['cache']['hits'] = 1
+                new_content, changes = entry
+                for change_type, count in changes.items():
+                    if change_type in file_stats['changes']:
+                        file_stats['changes'][change_type] = count
+                self.log("Conversion result served from cache", level='debug', file_path=file_path)
+                return content if new_content is None else new_content
+            file_stats['cache']['misses'] = 1
+        
+        hits, misses = self.domains.hits, self.domains.misses
+        if kind == 'python':
+            new_content = self.registry.run(self, 'python', content, file_stats['changes'])
+        else:
+            new_content, change_stats = self.apply_transformations(content, file_path)
+            file_stats['changes'].update(change_stats)
+        file_stats['domains']['hits'] = self.domains.hits - hits
+        file_stats['domains']['misses'] = self.domains.misses - misses
+        
+        if key is not None:
+            try:
+                # Unchanged files only store their (empty) counts
+                self.cache.put(key, None if new_content == content else new_content, file_stats['changes'])
+            except Exception as e:
+                self.log("Error writing conversion cache: %s", e, level='debug')
+        return new_content
 
     def apply_transformations(self, content, file_path):
         """Apply all transformations"""
+        if self.legacy_engine:
+            return self._apply_legacy_transformations(content, file_path)
+        
         original_content = content
-        change_stats = {
-            'tree_to_list': 0,
-            'attrs_conversion': 0,
-            'states_conversion': 0,
-            'daterange_update': 0,
-            'chatter_simplified': 0,
-            'settings_structure': 0,
-            'python_states_removed': 0,
-            'complex_conditions': 0
-        }
+        change_stats = self.registry.empty_counters()
+        
+        # Rules whose triggers occur in the file: text rules in a single pass,
+        # then the rules working on the whole content (chatter fallback, settings)
+        content = self.registry.run(self, 'xml', content, change_stats)
+        
+        if original_content != content:
+            self.log("Changes applied to %s:", file_path, level='debug')
+            for key, value in change_stats.items():
+                if value > 0:
+                    self.log("  - %s: %d", key, value, level='debug')
+        else:
+            self.log("No changes needed for %s", file_path, level='debug')
+        
+        return content, change_stats
+
+    def _apply_legacy_transformations(self, content, file_path):
+        """Apply all transformations with the original multi-pass chain (kept for comparison)"""
+        original_content = content
+        change_stats = self.registry.empty_counters()
         
         # Try to analyze the file as valid XML
         is_valid_xml = False
@@ -708,9 +4520,9 @@ class Odoo18Converter:
             parser = etree.XMLParser(recover=True)
             root = etree.fromstring("<odoo_root>" + content + "</odoo_root>", parser)
             is_valid_xml = True
-            self.log(f"File analyzed as valid XML", level='debug')
+            self.log("File analyzed as valid XML", level='debug')
         except Exception as e:
-            self.log(f"File is not a well-formed XML, processing as text: {str(e)}", level='debug')
+            self.log("File is not a well-formed XML, processing as text: %s", e, level='debug')
         
         # Count motifs before transformations for verification
         tree_count_before = content.count('<tree')
@@ -721,7 +4533,7 @@ class Odoo18Converter:
         
         # Log initial counts in verbose mode
         if self.verbose:
-            self.log(f"Initial counts - tree: {tree_count_before}, attrs: {attrs_count_before}, states: {states_count_before}, chatter: {chatter_count_before}, daterange: {daterange_count_before}", level='debug')
+            self.log("Initial counts - tree: %d, attrs: %d, states: %d, chatter: %d, daterange: %d", tree_count_before, attrs_count_before, states_count_before, chatter_count_before, daterange_count_before, level='debug')
         
         # 1. Convert tree to list
         content, tree_count = self.convert_tree_to_list(content)
@@ -764,12 +4576,12 @@ class Odoo18Converter:
         # Verification and log for debugging
         if original_content != content:
             # File modified, check what types of changes
-            self.log(f"Changes applied to {file_path}:", level='debug')
+            self.log("Changes applied to %s:", file_path, level='debug')
             for key, value in change_stats.items():
                 if value > 0:
-                    self.log(f"  - {key}: {value}", level='debug')
+                    self.log("  - %s: %d", key, value, level='debug')
         else:
-            self.log(f"No changes needed for {file_path}", level='debug')
+            self.log("No changes needed for %s", file_path, level='debug')
             
         return content, change_stats
 
@@ -784,7 +4596,7 @@ class Odoo18Converter:
         real_tree_count = len(matches)
         
         if real_tree_count != tree_count_before:
-            self.log(f"Different detection: simple count {tree_count_before}, regex {real_tree_count}", level='debug')
+            self.log("Different detection: simple count %d, regex %d", tree_count_before, real_tree_count, level='debug')
             # Use the most precise counting
             tree_count_before = real_tree_count
         
@@ -809,224 +4621,404 @@ class Odoo18Converter:
         # Count actual changes
         tree_count = tree_count_before - remaining_trees
         
-        self.log(f"Detected tree tags: {tree_count_before}, converted: {tree_count}", level='debug')
+        self.log("Detected tree tags: %d, converted: %d", tree_count_before, tree_count, level='debug')
         
         return content_new, tree_count
 
     def convert_attrs(self, content):
         """Convert attrs attributes to direct conditions"""
-        attrs_count = 0
-        states_count = 0
-        complex_count = 0
+        counters = {
+            'attrs_conversion': 0,
+            'states_conversion': 0,
+            'complex_conditions': 0
+        }
         
-        # Find all attrs attributes with their values
-        attrs_pattern = r'attrs="{\'(invisible|readonly|required)\': \[(.*?)\]}"'
+        # Find all attrs attributes with their values and apply replacements
+        content = re.sub(ATTRS_PATTERN, lambda match: self._replace_attrs(match, counters), content)
         
-        def replace_attrs(match):
-            nonlocal attrs_count, complex_count
-            attr_type = match.group(1)
-            conditions = match.group(2)
-            
-            # Advanced mode for complex conditions
-            if self.advanced_conditions and ('|' in conditions or '&' in conditions):
-                try:
-                    # Try to convert complex conditions with | and & operators
-                    converted = self._convert_complex_condition(conditions, attr_type)
-                    if converted:
-                        complex_count += 1
-                        return converted
-                except Exception as e:
-                    self.log(f"Error converting complex: {conditions}. Error: {str(e)}", level='warning')
-            
-            # Process OR (|) conditions
-            if conditions.startswith("'|',"):
-                # Extract two conditions after '|'
-                parts = conditions.split("'|',")[1].strip()
-                cond_parts = re.findall(r'\(\'(.*?)\',\s*\'(.*?)\',\s*([^\)]*)\)', parts)
-                
-                if len(cond_parts) >= 2:
-                    # Build OR expression
-                    cond1 = self._format_condition(cond_parts[0][0], cond_parts[0][1], cond_parts[0][2])
-                    cond2 = self._format_condition(cond_parts[1][0], cond_parts[1][1], cond_parts[1][2])
-                    attrs_count += 1
-                    return f'{attr_type}="{cond1} or {cond2}"'
-            
-            # Process AND (conditions without '|')
-            elif "," in conditions and not conditions.startswith("'|',"):
-                cond_parts = re.findall(r'\(\'(.*?)\',\s*\'(.*?)\',\s*([^\)]*)\)', conditions)
-                if len(cond_parts) >= 2:
-                    conditions_formatted = []
-                    for part in cond_parts:
-                        conditions_formatted.append(self._format_condition(part[0], part[1], part[2]))
-                    attrs_count += 1
-                    return f'{attr_type}="{" and ".join(conditions_formatted)}"'
-            
-            # Process a simple condition
-            else:
-                try:
-                    cond_parts = re.findall(r'\(\'(.*?)\',\s*\'(.*?)\',\s*([^\)]*)\)', conditions)
-                    if cond_parts:
-                        field, operator, value = cond_parts[0]
-                        # Handle special condition for empty lists
-                        if value == "[]" and operator == "=":
-                            attrs_count += 1
-                            return f'{attr_type}="not {field}"'
-                        else:
-                            attrs_count += 1
-                            return f'{attr_type}="{self._format_condition(field, operator, value)}"'
-                except Exception as e:
-                    self.log(f"Error parsing condition: {conditions}. Error: {str(e)}", level='warning')
-            
-            # If none of the rules apply, keep the original
+        # Convert states to invisible
+        content = re.sub(STATES_PATTERN, lambda match: self._replace_states(match, counters), content)
+        
+        return content, counters['attrs_conversion'], counters['states_conversion'], counters['complex_conditions']
+
+    def _replace_attrs(self, match, counters):
+        """Replacement for a single attrs attribute match"""
+        try:
+            attributes, complex_count = self.domains.compile(match.group(1))
+        except DomainError as e:
+            self.log(f"attrs kept as is ({str(e)}): {match.group(1)}", level='warning')
             return match.group(0)
         
-        # Apply replacements
-        content = re.sub(attrs_pattern, replace_attrs, content)
+        # Complex conditions are only converted in advanced mode
+        if complex_count and not self.advanced_conditions:
+            self.log("Complex attrs kept as is (use --advanced-conditions): %s", match.group(1), level='debug')
+            return match.group(0)
         
-        # Convert states to invisible
-        states_pattern = r'states="([^"]*)"'
+        counters['attrs_conversion'] += 1
+        counters['complex_conditions'] += complex_count
+        return ' '.join(f'{attribute}="{self._escape_attribute(expression)}"' for attribute, expression in attributes)
+
+    def _replace_states(self, match, counters):
+        """Replacement for a states attribute match"""
+        counters['states_conversion'] += 1
+        return f'invisible="state != \'{match.group(1)}\'"'
+
+    @staticmethod
+    def _escape_attribute(value):
+        """Escape a value for a double-quoted XML attribute"""
+        return value.replace('&', '&amp;').replace('<', '&lt;').replace('"', '&quot;')
+
+    def update_daterange_widget(self, content):
+        """Update daterange widgets"""
+        daterange_count = 0
+        
+        # Search for daterange widgets with old syntax
+        new_format = r'<field name="\1" widget="daterange" options="{\'end_date_field\': \'\2\'}"/>'
+        
+        # Count occurrences before replacement
+        daterange_count += len(re.findall(DATERANGE_START_PATTERN, content))
+        
+        content = re.sub(DATERANGE_START_PATTERN, new_format, content)
+        
+        # Remove end_date fields with daterange widget that are now unnecessary
+        # Count occurrences before removal
+        daterange_count += len(re.findall(DATERANGE_END_PATTERN, content))
+        
+        content = re.sub(DATERANGE_END_PATTERN, '', content)
+        
+        return content, daterange_count
+
+    def simplify_chatter(self, content):
+        """Simplify chatter structure"""
+        chatter_count = 0
+        
+        # Perform conversions with the different patterns
+        # (standard, then alternatives 1 to 3)
+        for i, pattern in enumerate(CHATTER_PATTERNS):
+            matches = re.findall(pattern, content)
+            count = len(matches)
+            if count > 0:
+                if i == 0:
+                    self.log("Detected %d standard chatter structures", count, level='debug')
+                else:
+                    self.log("Detected %d alternative chatter structures (type %d)", count, i, level='debug')
+                content = re.sub(pattern, '<chatter/>', content)
+                chatter_count += count
+            
+        # Simple detection for cases not covered by regular expressions
+        if '<div class="oe_chatter">' in content and chatter_count == 0:
+            content, chatter_count = self._simplify_chatter_dom(content)
+        
+        if chatter_count > 0:
+            self.log("Replaced %d chatter structures with simplified element", chatter_count, level='debug')
+        
+        return content, chatter_count
+
+    def _simplify_chatter_dom(self, content):
+        """Replace chatter structures the regular expressions could not handle, using lxml"""
+        chatter_count = 0
+        self.log(f"Detected chatter structures but couldn't be automatically converted", level='warning')
+        # Try XML approach with lxml if possible
+        try:
+            parser = etree.XMLParser(recover=True)
+            root = etree.fromstring("<root>" + content + "</root>", parser)
+            
+            chatter_count = self._replace_chatter_divs(root)
+            if chatter_count:
+                # Convert modified XML tree to text
+                content = etree.tostring(root, pretty_print=True, encoding='unicode')
+                # Remove added root tags
+                content = content.replace("<root>", "").replace("</root>", "")
+        except Exception as e:
+            self.log(f"Error processing XML chatter conversion: {str(e)}", level='warning')
         
-        def replace_states(match):
-            nonlocal states_count
-            state_value = match.group(1)
-            states_count += 1
-            return f'invisible="state != \'{state_value}\'"'
+        return content, chatter_count
+
+    def _replace_chatter_divs(self, root):
+        """Replace the oe_chatter divs of a parsed tree, return the number replaced"""
+        chatter_count = 0
+        # Find all oe_chatter divs
+        chatter_divs = root.xpath("//div[@class='oe_chatter']")
+        if chatter_divs:
+            self.log("Attempting XML conversion for %d chatters", len(chatter_divs), level='debug')
+            for chatter_div in chatter_divs:
+                # Replace with chatter element
+                new_chatter = etree.Element("chatter")
+                parent = chatter_div.getparent()
+                if parent is not None:
+                    parent.replace(chatter_div, new_chatter)
+                    chatter_count += 1
+        return chatter_count
+
+    def _replace_tree_open(self, match, counters):
+        """Replacement for an opening tree tag"""
+        counters['tree_to_list'] += 1
+        return '<list'
+
+    def _replace_daterange_start(self, match, counters):
+        """Replacement for a daterange start field using the old options"""
+        counters['daterange_update'] += 1
+        return f'<field name="{match.group(1)}" widget="daterange" options="{{\'end_date_field\': \'{match.group(2)}\'}}"/>'
+
+    def _remove_daterange_end(self, match, counters):
+        """Removal of a daterange end field that is now unnecessary"""
+        counters['daterange_update'] += 1
+        return ''
+
+    def _replace_chatter(self, match, counters):
+        """Replacement for a chatter structure"""
+        counters['chatter_simplified'] += 1
+        return '<chatter/>'
+
+    def _apply_chatter_fallback(self, doc, counters):
+        """Chatter structures the regular expressions could not handle"""
+        if counters['chatter_simplified'] == 0 and '<div class="oe_chatter">' in doc.content:
+            self.log(f"Detected chatter structures but couldn't be automatically converted", level='warning')
+            if doc.root is None:
+                return
+            try:
+                chatter_count = self._replace_chatter_divs(doc.root)
+                if chatter_count:
+                    counters['chatter_simplified'] = chatter_count
+                    doc.mark_modified()
+            except Exception as e:
+                self.log(f"Error processing XML chatter conversion: {str(e)}", level='warning')
+
+    def _apply_settings_structure(self, doc, counters):
+        """Convert res.config.settings structure when the file contains settings blocks"""
+        if doc.root is None:
+            return
+        try:
+            settings_count = self._convert_settings_tree(doc.root)
+            if settings_count:
+                counters['settings_structure'] = settings_count
+                doc.mark_modified()
+        except Exception as e:
+            self.log(f"Error converting settings structure: {str(e)}", level='warning')
+
+    @staticmethod
+    def _is_field_call(call):
+        """Whether a call builds an Odoo field (fields.Char(...), or Char(...) when imported)"""
+        func = call.func
+        if isinstance(func, ast.Attribute):
+            return isinstance(func.value, ast.Name) and func.value.id == 'fields'
+        return isinstance(func, ast.Name) and func.id in ODOO_FIELD_TYPES
+
+    @staticmethod
+    def _is_super_call(node):
+        """Whether a node is a super() or super(Class, self) call"""
+        return isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and node.func.id == 'super'
+
+    def _super_calls(self, module, function, method):
+        """super().<method>(...) calls made by a function"""
+        return [call for call in module.nodes('Call')
+                if module.function_of(call) is function and isinstance(call.func, ast.Attribute)
+                and call.func.attr == method and self._is_super_call(call.func.value)]
+
+    def _annotate(self, module, node, message):
+        """Insert a TODO comment above a statement (unless already there)"""
+        lineno = min([node.lineno] + [decorator.lineno for decorator in getattr(node, 'decorator_list', [])])
+        start = module.line_start(module.offset(lineno, 0))
+        if lineno > 1 and 'TODO Odoo 18:' in module.lines[lineno - 2]:
+            return False
+        return module.replace(start, start, f"{module.indentation(module.offset(node.lineno, node.col_offset))}# TODO Odoo 18: {message}\n")
+
+    def _apply_python_states(self, module, counters):
+        """Remove states attributes from Python field definitions"""
+        for call in module.nodes('Call'):
+            if not any(keyword.arg == 'states' for keyword in call.keywords) or not self._is_field_call(call):
+                continue
+            arguments = module.call_arguments(call)
+            if arguments is None:
+                continue
+            for position, argument in enumerate(arguments[2]):
+                if argument.keyword and argument.name == 'states' and module.remove_argument(arguments, position):
+                    counters['python_states_removed'] += 1
+
+    def _apply_python_name_get(self, module, counters):
+        """Replace name_get() by _compute_display_name(), or flag it when it cannot be rewritten"""
+        for function in module.nodes('FunctionDef'):
+            if function.name != 'name_get' or not module.is_method(function):
+                continue
+            if self._rewrite_name_get(module, function):
+                counters['python_name_get'] += 1
+            elif self._annotate(module, function, "name_get() is no longer called, compute display_name in _compute_display_name() instead"):
+                counters['python_name_get'] += 1
+
+    def _rewrite_name_get(self, module, function):
+        """Rewrite name_get() returning [(record.id, label) for record in self]"""
+        span = module.node_span(function)
+        if span is None or function.decorator_list or len(function.args.args) != 1 or len(function.body) != 1:
+            return False
+        statement = function.body[0]
+        if not isinstance(statement, ast.Return) or not isinstance(statement.value, ast.ListComp):
+            return False
+        comprehension = statement.value
+        generator = comprehension.generators[0]
+        element = comprehension.elt
+        if (len(comprehension.generators) != 1 or generator.ifs or getattr(generator, 'is_async', False)
+                or not isinstance(generator.target, ast.Name) or not isinstance(generator.iter, ast.Name)
+                or generator.iter.id != 'self' or not isinstance(element, ast.Tuple) or len(element.elts) != 2):
+            return False
+        record = generator.target.id
+        first, label = element.elts
+        if not (isinstance(first, ast.Attribute) and first.attr == 'id'
+                and isinstance(first.value, ast.Name) and first.value.id == record):
+            return False
+        label_start, label_end = module.node_span(label)
         
-        content = re.sub(states_pattern, replace_states, content)
+        # Fields of the record used in the label
+        depends = []
+        for node in ast.walk(label):
+            if (isinstance(node, ast.Attribute) and isinstance(node.value, ast.Name)
+                    and node.value.id == record and node.attr not in depends):
+                depends.append(node.attr)
         
-        return content, attrs_count, states_count, complex_count
+        indent = module.indentation(span[0])
+        text = ''
+        if depends and 'api' in module.names:
+            text += f"@api.depends({', '.join(repr(field) for field in sorted(depends))})\n{indent}"
+        text += (f"def _compute_display_name(self):\n"
+                 f"{indent}    for {record} in self:\n"
+                 f"{indent}        {record}.display_name = {module.content[label_start:label_end]}")
+        return module.replace(span[0], span[1], text)
+
+    def _apply_python_fields_view_get(self, module, counters):
+        """Replace fields_view_get() overrides by get_view(), or flag them"""
+        for function in module.nodes('FunctionDef'):
+            if function.name != 'fields_view_get' or not module.is_method(function):
+                continue
+            if self._rewrite_fields_view_get(module, function):
+                counters['python_fields_view_get'] += 1
+            elif self._uses_view_result_keys(module, function):
+                if self._annotate(module, function, "fields_view_get() was replaced by get_view(self, view_id=None, view_type='form', **options), "
+                                                    "whose result has no 'fields' nor 'toolbar' entry"):
+                    counters['python_fields_view_get'] += 1
+            elif self._annotate(module, function, "fields_view_get() was replaced by get_view(self, view_id=None, view_type='form', **options)"):
+                counters['python_fields_view_get'] += 1
 
-    def _format_condition(self, field, operator, value):
-        """Format a condition for the new syntax"""
-        # Handle value based on its type
-        cleaned_value = value.strip("'")
+    def _rewrite_fields_view_get(self, module, function):
+        """Rename a fields_view_get() override to get_view(), replacing toolbar/submenu by **options
+
+        Only done when toolbar and submenu are used for nothing but being
+        passed to super().fields_view_get(), and when the result is not read
+        or written through its 'fields' or 'toolbar' entries, which the
+        result of get_view() does not have.
+        """
+        if self._uses_view_result_keys(module, function):
+            return False
+        parameters = module.def_parameters(function)
+        if parameters is None:
+            return False
+        names = [argument.name for argument in parameters[2]]
+        if names[:1] != ['self'] or None in names or not set(names) <= {'self', 'view_id', 'view_type', 'toolbar', 'submenu'}:
+            return False
+        calls = self._super_calls(module, function, 'fields_view_get')
+        passed = {id(value) for call in calls for value in call.args + [keyword.value for keyword in call.keywords]}
+        for node in module.nodes('Name'):
+            if module.function_of(node) is function and node.id in ('toolbar', 'submenu') and id(node) not in passed:
+                return False
         
-        if operator == "=":
-            if value == "[]":  # Special case for empty lists
-                return f"not {field}"
-            elif value == "False":
-                return f"not {field}"
-            elif value == "True":
-                return field
-            else:
-                return f"{field} == {value}"
-        elif operator == "!=":
-            if value == "[]":  # Special case for empty lists
-                return field
-            elif value == "False":
-                return field
-            elif value == "True":
-                return f"not {field}"
+        name_offset = module.def_name_offset(function)
+        module.replace(name_offset, name_offset + len(function.name), 'get_view')
+        self._replace_options(module, parameters, ('toolbar', 'submenu'))
+        for call in calls:
+            arguments = module.call_arguments(call)
+            if arguments is None:
+                continue
+            module.replace(arguments[0] - len('fields_view_get'), arguments[0], 'get_view')
+            self._replace_options(module, arguments, ('toolbar', 'submenu'))
+        return True
+
+    @staticmethod
+    def _uses_view_result_keys(module, function):
+        """Whether a function mentions the 'fields' or 'toolbar' keys of a fields_view_get() result"""
+        # String constants are Constant nodes since Python 3.8, Str nodes before
+        for node in module.nodes('Constant') + module.nodes('Str'):
+            if module.function_of(node) is function and getattr(node, 'value', getattr(node, 's', None)) in ('fields', 'toolbar'):
+                return True
+        return False
+
+    @staticmethod
+    def _replace_options(module, arguments, names):
+        """Replace the arguments (or parameters) of the given names by **options"""
+        open_offset, _, items = arguments
+        replaced = False
+        for position, argument in enumerate(items):
+            if argument.name in names:
+                if not replaced:
+                    replaced = module.replace(argument.start, argument.end, '**options')
+                else:
+                    module.remove_argument(arguments, position)
+        if not replaced:
+            if items:
+                module.replace(items[-1].end, items[-1].end, ', **options')
             else:
-                return f"{field} != {value}"
-        elif operator in ["<", ">", "<=", ">="]:
-            return f"{field} {operator} {value}"
-        else:
-            return f"{field} {operator} {value}"
+                module.replace(open_offset + 1, open_offset + 1, '**options')
 
-    def update_daterange_widget(self, content):
-        """Update daterange widgets"""
-        daterange_count = 0
-        
-        # Search for daterange widgets with old syntax
-        old_pattern = r'<field name="([^"]*)" widget="daterange" options="{\'related_end_date\': \'([^\']*)\'}"/>'
-        new_format = r'<field name="\1" widget="daterange" options="{\'end_date_field\': \'\2\'}"/>'
-        
-        # Count occurrences before replacement
-        daterange_count += len(re.findall(old_pattern, content))
-        
-        content = re.sub(old_pattern, new_format, content)
-        
-        # Remove end_date fields with daterange widget that are now unnecessary
-        end_date_pattern = r'<field name="([^"]*)" widget="daterange" options="{\'related_start_date\': \'([^\']*)\'}"/>'
-        
-        # Count occurrences before removal
-        daterange_count += len(re.findall(end_date_pattern, content))
-        
-        content = re.sub(end_date_pattern, '', content)
-        
-        return content, daterange_count
+    def _apply_python_name_search(self, module, counters):
+        """Port _name_search() overrides to the (name, domain, operator, limit, order) signature"""
+        for function in module.nodes('FunctionDef'):
+            if function.name != '_name_search' or not module.is_method(function):
+                continue
+            if self._rewrite_name_search(module, function):
+                counters['python_name_search'] += 1
 
-    def simplify_chatter(self, content):
-        """Simplify chatter structure"""
-        chatter_count = 0
-        
-        # Pattern to detect old chatter format (standard)
-        old_chatter_pattern = r'<div class="oe_chatter">\s*<field name="message_follower_ids" widget="mail_followers"/>\s*<field name="activity_ids" widget="mail_activity"/>\s*<field name="message_ids" widget="mail_thread"/>\s*</div>'
-        
-        # Alternative pattern with spaces and order difference
-        alt_chatter_pattern1 = r'<div class="oe_chatter">\s*<field name="message_follower_ids"[^>]*widget="mail_followers"[^>]*>\s*</field>\s*<field name="activity_ids"[^>]*widget="mail_activity"[^>]*>\s*</field>\s*<field name="message_ids"[^>]*widget="mail_thread"[^>]*>\s*</field>\s*</div>'
-        
-        # Alternative pattern with order difference of fields
-        alt_chatter_pattern2 = r'<div class="oe_chatter">\s*(<field[^>]*widget="mail_followers"[^>]*/>|<field[^>]*widget="mail_followers"[^>]*>\s*</field>)\s*(<field[^>]*widget="mail_thread"[^>]*/>|<field[^>]*widget="mail_thread"[^>]*>\s*</field>)\s*(<field[^>]*widget="mail_activity"[^>]*/>|<field[^>]*widget="mail_activity"[^>]*>\s*</field>)\s*</div>'
-        
-        # Alternative pattern with only message_ids and followers
-        alt_chatter_pattern3 = r'<div class="oe_chatter">\s*(<field[^>]*widget="mail_followers"[^>]*/>|<field[^>]*widget="mail_followers"[^>]*>\s*</field>)\s*(<field[^>]*widget="mail_thread"[^>]*/>|<field[^>]*widget="mail_thread"[^>]*>\s*</field>)\s*</div>'
+    def _rewrite_name_search(self, module, function):
+        """Rename args to domain, drop name_get_uid and add order in a _name_search() override"""
+        parameters = module.def_parameters(function)
+        if parameters is None:
+            return False
+        names = [argument.name for argument in parameters[2]]
+        if (names[:2] != ['self', 'name'] or None in names
+                or not set(names) <= {'self', 'name', 'args', 'domain', 'operator', 'limit', 'name_get_uid', 'order'}):
+            return False
+        if 'args' not in names and 'name_get_uid' not in names:
+            # Already ported
+            return False
+        local_names = [node for node in module.nodes('Name') if module.function_of(node) is function]
+        if 'args' in names and any(node.id == 'domain' for node in local_names):
+            self._annotate(module, function, "_name_search() takes a domain parameter instead of args")
+            return True
+        add_order = 'order' not in names
         
-        # Perform conversions with different patterns
-        # 1. Standard pattern
-        matches1 = re.findall(old_chatter_pattern, content)
-        count1 = len(matches1)
-        if count1 > 0:
-            self.log(f"Detected {count1} standard chatter structures", level='debug')
-            content = re.sub(old_chatter_pattern, '<chatter/>', content)
-            chatter_count += count1
-            
-        # 2. Alternative 1
-        matches2 = re.findall(alt_chatter_pattern1, content)
-        count2 = len(matches2)
-        if count2 > 0:
-            self.log(f"Detected {count2} alternative chatter structures (type 1)", level='debug')
-            content = re.sub(alt_chatter_pattern1, '<chatter/>', content)
-            chatter_count += count2
-            
-        # 3. Alternative 2
-        matches3 = re.findall(alt_chatter_pattern2, content)
-        count3 = len(matches3)
-        if count3 > 0:
-            self.log(f"Detected {count3} alternative chatter structures (type 2)", level='debug')
-            content = re.sub(alt_chatter_pattern2, '<chatter/>', content)
-            chatter_count += count3
-            
-        # 4. Alternative 3
-        matches4 = re.findall(alt_chatter_pattern3, content)
-        count4 = len(matches4)
-        if count4 > 0:
-            self.log(f"Detected {count4} alternative chatter structures (type 3)", level='debug')
-            content = re.sub(alt_chatter_pattern3, '<chatter/>', content)
-            chatter_count += count4
-            
-        # Simple detection for cases not covered by regular expressions
-        if '<div class="oe_chatter">' in content and chatter_count == 0:
-            self.log(f"Detected chatter structures but couldn't be automatically converted", level='warning')
-            # Try XML approach with lxml if possible
-            try:
-                parser = etree.XMLParser(recover=True)
-                root = etree.fromstring("<root>" + content + "</root>", parser)
-                
-                # Find all oe_chatter divs
-                chatter_divs = root.xpath("//div[@class='oe_chatter']")
-                if chatter_divs:
-                    self.log(f"Attempting XML conversion for {len(chatter_divs)} chatters", level='debug')
-                    for chatter_div in chatter_divs:
-                        # Replace with chatter element
-                        new_chatter = etree.Element("chatter")
-                        parent = chatter_div.getparent()
-                        if parent is not None:
-                            parent.replace(chatter_div, new_chatter)
-                            chatter_count += 1
-                    
-                    # Convert modified XML tree to text
-                    content = etree.tostring(root, pretty_print=True, encoding='unicode')
-                    # Remove added root tags
-                    content = content.replace("<root>", "").replace("</root>", "")
-            except Exception as e:
-                self.log(f"Error processing XML chatter conversion: {str(e)}", level='warning')
+        # super() calls first: the names of their removed arguments are not renamed
+        for call in self._super_calls(module, function, '_name_search'):
+            arguments = module.call_arguments(call)
+            if arguments is None:
+                continue
+            kept = []
+            for position, argument in enumerate(arguments[2]):
+                if argument.keyword and argument.name == 'args':
+                    module.replace(argument.start, argument.start + len('args'), 'domain')
+                elif argument.name == 'name_get_uid':
+                    module.remove_argument(arguments, position)
+                    continue
+                kept.append(argument)
+            if add_order and kept and not any(argument.name == 'order' for argument in kept):
+                module.replace(kept[-1].end, kept[-1].end, ', order=order')
         
-        if chatter_count > 0:
-            self.log(f"Replaced {chatter_count} chatter structures with simplified element", level='debug')
+        # Signature
+        kept = None
+        for position, argument in enumerate(parameters[2]):
+            if argument.name == 'args':
+                module.replace(argument.start, argument.start + len('args'), 'domain')
+            elif argument.name == 'name_get_uid':
+                module.remove_argument(parameters, position)
+                continue
+            if kept is None or argument.name != 'order':
+                kept = argument
+        if add_order:
+            module.replace(kept.end, kept.end, ', order=None')
         
-        return content, chatter_count
+        # Body
+        for node in local_names:
+            start = module.offset(node.lineno, node.col_offset)
+            if node.id == 'args':
+                module.replace(start, start + len('args'), 'domain')
+            elif node.id == 'name_get_uid':
+                module.replace(start, start + len('name_get_uid'), 'None')
+        return True
 
     def convert_settings_structure(self, content):
         """Convert res.config.settings parameters structure"""
@@ -1038,53 +5030,7 @@ class Odoo18Converter:
                 parser = etree.XMLParser(recover=True)
                 try:
                     root = etree.fromstring(content, parser)
-                    
-                    # Find all app_settings_block divs
-                    app_blocks = root.xpath("//div[@class='app_settings_block']")
-                    settings_count = len(app_blocks)
-                    
-                    for app_block in app_blocks:
-                        # Create a new app element
-                        app_element = etree.Element("app")
-                        
-                        # Copy relevant attributes
-                        if app_block.get('string'):
-                            app_element.set('string', app_block.get('string'))
-                        elif app_block.get('data-string'):
-                            app_element.set('string', app_block.get('data-string'))
-                        
-                        # Iterate through child elements
-                        for child in app_block:
-                            # Convert h2 to blocks
-                            if child.tag == 'h2':
-                                block = etree.SubElement(app_element, "block")
-                                block.set('title', child.text.strip())
-                            
-                            # Convert parameter containers
-                            elif child.tag == 'div' and 'o_settings_container' in child.get('class', ''):
-                                # Find labels, fields, and descriptions
-                                labels = child.xpath(".//label")
-                                fields = child.xpath(".//field")
-                                descriptions = child.xpath(".//div[@class='text-muted']")
-                                
-                                # Create setting element
-                                if labels and fields:
-                                    setting = etree.SubElement(app_element, "setting")
-                                    
-                                    # Add string attribute (label)
-                                    if labels[0].get('string'):
-                                        setting.set('string', labels[0].get('string'))
-                                    
-                                    # Add help attribute (description)
-                                    if descriptions and descriptions[0].text:
-                                        setting.set('help', descriptions[0].text.strip())
-                                    
-                                    # Add fields
-                                    for field in fields:
-                                        setting.append(field)
-                        
-                        # Replace old block with new one
-                        app_block.getparent().replace(app_block, app_element)
+                    settings_count = self._convert_settings_tree(root)
                     
                     # Convert modified XML tree to text
                     content = etree.tostring(root, pretty_print=True, encoding='unicode')
@@ -1095,47 +5041,159 @@ class Odoo18Converter:
         
         return content, settings_count
 
-    def _convert_complex_condition(self, condition, attr_type):
-        """Convert complex conditions with multiple OR and AND operators"""
-        # This method is a placeholder for handling more complex cases
-        # It would require implementing a complete condition parser/evaluator Odoo
+    def _convert_settings_tree(self, root):
+        """Replace the app_settings_block divs of a parsed tree, return the number replaced
 
-        # Simple example for a few common cases
-        # 1. Multiple consecutive ORs: '|', '|', cond1, cond2, cond3
-        if condition.startswith("'|',") and "'|'," in condition[4:]:
+        Every field of a block ends up in a <setting>; a block holding content
+        that cannot be mapped to the new structure is left unconverted.
+        """
+        converted = 0
+        for app_block in root.xpath("//div[@class='app_settings_block']"):
             try:
-                # Count OR operators
-                or_count = 0
-                idx = 0
-                while True:
-                    next_idx = condition.find("'|',", idx)
-                    if next_idx == -1:
-                        break
-                    or_count += 1
-                    idx = next_idx + 4
+                app_element = self._settings_app(app_block)
+            except ValueError as e:
+                self.log("Settings block %s left unconverted: %s",
+                         app_block.get('data-key') or app_block.get('string') or app_block.get('data-string') or '',
+                         e, level='warning')
+                continue
+            # Replace old block with new one, keeping the text that followed it
+            app_element.tail = app_block.tail
+            app_block.getparent().replace(app_block, app_element)
+            converted += 1
+        return converted
+
+    def _settings_app(self, app_block):
+        """<app> element of an app_settings_block div (ValueError if some content would be lost)
+
+        The whole block is mapped before any element is moved, so that a
+        block left unconverted is left intact.
+        """
+        if (app_block.text or '').strip():
+            raise ValueError("text outside of the settings containers")
+        # The containers following a title (or the start of the block) form
+        # a section: [title or None, [(field, string, help)], comments after]
+        sections = [[None, [], []]]
+        containers = []
+        for child in app_block:
+            if (child.tail or '').strip():
+                raise ValueError("text outside of the settings containers")
+            if not isinstance(child.tag, str):
+                # Comments stay between the settings they separated
+                sections[-1][1] += self._settings_section(containers)
+                containers = []
+                sections[-1][2].append(child)
+            elif child.tag == 'h2':
+                if len(child):
+                    raise ValueError("title with markup")
+                sections[-1][1] += self._settings_section(containers)
+                containers = []
+                sections.append([(child.text or '').strip(), [], []])
+            elif child.tag == 'div' and 'o_settings_container' in child.get('class', ''):
+                containers.append(child)
+            else:
+                raise ValueError(f"unexpected <{child.tag}> element")
+        sections[-1][1] += self._settings_section(containers)
+        
+        app_element = etree.Element("app")
+        
+        # Copy relevant attributes
+        if app_block.get('string'):
+            app_element.set('string', app_block.get('string'))
+        elif app_block.get('data-string'):
+            app_element.set('string', app_block.get('data-string'))
+        
+        for index, (title, settings, comments) in enumerate(sections):
+            # Convert h2 to blocks
+            parent = app_element
+            if index:
+                parent = etree.SubElement(app_element, "block")
+                parent.set('title', title)
+            for field, string, text in settings:
+                setting = etree.SubElement(parent, "setting")
                 
-                # Extract all conditions
-                cond_parts = re.findall(r'\(\'(.*?)\',\s*\'(.*?)\',\s*([^\)]*)\)', condition)
+                # Add string attribute (label)
+                if string:
+                    setting.set('string', string)
                 
-                if len(cond_parts) == or_count + 1:
-                    # Format all conditions
-                    formatted_conditions = []
-                    for part in cond_parts:
-                        formatted_conditions.append(self._format_condition(part[0], part[1], part[2]))
-                    
-                    # Build expression with OR
-                    return f'{attr_type}="{" or ".join(formatted_conditions)}"'
-            except Exception as e:
-                self.log(f"Error handling multiple OR conditions: {condition}. Error: {str(e)}", level='warning')
+                # Add help attribute (description)
+                if text:
+                    setting.set('help', text)
+                
+                setting.append(field)
+            for comment in comments:
+                parent.append(comment)
+        return app_element
+
+    def _settings_section(self, containers):
+        """(field, string, help) of every field of the containers of a section
+
+        Labels and descriptions may sit in other containers than their field
+        (one container per part is a common layout): a label goes to the field
+        named by its for attribute, else to the only field of its container or
+        of the section; a description to the only field of its container or
+        of the section. Any other content raises ValueError.
+        """
+        fields, labels, descriptions = [], [], []
         
-        # 2. Conditions AND nested in ORs: '|', cond1, '&', cond2, cond3
-        elif "'|'," in condition and "'&'," in condition:
-            # This case is very complex and would require a complete parser
-            # Simplified implementation for certain specific cases
-            pass
-            
-        # No conversion possible, return None
-        return None
+        def collect(element, container):
+            if (element.text or '').strip():
+                raise ValueError("text in a settings container")
+            for child in element:
+                if not isinstance(child.tag, str):
+                    raise ValueError("comment in a settings container")
+                if (child.tail or '').strip():
+                    raise ValueError("text in a settings container")
+                if child.tag == 'field':
+                    fields.append((child, container))
+                elif child.tag == 'label':
+                    if len(child):
+                        raise ValueError("label with markup")
+                    labels.append((child, container))
+                elif child.tag == 'div' and 'text-muted' in child.get('class', '').split():
+                    if len(child):
+                        raise ValueError("description with markup")
+                    descriptions.append((child, container))
+                elif child.tag == 'div':
+                    # Layout wrappers (o_setting_box, panes...)
+                    collect(child, container)
+                else:
+                    raise ValueError(f"unexpected <{child.tag}> element")
+        
+        for container in containers:
+            collect(container, container)
+        if not fields:
+            if labels or descriptions:
+                raise ValueError("label or description without a field")
+            return []
+        
+        def owner(element, container, taken, name=None):
+            named = [i for i, (field, _) in enumerate(fields) if name and field.get('name') == name]
+            if len(named) == 1:
+                return named[0]
+            for candidates in ([i for i, (_, box) in enumerate(fields) if box is container], range(len(fields))):
+                candidates = [i for i in candidates if i not in taken]
+                if len(candidates) == 1:
+                    return candidates[0]
+            raise ValueError(f"cannot tell which field <{element.tag}> belongs to")
+        
+        strings = {}
+        for label, container in labels:
+            index = owner(label, container, strings, label.get('for'))
+            strings[index] = label.get('string') or (label.text or '').strip()
+        helps = {}
+        for description, container in descriptions:
+            index = owner(description, container, ())
+            helps.setdefault(index, []).append(' '.join((description.text or '').split()))
+        
+        return [(field, strings.get(index), ' '.join(part for part in helps.get(index, ()) if part))
+                for index, (field, _) in enumerate(fields)]
+
+    def print_summary(self):
+        """Display the result of the run on a single line (quiet mode)"""
+        color = Fore.RED if self.stats['files_error'] else Fore.GREEN
+        converted = "would be converted" if self.dry_run else "converted"
+        print(f"{color}{self.stats['files_changed']} file(s) {converted}, {self.stats['files_error']} error(s), "
+              f"{self.stats['files_processed']} file(s) checked in {self.stats['duration']:.2f}s{Style.RESET_ALL}")
 
     def print_report(self):
         """Display a detailed report of conversions performed"""
@@ -1143,12 +5201,43 @@ class Odoo18Converter:
         minutes = int(duration // 60)
         seconds = int(duration % 60)
         
-        # Add new statistics
-        additional_stats = ""
-        if self.convert_python:
-            additional_stats += f"║ {Fore.WHITE}  - attrs states Python : {self.stats['changes']['python_states_removed']:<5}{Fore.CYAN}                       ║\n"
-        if self.advanced_conditions:
-            additional_stats += f"║ {Fore.WHITE}  - conditions complexes: {self.stats['changes']['complex_conditions']:<5}{Fore.CYAN}                       ║\n"
+        # Conversion cache usage
+        cache_lines = ""
+        if self.cache is not None:
+            cache_lines += f"║ {Fore.WHITE}Cache hits         : {self.stats['cache']['hits']:<5}{Fore.CYAN}                       ║\n"
+            cache_lines += f"║ {Fore.WHITE}Cache misses       : {self.stats['cache']['misses']:<5}{Fore.CYAN}                       ║\n"
+        
+        # Memoized attrs domains
+        domains = self.stats['domains']
+        domain_lines = ""
+        if domains['hits'] + domains['misses']:
+            hit_rate = 100.0 * domains['hits'] / (domains['hits'] + domains['misses'])
+            domain_lines += f"║ {Fore.WHITE}Domain cache hits  : {domains['hits']:<5} ({hit_rate:5.1f} %){Fore.CYAN}             ║\n"
+            domain_lines += f"║ {Fore.WHITE}Domains compiled   : {domains['misses']:<5}{Fore.CYAN}                       ║\n"
+        
+        # Files classified as clean by the byte-level prefilter
+        prefilter_lines = ""
+        if self.prefilter:
+            prefilter = self.stats['prefilter']
+            saved = self._prefilter_time_saved()
+            prefilter_lines += f"║ {Fore.WHITE}Skipped by prefilter: {prefilter['skipped']:<5}{Fore.CYAN}                       ║\n"
+            prefilter_lines += f"║ {Fore.WHITE}  - large files     : {prefilter['large_skipped']:<5}{Fore.CYAN}                       ║\n"
+            prefilter_lines += f"║ {Fore.WHITE}  - time saved      : {saved:<7.2f} s{Fore.CYAN}                     ║\n"
+        
+        # Utilization of the read/transform/write stages
+        pipeline_lines = ""
+        utilization = self._pipeline_utilization()
+        if utilization:
+            for stage in ConversionPipeline.STAGES:
+                pipeline_lines += f"║ {Fore.WHITE}{stage.capitalize() + ' stage':<19}: {utilization[stage]:>5.1f} % busy{Fore.CYAN}                   ║\n"
+            pipeline_lines += f"║ {Fore.WHITE}Bottleneck         : {utilization['bottleneck']:<27}{Fore.CYAN}    ║\n"
+        
+        # Conversion details of every registered rule
+        change_lines = ""
+        for key, label, option in self.registry.counters():
+            if option and not getattr(self, option, False):
+                continue
+            change_lines += f"║ {Fore.WHITE}  - {label:<18}: {self.stats['changes'].get(key, 0):<5}{Fore.CYAN}                       ║\n"
         
         report = f"""
 {Fore.CYAN}╔══════════════════════════════════════════════════════════╗
@@ -1160,33 +5249,115 @@ class Odoo18Converter:
 ║ {Fore.RED}Files in error     : {self.stats['files_error']:<5}{Fore.CYAN}                       ║
 ╠══════════════════════════════════════════════════════════╣
 ║ {Fore.WHITE}Execution time     : {minutes:02d}:{seconds:02d} min{Fore.CYAN}                      ║
-╠══════════════════════════════════════════════════════════╣
+{cache_lines}{domain_lines}{prefilter_lines}{pipeline_lines}╠══════════════════════════════════════════════════════════╣
 ║ {Fore.YELLOW}Conversion details:{Fore.CYAN}                                ║
-║ {Fore.WHITE}  - tree → list       : {self.stats['changes']['tree_to_list']:<5}{Fore.CYAN}                       ║
-║ {Fore.WHITE}  - attrs             : {self.stats['changes']['attrs_conversion']:<5}{Fore.CYAN}                       ║
-║ {Fore.WHITE}  - states            : {self.stats['changes']['states_conversion']:<5}{Fore.CYAN}                       ║
-║ {Fore.WHITE}  - daterange         : {self.stats['changes']['daterange_update']:<5}{Fore.CYAN}                       ║
-║ {Fore.WHITE}  - chatter           : {self.stats['changes']['chatter_simplified']:<5}{Fore.CYAN}                       ║
-║ {Fore.WHITE}  - settings          : {self.stats['changes']['settings_structure']:<5}{Fore.CYAN}                       ║
-{additional_stats}╚══════════════════════════════════════════════════════════╝{Style.RESET_ALL}
+{change_lines}╚══════════════════════════════════════════════════════════╝{Style.RESET_ALL}
 """
         print(report)
         
+        # Per-module sub-reports in batch mode
+        if self.module_stats:
+            self.show_module_statistics()
+        
+        # Slowest rules and files when profiling
+        if self.profiler is not None:
+            self.show_profile()
+        
         # Display detailed statistics on directories and extensions processed
         self.show_statistics()
         
         # Display success or failure message
         if self.stats['files_error'] > 0:
             print(f"{Fore.RED}⚠️ Errors encountered during conversion.{Style.RESET_ALL}")
-            print(f"{Fore.YELLOW}   Check journal file for more details.{Style.RESET_ALL}")
+            if self.log_file:
+                print(f"{Fore.YELLOW}   Check the log file for more details: {self.log_file}{Style.RESET_ALL}")
+            else:
+                print(f"{Fore.YELLOW}   Check the messages above for more details.{Style.RESET_ALL}")
         else:
             print(f"{Fore.GREEN}✅ Conversion completed successfully !{Style.RESET_ALL}")
             
         # If files were saved in a different directory
-        if self.output_dir:
+        if self.dry_run:
+            print(f"\n{Fore.YELLOW}Test mode - no file was modified{Style.RESET_ALL}")
+        elif self.output_dir:
             print(f"\n{Fore.CYAN}📁 Converted files saved in: {self.output_dir}{Style.RESET_ALL}")
-        elif self.backup and not self.dry_run:
-            print(f"\n{Fore.CYAN}💾 Created backups of original files (.bak){Style.RESET_ALL}")
+        elif self.backup_store is not None and self.stats['backups']:
+            print(f"\n{Fore.CYAN}💾 Backed up {len(self.stats['backups'])} original file(s) in {self.backup_store.store_dir} (run {self.run_id}){Style.RESET_ALL}")
+            print(f"{Fore.CYAN}   Restore them with: python odoo18_converter.py rollback {self.run_id} --backup-dir {self.backup_store.store_dir}{Style.RESET_ALL}")
+
+    def _pipeline_utilization(self):
+        """Busy percentage of every pipeline stage and the stage bounding the run"""
+        pipeline = self.stats['pipeline']
+        if not pipeline['transform_capacity']:
+            return None
+        utilization = {}
+        for stage in ConversionPipeline.STAGES:
+            capacity = pipeline[f'{stage}_capacity']
+            utilization[stage] = 100.0 * pipeline[f'{stage}_busy'] / capacity if capacity else 0.0
+        busiest = max(ConversionPipeline.STAGES, key=lambda stage: utilization[stage])
+        utilization['bottleneck'] = f"{busiest} ({'CPU' if busiest == 'transform' else 'I/O'}-bound)"
+        return utilization
+
+    def _prefilter_time_saved(self):
+        """Estimate of the time saved by the prefilter, in seconds
+
+        Skipped bytes are valued at the average processing time per byte of
+        the files that went through the conversion, minus the time spent
+        scanning.
+        """
+        prefilter = self.stats['prefilter']
+        if not prefilter['processed_bytes']:
+            return 0.0
+        seconds_per_byte = prefilter['processed_time'] / prefilter['processed_bytes']
+        return max(0.0, prefilter['skipped_bytes'] * seconds_per_byte - prefilter['scan_time'])
+
+    def show_module_statistics(self, limit=15):
+        """Display the sub-reports of the modules converted in batch mode"""
+        modules = sorted(self.module_stats.items(),
+                         key=lambda item: (item[1]['error'] is None, -sum(item[1]['changes'].values()), item[0]))
+        print(f"\n{Fore.CYAN}╔══════════════════════════════════════════════════════════╗")
+        print(f"║ {Fore.YELLOW}              MODULE STATISTICS                    {Fore.CYAN}║")
+        print(f"╠══════════════════════════════════════════════════════════╣")
+        print(f"║ {Fore.WHITE}Module               Files  Mod.  Err.  Changes  Time  {Fore.CYAN}║")
+        print(f"╟──────────────────────────────────────────────────────────╢")
+        for name, module in modules[:limit]:
+            color = Fore.RED if module['error'] or module['files_error'] else Fore.WHITE
+            display_name = os.path.basename(name) if name == module['path'] else name
+            if len(display_name) > 20:
+                display_name = "..." + display_name[-17:]
+            print(f"║ {color}{display_name:<20} {module['files']:>5} {module['files_changed']:>5} "
+                  f"{module['files_error']:>5} {sum(module['changes'].values()):>8} {module['duration_seconds']:>5.1f}s {Fore.CYAN}║")
+        if len(modules) > limit:
+            print(f"║ {Fore.WHITE}... and {len(modules) - limit} other module(s){' ' * 30}{Fore.CYAN}║")
+        slowest = max(self.module_stats.items(), key=lambda item: item[1]['duration_seconds'])
+        print(f"╟──────────────────────────────────────────────────────────╢")
+        print(f"║ {Fore.WHITE}Slowest module     : {os.path.basename(slowest[1]['path'])[:20]:<20} {slowest[1]['duration_seconds']:>6.2f} s{Fore.CYAN}    ║")
+        print(f"╚══════════════════════════════════════════════════════════╝{Style.RESET_ALL}")
+
+    def show_profile(self):
+        """Display the slowest rules and files measured by the profiler"""
+        limit = self.profile or 10
+        print(f"\n{Fore.CYAN}╔══════════════════════════════════════════════════════════╗")
+        print(f"║ {Fore.YELLOW}                     PROFILE                          {Fore.CYAN}║")
+        print(f"╠══════════════════════════════════════════════════════════╣")
+        print(f"║ {Fore.WHITE}Rule                   Calls    Wall     CPU   Peak KB {Fore.CYAN}║")
+        print(f"╟──────────────────────────────────────────────────────────╢")
+        for rule_id, entry in self.profiler.slowest_rules(limit):
+            print(f"║ {Fore.WHITE}{rule_id[:22]:<22} {entry['calls']:>5} {entry['wall']:>6.3f}s {entry['cpu']:>6.3f}s "
+                  f"{entry['peak'] / 1024:>8.0f} {Fore.CYAN}║")
+        print(f"╟──────────────────────────────────────────────────────────╢")
+        print(f"║ {Fore.WHITE}File                          Wall     CPU   Peak KB {Fore.CYAN}║")
+        print(f"╟──────────────────────────────────────────────────────────╢")
+        for path, wall, cpu, peak in self.profiler.slowest_files(limit):
+            display_path = self._relative_path(path)
+            if len(display_path) > 26:
+                display_path = "..." + display_path[-23:]
+            print(f"║ {Fore.WHITE}{display_path:<26} {wall:>6.3f}s {cpu:>6.3f}s {peak / 1024:>8.0f} {Fore.CYAN}║")
+        print(f"╚══════════════════════════════════════════════════════════╝{Style.RESET_ALL}")
+        if not self.profiler.trace_memory:
+            print(f"{Fore.YELLOW}   Peak allocations need Python 3.9 or later{Style.RESET_ALL}")
+        if self.profile_dir:
+            print(f"{Fore.CYAN}   cProfile statistics saved in: {self.profile_dir} (python -m pstats <file>){Style.RESET_ALL}")
 
     def show_statistics(self):
         """Display detailed statistics on directories and extensions processed"""
@@ -1194,38 +5365,37 @@ class Odoo18Converter:
         folder_stats = {}
         extension_stats = {}
         
-        # Get list of directories and extensions processed
-        for root, _, files in os.walk(self.source_dir):
-            rel_path = os.path.relpath(root, self.source_dir)
+        # Directories and extensions from the discovery index
+        if self.index is None:
+            self.index = FileIndex.scan(self.roots, workers=self.scan_workers)
+        for entry in self.index:
+            rel_path = self._relative_path(os.path.dirname(entry.path))
             folder_key = rel_path if rel_path != '.' else 'root'
-            folder_stats[folder_key] = {
-                'total': 0,
-                'xml': 0,
-                'py': 0,
-                'other': 0,
-                'processed': 0,
-                'modified': 0
-            }
+            if folder_key not in folder_stats:
+                folder_stats[folder_key] = {
+                    'total': 0,
+                    'xml': 0,
+                    'py': 0,
+                    'other': 0,
+                    'processed': 0,
+                    'modified': 0
+                }
             
-            for file in files:
-                file_path = os.path.join(root, file)
-                file_ext = os.path.splitext(file)[1].lower()
-                
-                # Increment total counter for this directory
-                folder_stats[folder_key]['total'] += 1
-                
-                # Count by extension
-                if file_ext == '.xml':
-                    folder_stats[folder_key]['xml'] += 1
-                elif file_ext == '.py':
-                    folder_stats[folder_key]['py'] += 1
-                else:
-                    folder_stats[folder_key]['other'] += 1
-                
-                # Count global statistics by extension
-                if file_ext not in extension_stats:
-                    extension_stats[file_ext] = 0
-                extension_stats[file_ext] += 1
+            # Increment total counter for this directory
+            folder_stats[folder_key]['total'] += 1
+            
+            # Count by extension
+            if entry.ext == '.xml':
+                folder_stats[folder_key]['xml'] += 1
+            elif entry.ext == '.py':
+                folder_stats[folder_key]['py'] += 1
+            else:
+                folder_stats[folder_key]['other'] += 1
+            
+            # Count global statistics by extension
+            if entry.ext not in extension_stats:
+                extension_stats[entry.ext] = 0
+            extension_stats[entry.ext] += 1
         
         # Display statistics by directory (display only most relevant ones)
         print(f"\n{Fore.CYAN}╔══════════════════════════════════════════════════════════╗")
@@ -1282,6 +5452,37 @@ class Odoo18Converter:
             },
             'changes': self.stats['changes']
         }
+        domains = self.stats['domains']
+        if domains['hits'] + domains['misses']:
+            report['domains'] = dict(domains, hit_rate=domains['hits'] / (domains['hits'] + domains['misses']))
+        if self.backup_store is not None:
+            report['backup'] = {
+                'run_id': self.run_id,
+                'directory': self.backup_store.store_dir,
+                'files': len(self.stats['backups'])
+            }
+        if self.cache is not None:
+            report['cache'] = dict(self.stats['cache'], directory=self.cache_dir)
+        if self.prefilter:
+            report['prefilter'] = dict(self.stats['prefilter'], estimated_time_saved_seconds=self._prefilter_time_saved())
+        utilization = self._pipeline_utilization()
+        if utilization:
+            report['pipeline'] = dict(self.stats['pipeline'], io_threads=self.io_threads,
+                                      utilization_percent={stage: utilization[stage] for stage in ConversionPipeline.STAGES},
+                                      bottleneck=utilization['bottleneck'])
+        if self.module_stats:
+            report['addons_paths'] = self.roots
+            report['modules'] = self.module_stats
+        if self.profiler is not None:
+            limit = self.profile or 10
+            report['profile'] = {
+                'rules': dict(self.profiler.slowest_rules(len(self.profiler.rules))),
+                'slowest_files': [
+                    {'path': path, 'wall_seconds': wall, 'cpu_seconds': cpu, 'peak_bytes': peak}
+                    for path, wall, cpu, peak in self.profiler.slowest_files(limit)
+                ],
+                'dump_dir': self.profile_dir
+            }
         
         try:
             with open(self.report_file, 'w') as f:
@@ -1316,21 +5517,576 @@ before using them in production.{Style.RESET_ALL}
 
     def update_stats(self, result):
         """Update statistics with conversion result"""
-        if result:
-            for key, value in result.items():
-                if key in self.stats:
-                    if isinstance(value, dict):
-                        for subkey, subvalue in value.items():
-                            if subkey in self.stats[key]:
-                                self.stats[key][subkey] += subvalue
-                    else:
-                        self.stats[key] += value
+        self._merge_worker_stats(self.stats, result)
+
+    def _merge_worker_stats(self, stats, result):
+        """Merge a conversion result into statistics, taking out the data sent by pool workers"""
+        if result and 'results' in result:
+            # File results of a pool worker, streamed as they arrive
+            records = result.pop('results')
+            if self.results is not None:
+                for record in records:
+                    self.results.append(record)
+        if result and 'patch' in result:
+            # Diffs computed by a pool worker
+            entries = result.pop('patch')
+            if self.patch is not None:
+                self.patch.extend(entries)
+        if result and 'profile' in result:
+            # Measurements of a pool worker
+            profile = result.pop('profile')
+            if self.profiler is not None:
+                self.profiler.merge(profile)
+        merge_stats(stats, result)
+
+
+def merge_stats(stats, result):
+    """Add the counters of a conversion result to a statistics dictionary"""
+    if result:
+        for key, value in result.items():
+            if key in stats:
+                if isinstance(value, dict):
+                    for subkey, subvalue in value.items():
+                        if subkey in stats[key]:
+                            stats[key][subkey] += subvalue
+                else:
+                    stats[key] += value
+
+
+# Converter of the current pool worker process, built once by _init_worker()
+_worker_converter = None
+
+
+def _init_worker(options, log_queue=None, log_level=logging.INFO):
+    """Initializer of the pool worker processes: build the converter once per worker"""
+    global _worker_converter
+    # The results stream is written by the parent process only
+    options = dict(options)
+    results_file = options.pop('results_file', None)
+    patch_file = options.pop('patch_file', None)
+    if log_queue is not None:
+        # Records are formatted and printed by the parent process
+        for handler in list(logger.handlers):
+            logger.removeHandler(handler)
+        import logging.handlers
+        logger.addHandler(logging.handlers.QueueHandler(log_queue))
+        logger.setLevel(log_level)
+        logger.propagate = False
+    _worker_converter = Odoo18Converter(**options)
+    if results_file:
+        _worker_converter.results = []
+    if patch_file:
+        _worker_converter.patch = []
+
+
+def _convert_module_task(key, files):
+    """Convert all the files of a module in a pool worker"""
+    key, stats, duration, error = _worker_converter._convert_module(key, files)
+    return key, _worker_converter._worker_result(stats), duration, error
+
+
+def _convert_windows(windows):
+    """Convert windows of a file split at top-level elements in a pool worker"""
+    return _worker_converter._convert_windows(windows)
+
+
+def _convert_chunk(chunk):
+    """Convert a chunk of (path, extension) files in a pool worker
+
+    Returns the number of files and their merged statistics, so that a single
+    small result crosses the process boundary per chunk.
+    """
+    stats = _worker_converter._profiled(_worker_converter._pipeline().run, chunk)
+    return len(chunk), _worker_converter._worker_result(stats)
+
+
+def _serve_task(request):
+    """Answer a request of the conversion server in a pool worker"""
+    return ConversionServer(_worker_converter).handle(request)
+
+
+def _convert_texts(items):
+    """Convert a chunk of (content, kind) items in a pool worker of a ConversionPool"""
+    return [_worker_converter.convert_text(content, kind) for content, kind in items]
+
+
+# Library API: conversion of contents in memory, without any output. The
+# converters are built once per set of options and reused between calls.
+LIBRARY_DEFAULTS = {
+    'source_dir': '.',
+    'backup': False,
+    'convert_python': True,
+    'stream_threshold': 0,
+    'split_threshold': 0
+}
+
+_library_converters = {}
+_library_lock = threading.Lock()
+
+
+def _converter_options(options):
+    """Constructor arguments of the converter of the library API for the given options"""
+    return dict(LIBRARY_DEFAULTS, **(options or {}))
+
+
+def _library_converter(options):
+    """Converter (and its lock) shared by the convert_text() calls with the same options"""
+    key = repr(sorted((options or {}).items(), key=lambda item: item[0]))
+    with _library_lock:
+        if key not in _library_converters:
+            _library_converters[key] = (Odoo18Converter(**_converter_options(options)), threading.Lock())
+        return _library_converters[key]
+
+
+def _library_item(item):
+    """(content, kind) of an item of convert_many(): a content, or a (content, kind) pair"""
+    if isinstance(item, str):
+        return item, 'xml'
+    content, kind = item
+    return content, kind or 'xml'
+
+
+class ConversionPool:
+    """Reusable pool converting contents in memory (library API)
+
+    options are the Odoo18Converter arguments (advanced_conditions,
+    legacy_engine, cache_dir, registry...). With a single worker the
+    contents are converted in the calling process. Usable as a context
+    manager; close() stops the worker processes.
+    """
+    DEFAULT_CHUNK_SIZE = 64
+
+    def __init__(self, options=None, workers=None):
+        self.options = _converter_options(options)
+        self.workers = max(1, workers or os.cpu_count() or 1)
+        self.converter, self.lock = _library_converter(options)
+        self.executor = None
+        if self.workers > 1:
+            context = None
+            if sys.platform.startswith('linux') and 'fork' in multiprocessing.get_all_start_methods():
+                context = multiprocessing.get_context('fork')
+            self.executor = concurrent.futures.ProcessPoolExecutor(
+                max_workers=self.workers, mp_context=context, initializer=_init_worker,
+                initargs=(self.options,))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        if self.executor is not None:
+            self.executor.shutdown()
+            self.executor = None
+
+    def convert_text(self, content, kind='xml', path=None):
+        """Convert a content in the calling process"""
+        with self.lock:
+            return self.converter.convert_text(content, kind, path)
+
+    def _convert_chunk(self, chunk):
+        with self.lock:
+            return [self.converter.convert_text(content, kind) for content, kind in chunk]
+
+    def _chunks(self, items, chunksize):
+        chunk = []
+        for item in items:
+            chunk.append(_library_item(item))
+            if len(chunk) >= chunksize:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+    def map(self, items, chunksize=DEFAULT_CHUNK_SIZE):
+        """Convert an iterable of contents, yielding their ConversionResult in order
+
+        The items are consumed as the results are produced: a few chunks per
+        worker are in flight at any time, whatever the length of the iterable.
+        """
+        if self.executor is None:
+            for chunk in self._chunks(items, chunksize):
+                yield from self._convert_chunk(chunk)
+            return
+        pending = deque()
+        for chunk in self._chunks(items, chunksize):
+            pending.append(self.executor.submit(_convert_texts, chunk))
+            if len(pending) >= self.workers * 2:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+
+    async def amap(self, items, chunksize=DEFAULT_CHUNK_SIZE):
+        """Asynchronous map(): the conversions run out of the event loop"""
+        # get_running_loop() appeared in Python 3.7
+        loop = asyncio.get_running_loop() if hasattr(asyncio, 'get_running_loop') else asyncio.get_event_loop()
+        pending = deque()
+        for chunk in self._chunks(items, chunksize):
+            if self.executor is None:
+                pending.append(loop.run_in_executor(None, self._convert_chunk, chunk))
+            else:
+                pending.append(asyncio.wrap_future(self.executor.submit(_convert_texts, chunk)))
+            if len(pending) >= self.workers * 2:
+                for result in await pending.popleft():
+                    yield result
+        while pending:
+            for result in await pending.popleft():
+                yield result
+
+
+def convert_text(content, kind='xml', options=None):
+    """Convert an XML or Python content in memory
+
+    Returns a ConversionResult holding the converted content and the counts
+    of the rules. Nothing is printed, logged to the console, read or written.
+    """
+    converter, lock = _library_converter(options)
+    with lock:
+        return converter.convert_text(content, kind)
+
+
+def convert_many(items, options=None, pool=None, workers=None):
+    """Convert an iterable of contents (or (content, kind) pairs), yielding the results in order
+
+    The conversions run over pool, a ConversionPool reused between calls, or
+    over a pool of workers processes created for this call.
+    """
+    if pool is not None:
+        yield from pool.map(items)
+        return
+    with ConversionPool(options, workers) as pool:
+        yield from pool.map(items)
+
+
+async def convert_many_async(items, options=None, pool=None, workers=None):
+    """Asynchronous convert_many(), for asyncio services"""
+    if pool is not None:
+        async for result in pool.amap(items):
+            yield result
+        return
+    with ConversionPool(options, workers) as pool:
+        async for result in pool.amap(items):
+            yield result
+
+
+# Registry of the conversion rules, with the built-in rules in the order of
+# the legacy chain. Third-party rule packs are added from entry points.
+RULES = RuleRegistry()
+
+RULES.register(ConversionRule(
+    'tree_to_list', 'tree → list',
+    triggers=('<tree', '</tree>'),
+    patterns=[
+        ('<tree', r'<tree', Odoo18Converter._replace_tree_open),
+        ('</tree>', r'</tree>', lambda converter, match, counters: '</list>'),
+    ],
+))
+RULES.register(ConversionRule(
+    'attrs_conversion', 'attrs',
+    triggers=('attrs=',),
+    patterns=[('attrs="', ATTRS_PATTERN, Odoo18Converter._replace_attrs)],
+    counters=[('complex_conditions', 'complex conditions', 'advanced_conditions')],
+    version='2',
+))
+RULES.register(ConversionRule(
+    'states_conversion', 'states',
+    triggers=('states=',),
+    patterns=[('states="', STATES_PATTERN, Odoo18Converter._replace_states)],
+))
+RULES.register(ConversionRule(
+    'daterange_update', 'daterange',
+    triggers=('related_end_date', 'related_start_date'),
+    patterns=[
+        ('<field name="', DATERANGE_START_PATTERN, Odoo18Converter._replace_daterange_start),
+        ('<field name="', DATERANGE_END_PATTERN, Odoo18Converter._remove_daterange_end),
+    ],
+))
+RULES.register(ConversionRule(
+    'chatter_simplified', 'chatter',
+    triggers=('oe_chatter',),
+    cost='dom',
+    patterns=[('<div class="oe_chatter">', pattern, Odoo18Converter._replace_chatter) for pattern in CHATTER_PATTERNS],
+    apply=Odoo18Converter._apply_chatter_fallback,
+))
+RULES.register(ConversionRule(
+    'settings_structure', 'settings',
+    triggers=('data-key=', 'app_settings_block'),
+    cost='dom',
+    apply=Odoo18Converter._apply_settings_structure,
+    after=('chatter_simplified',),
+))
+RULES.register(ConversionRule(
+    'python_states_removed', 'states (Python)',
+    triggers=('states',),
+    kind='python',
+    cost='ast',
+    apply=Odoo18Converter._apply_python_states,
+    option='convert_python',
+    version='2',
+))
+RULES.register(ConversionRule(
+    'python_name_get', 'name_get',
+    triggers=('name_get',),
+    kind='python',
+    cost='ast',
+    apply=Odoo18Converter._apply_python_name_get,
+    option='convert_python',
+))
+RULES.register(ConversionRule(
+    'python_fields_view_get', 'fields_view_get',
+    triggers=('fields_view_get',),
+    kind='python',
+    cost='ast',
+    apply=Odoo18Converter._apply_python_fields_view_get,
+    option='convert_python',
+))
+RULES.register(ConversionRule(
+    'python_name_search', '_name_search',
+    triggers=('_name_search',),
+    kind='python',
+    cost='ast',
+    apply=Odoo18Converter._apply_python_name_search,
+    option='convert_python',
+))
+
+
+def main_rollback(argv):
+    """Restore the files changed by a conversion run from the backup store"""
+    parser = argparse.ArgumentParser(
+        prog='odoo18_converter.py rollback',
+        description=f'{Fore.CYAN}Restore the original files changed by a conversion run{Style.RESET_ALL}',
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter
+    )
+    parser.add_argument('run_id', nargs='?', default='latest',
+                      help="Identifier of the run to roll back ('latest' for the most recent one)")
+    parser.add_argument('--source-dir', default='.',
+                      help='Source directory of the run (holding the default backup store)')
+    parser.add_argument('--backup-dir', default=os.environ.get('ODOO18_CONVERTER_BACKUP_DIR'),
+                      help=f'Backup store of the run (default: {BackupStore.DIR_NAME} in the source directory)')
+    parser.add_argument('--list', action='store_true',
+                      help='List the runs of the backup store and exit')
+    parser.add_argument('--force', action='store_true',
+                      help='Restore files even if they were modified since the run')
+    args = parser.parse_args(argv)
+    _configure_logging()
+    
+    store = BackupStore(args.backup_dir or os.path.join(args.source_dir, BackupStore.DIR_NAME))
+    try:
+        if args.list:
+            runs = store.runs()
+            if not runs:
+                print(f"{Fore.YELLOW}No conversion run in {store.store_dir}{Style.RESET_ALL}")
+            for manifest in runs:
+                state = f" (rolled back {manifest['rolled_back']})" if manifest.get('rolled_back') else ""
+                print(f"{Fore.WHITE}{manifest['run_id']}  {len(manifest['files']):>5} file(s)  {', '.join(manifest['roots'])}{state}{Style.RESET_ALL}")
+            return 0
+        
+        manifest, restored, conflicts = store.rollback(args.run_id, force=args.force)
+    except Exception as e:
+        print(f"{Fore.RED}Error: {str(e)}{Style.RESET_ALL}")
+        return 1
+    
+    if conflicts:
+        print(f"{Fore.RED}❌ {len(conflicts)} file(s) were modified since run {manifest['run_id']}, nothing was restored:{Style.RESET_ALL}")
+        for path in conflicts:
+            print(f"   {path}")
+        print(f"{Fore.YELLOW}   Use --force to restore them anyway.{Style.RESET_ALL}")
+        return 1
+    print(f"{Fore.GREEN}✅ Run {manifest['run_id']} rolled back: {len(restored)} file(s) restored{Style.RESET_ALL}")
+    return 0
+
+
+def main_summarize(argv):
+    """Rebuild the report of a run from its per-file results stream"""
+    parser = argparse.ArgumentParser(
+        prog='odoo18_converter.py summarize',
+        description=f'{Fore.CYAN}Summarize the NDJSON results stream of a conversion run, even interrupted{Style.RESET_ALL}',
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter
+    )
+    parser.add_argument('results_file', help='NDJSON results stream written with --results-file')
+    parser.add_argument('-r', '--report', help='File path for saving the summary (JSON)')
+    args = parser.parse_args(argv)
+    _configure_logging()
+    
+    try:
+        summary = ResultsStream.summarize(args.results_file)
+    except Exception as e:
+        print(f"{Fore.RED}Error: {str(e)}{Style.RESET_ALL}")
+        return 1
+    
+    print(f"{Fore.CYAN}╔══════════════════════════════════════════════════════════╗")
+    print(f"║ {Fore.YELLOW}                  RESULTS SUMMARY                     {Fore.CYAN}║")
+    print(f"╠══════════════════════════════════════════════════════════╣")
+    print(f"║ {Fore.WHITE}Files processed    : {summary['files_processed']:<7}{Fore.CYAN}                     ║")
+    print(f"║ {Fore.GREEN}Files modified     : {summary['files_changed']:<7}{Fore.CYAN}                     ║")
+    print(f"║ {Fore.YELLOW}Skipped (prefilter): {summary['files_skipped_by_prefilter']:<7}{Fore.CYAN}                     ║")
+    print(f"║ {Fore.RED}Files in error     : {summary['files_error']:<7}{Fore.CYAN}                     ║")
+    print(f"║ {Fore.WHITE}Bytes in / out     : {str(summary['bytes_in']) + ' / ' + str(summary['bytes_out']):<27}{Fore.CYAN} ║")
+    print(f"║ {Fore.WHITE}Time in files      : {summary['duration_seconds']:<7.2f} s{Fore.CYAN}                   ║")
+    print(f"╠══════════════════════════════════════════════════════════╣")
+    print(f"║ {Fore.YELLOW}Conversion details:{Fore.CYAN}                                ║")
+    for rule_id, count in sorted(summary['changes'].items()):
+        print(f"║ {Fore.WHITE}  - {rule_id:<22}: {count:<7}{Fore.CYAN}                 ║")
+    print(f"╚══════════════════════════════════════════════════════════╝{Style.RESET_ALL}")
+    for error in summary['errors'][:20]:
+        print(f"{Fore.RED}   {error['path']}: {error['error']}{Style.RESET_ALL}")
+    if not summary['complete']:
+        print(f"{Fore.YELLOW}⚠️ The run did not complete: this summary covers the {summary['files_processed']} file(s) recorded{Style.RESET_ALL}")
+    
+    if args.report:
+        try:
+            with open(args.report, 'w') as f:
+                json.dump(summary, f, indent=2)
+            print(f"{Fore.GREEN}✅ Summary saved in: {args.report}{Style.RESET_ALL}")
+        except Exception as e:
+            print(f"{Fore.RED}❌ Error saving summary: {str(e)}{Style.RESET_ALL}")
+            return 1
+    return 0
+
+
+def main_serve(argv):
+    """Run a conversion server keeping the rules and the worker pool warm"""
+    parser = argparse.ArgumentParser(
+        prog='odoo18_converter.py serve',
+        description=f'{Fore.CYAN}Serve conversions over a Unix socket or stdin/stdout (one JSON object per line){Style.RESET_ALL}',
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter
+    )
+    parser.add_argument('--socket', default=ConversionServer.default_socket(),
+                      help='Unix socket to listen on (default from ODOO18_CONVERTER_SOCKET)')
+    parser.add_argument('--stdio', action='store_true',
+                      help='Read the requests from stdin and write the responses to stdout instead')
+    parser.add_argument('-w', '--workers', type=int, default=1,
+                      help='Number of worker processes converting the items of convert_many requests')
+    parser.add_argument('--advanced-conditions', action='store_true',
+                      help='Enable advanced conditions processing in attrs attributes')
+    parser.add_argument('--legacy-engine', action='store_true',
+                      help='Use the original multi-pass transformation chain instead of the single-pass engine')
+    parser.add_argument('--cache-dir', default=os.environ.get('ODOO18_CONVERTER_CACHE_DIR'),
+                      help='Directory of the persistent conversion cache (no cache if unset)')
+    parser.add_argument('-v', '--verbose', action='store_true',
+                      help='Log the details of every conversion')
+    parser.add_argument('--log-file',
+                      help='File path for saving the log messages')
+    args = parser.parse_args(argv)
+    
+    # Responses only on stdout; the log goes to stderr (or to the log file)
+    _configure_logging(console=False)
+    if args.log_file:
+        _add_log_file(args.log_file)
+    if args.verbose:
+        logger.setLevel(logging.DEBUG)
+    
+    # Files are written by the server only when a request asks for it,
+    # whole: the version control of the project holds the originals
+    converter = Odoo18Converter(
+        source_dir='.',
+        backup=False,
+        verbose=args.verbose,
+        workers=args.workers,
+        convert_python=True,
+        advanced_conditions=args.advanced_conditions,
+        legacy_engine=args.legacy_engine,
+        cache_dir=args.cache_dir,
+        log_file=args.log_file,
+        stream_threshold=0,
+        split_threshold=0
+    )
+    try:
+        with contextlib.ExitStack() as stack:
+            executor = stack.enter_context(converter._worker_pool()) if converter.workers > 1 else None
+            server = ConversionServer(converter, executor)
+            server.warm_up()
+            if args.stdio:
+                server.serve_stream(sys.stdin.buffer, sys.stdout.buffer)
+            else:
+                print(f"Conversion server listening on {args.socket} ({converter.workers} worker(s))", file=sys.stderr)
+                server.serve_socket(args.socket)
+    except KeyboardInterrupt:
+        pass
+    except Exception as e:
+        print(f"Error: {str(e)}", file=sys.stderr)
+        return 1
+    return 0
+
+
+def main_client(argv):
+    """Convert files or stdin through a running conversion server"""
+    parser = argparse.ArgumentParser(
+        prog='odoo18_converter.py client',
+        description=f'{Fore.CYAN}Convert files (pre-commit) or stdin (format-on-save) through a conversion server{Style.RESET_ALL}',
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter
+    )
+    parser.add_argument('files', nargs='*',
+                      help='Files to convert in place (without files, stdin is converted to stdout)')
+    parser.add_argument('--socket', default=ConversionServer.default_socket(),
+                      help='Unix socket of the server (default from ODOO18_CONVERTER_SOCKET)')
+    parser.add_argument('--kind', choices=['xml', 'python'],
+                      help='Kind of the content read from stdin (default: from --stdin-filename, else xml)')
+    parser.add_argument('--stdin-filename',
+                      help='Name of the file whose content is read from stdin')
+    parser.add_argument('--check', action='store_true',
+                      help='Do not write the files, only report those that would be converted')
+    args = parser.parse_args(argv)
+    _configure_logging()
+    
+    # Without a server, the conversion runs in this process (with a cold start)
+    try:
+        client = ConversionClient(args.socket)
+        send = client.request
+    except OSError:
+        client = None
+        converter = Odoo18Converter(source_dir='.', backup=False, convert_python=True,
+                                    stream_threshold=0, split_threshold=0)
+        send = ConversionServer(converter).handle
+    
+    try:
+        if not args.files:
+            content = sys.stdin.read()
+            response = send({'method': 'convert', 'content': content, 'kind': args.kind,
+                             'path': args.stdin_filename})
+            if response.get('error'):
+                sys.stdout.write(content)
+                print(f"Error: {response['error']}", file=sys.stderr)
+                return 1
+            sys.stdout.write(response['content'])
+            return 0
+        
+        items = [{'method': 'convert', 'path': os.path.abspath(path), 'write': not args.check}
+                 for path in args.files if os.path.splitext(path)[1].lower() in ('.xml', '.py')]
+        results = send({'method': 'convert_many', 'items': items}).get('results', [])
+        status = 0
+        for result in results:
+            path = os.path.relpath(result['path'])
+            if result.get('error'):
+                print(f"{Fore.RED}❌ {path}: {result['error']}{Style.RESET_ALL}")
+                status = 1
+            elif result['changed']:
+                changes = ', '.join(f"{key}: {count}" for key, count in result['changes'].items())
+                action = 'would be converted' if args.check else 'converted'
+                print(f"{Fore.YELLOW}{path} {action} ({changes}){Style.RESET_ALL}")
+                status = 1
+        return status
+    finally:
+        if client is not None:
+            client.close()
 
 
 def main():
+    # Subcommands
+    if len(sys.argv) > 1 and sys.argv[1] == 'serve':
+        return main_serve(sys.argv[2:])
+    if len(sys.argv) > 1 and sys.argv[1] == 'rollback':
+        return main_rollback(sys.argv[2:])
+    if len(sys.argv) > 1 and sys.argv[1] == 'summarize':
+        return main_summarize(sys.argv[2:])
+    if len(sys.argv) > 1 and sys.argv[1] == 'client':
+        return main_client(sys.argv[2:])
+    
     # Check if arguments are provided
     if len(sys.argv) == 1:
         # No arguments, launch interactive mode
+        _configure_logging()
         interactive_mode = InteractiveMode()
         options = interactive_mode.run()
         
@@ -1369,14 +6125,19 @@ def main():
         formatter_class=argparse.ArgumentDefaultsHelpFormatter
     )
     
-    # Required arguments
-    parser.add_argument('source_dir', help='Source directory containing files to convert')
+    # Source: a directory, or the addons paths of a whole project
+    parser.add_argument('source_dir', nargs='?', help='Source directory containing files to convert')
+    parser.add_argument('--addons-path', nargs='+', default=[],
+                      help='Batch mode: addons paths (space or comma separated, like Odoo) whose modules '
+                           'are all converted, each module being scheduled as a whole on a worker')
     
     # Optional arguments
     parser.add_argument('-o', '--output-dir', 
                       help='Output directory for converted files (if not specified, modify files in place)')
     parser.add_argument('--no-backup', action='store_false', dest='backup', 
                       help='Do not create backups of original files')
+    parser.add_argument('--backup-dir', default=os.environ.get('ODOO18_CONVERTER_BACKUP_DIR'),
+                      help=f'Backup store of the original files (default: {BackupStore.DIR_NAME} in the source directory)')
     parser.add_argument('-v', '--verbose', action='store_true', 
                       help='Display detailed information about the process')
     parser.add_argument('-e', '--extensions', nargs='+', default=['.xml'],
@@ -1385,10 +6146,40 @@ def main():
                       help='Regex patterns to ignore certain files')
     parser.add_argument('-r', '--report',
                       help='File path for saving conversion report (JSON)')
+    parser.add_argument('--results-file',
+                      help='File path for streaming the result of every file (NDJSON), '
+                           'summarized with: odoo18_converter.py summarize <file>')
+    parser.add_argument('--patch', metavar='FILE',
+                      help='Write the changes as a unified diff ordered by path, with per-file and per-rule counts '
+                           '(with --dry-run: a preview of the conversion, nothing is modified)')
+    parser.add_argument('--files-from', metavar='FILE',
+                      help='Convert the files listed in FILE (one per line, - for stdin) instead of walking the source directory')
+    parser.add_argument('-0', '--null', action='store_true',
+                      help='The file list of --files-from is NUL-delimited (git diff -z, find -print0)')
+    parser.add_argument('--since', metavar='REF',
+                      help='Convert only the files added or modified since a git ref (working tree against REF)')
+    parser.add_argument('--staged', action='store_true',
+                      help='Convert only the files staged in the git index, and stage the converted contents')
+    parser.add_argument('--refs', nargs='+', metavar='REF',
+                      help='Convert the trees of git refs or commit ranges (A..B), each distinct file once, '
+                           'into new commits pointed to by refs under --refs-prefix')
+    parser.add_argument('--refs-prefix', default=REFS_PREFIX, metavar='PREFIX',
+                      help=f'Namespace of the refs of the converted commits (default: {REFS_PREFIX})')
+    parser.add_argument('-q', '--quiet', action='store_true',
+                      help='No banners, progress nor report: converted files, errors and a summary line only '
+                           '(banners and progress are also skipped when the output is not a terminal)')
+    parser.add_argument('--watch', action='store_true',
+                      help='After the conversion, keep running and reconvert the files as they are saved')
+    parser.add_argument('--watch-debounce', type=int, default=50, metavar='MS',
+                      help='Quiet time in milliseconds ending a burst of file events in watch mode')
+    parser.add_argument('--poll', action='store_true',
+                      help='Watch mode: poll the source trees instead of using inotify')
+    parser.add_argument('--log-file',
+                      help='File path for saving the log messages (debug messages with --verbose)')
     parser.add_argument('-w', '--workers', type=int, default=1,
                       help='Number of worker processes for parallel processing')
     parser.add_argument('-d', '--dry-run', action='store_true',
-                      help='Test mode: do not modify files, simply display what would be done')
+                      help='Test mode: convert the files without modifying them (no backups) and report what would change')
     parser.add_argument('-i', '--interactive', action='store_true',
                       help='Interactive mode: ask for confirmation before each modification')
     parser.add_argument('-l', '--show-limitations', action='store_true',
@@ -1401,8 +6192,35 @@ def main():
                       help='Enable advanced conditions processing in attrs attributes')
     parser.add_argument('--overcome-all', action='store_true',
                       help='Enable all features to overcome limitations')
+    parser.add_argument('--legacy-engine', action='store_true',
+                      help='Use the original multi-pass transformation chain instead of the single-pass engine')
+    parser.add_argument('--scan-workers', type=int, default=DEFAULT_SCAN_WORKERS,
+                      help='Number of threads scanning directories in parallel (useful on network file systems)')
+    parser.add_argument('--io-threads', type=int, default=DEFAULT_IO_THREADS,
+                      help='Reader threads overlapping file reads with the transformations (0 to disable)')
+    parser.add_argument('--stream-threshold', type=int, default=STREAM_THRESHOLD // (1024 * 1024),
+                      help='Size in MB from which XML files are converted window by window, '
+                           'split at top-level elements, instead of being loaded whole (0 to disable)')
+    parser.add_argument('--split-threshold', type=int, default=SPLIT_THRESHOLD // (1024 * 1024),
+                      help='Size in MB from which XML files are split at top-level elements and converted '
+                           'across the workers in parallel runs (0 to disable)')
+    parser.add_argument('--domain-cache-size', type=int, default=DEFAULT_DOMAIN_CACHE_SIZE,
+                      help='Number of compiled attrs domains kept in memory')
+    parser.add_argument('--profile', type=int, nargs='?', const=10, default=0, metavar='N',
+                      help='Measure wall time, CPU time and peak allocation per rule and per file, '
+                           'and report the N slowest (default N: 10)')
+    parser.add_argument('--profile-dir',
+                      help='Write the cProfile statistics of the main process and of each worker in this directory')
+    parser.add_argument('--no-prefilter', action='store_false', dest='prefilter',
+                      help='Transform every candidate file, even without legacy constructs')
+    parser.add_argument('--cache-dir', default=os.environ.get('ODOO18_CONVERTER_CACHE_DIR'),
+                      help='Directory of the persistent conversion cache (can be shared between CI runners, '
+                           'default from ODOO18_CONVERTER_CACHE_DIR; no cache if unset)')
+    parser.add_argument('--cache-max-size', type=int, default=ConversionCache.DEFAULT_MAX_SIZE // (1024 * 1024),
+                      help='Maximum size of the conversion cache in MB (least recently used entries are evicted)')
     
     args = parser.parse_args()
+    _configure_logging(records=not args.quiet)
     
     # Display only limitations if requested
     if args.show_limitations:
@@ -1415,12 +6233,50 @@ def main():
         args.convert_python = True
         args.advanced_conditions = True
     
-    if not os.path.isdir(args.source_dir):
-        print(f"{Fore.RED}Error: Directory {args.source_dir} doesn't exist{Style.RESET_ALL}")
-        return 1
+    if args.verbose:
+        logger.setLevel(logging.DEBUG)
+    if args.log_file:
+        _add_log_file(args.log_file)
+    
+    if sum(map(bool, (args.files_from, args.since, args.staged, args.refs))) > 1:
+        parser.error("--files-from, --since, --staged and --refs cannot be combined")
+    if args.staged and args.output_dir:
+        parser.error("--staged converts the files in the git index, it cannot be used with --output-dir")
+    if args.refs and (args.output_dir or args.watch or args.patch):
+        parser.error("--refs writes git commits, it cannot be used with --output-dir, --watch or --patch")
+    if args.refs and not args.refs_prefix.startswith('refs/'):
+        parser.error("--refs-prefix must start with refs/")
+    if args.refs and not args.refs_prefix.endswith('/'):
+        args.refs_prefix += '/'
+    
+    files = None
+    if args.files_from:
+        try:
+            if args.files_from == '-':
+                data = sys.stdin.buffer.read()
+            else:
+                with open(args.files_from, 'rb') as f:
+                    data = f.read()
+        except OSError as e:
+            print(f"{Fore.RED}Error: Cannot read the file list: {str(e)}{Style.RESET_ALL}")
+            return 1
+        paths = data.split(b'\0') if args.null else data.splitlines()
+        files = [os.fsdecode(path) for path in paths if path.strip()]
+    
+    addons_paths = [path for value in args.addons_path for path in value.split(',') if path]
+    if not args.source_dir and not addons_paths:
+        if files is None and not args.since and not args.staged and not args.refs:
+            parser.error("a source directory, --addons-path, --files-from, --since, --staged or --refs is required")
+        args.source_dir = '.'
+    if args.source_dir and addons_paths:
+        addons_paths.insert(0, args.source_dir)
+    for directory in ([args.source_dir] if args.source_dir else []) + addons_paths:
+        if not os.path.isdir(directory):
+            print(f"{Fore.RED}Error: Directory {directory} doesn't exist{Style.RESET_ALL}")
+            return 1
     
     converter = Odoo18Converter(
-        source_dir=args.source_dir,
+        source_dir=args.source_dir or addons_paths[0],
         output_dir=args.output_dir,
         backup=args.backup,
         verbose=args.verbose,
@@ -1431,11 +6287,39 @@ def main():
         dry_run=args.dry_run,
         interactive=args.interactive,
         convert_python=args.convert_python, 
-        advanced_conditions=args.advanced_conditions
+        advanced_conditions=args.advanced_conditions,
+        legacy_engine=args.legacy_engine,
+        cache_dir=args.cache_dir,
+        cache_max_size=args.cache_max_size * 1024 * 1024,
+        prefilter=args.prefilter,
+        scan_workers=args.scan_workers,
+        addons_paths=addons_paths or None,
+        io_threads=args.io_threads,
+        backup_dir=args.backup_dir,
+        domain_cache_size=args.domain_cache_size,
+        profile=args.profile,
+        profile_dir=args.profile_dir,
+        log_file=args.log_file,
+        results_file=args.results_file,
+        stream_threshold=args.stream_threshold * 1024 * 1024,
+        split_threshold=args.split_threshold * 1024 * 1024,
+        quiet=args.quiet,
+        files=files,
+        since=args.since,
+        patch_file=args.patch
     )
     
     try:
-        converter.convert_all()
+        if args.staged:
+            converter.convert_staged()
+        elif args.refs:
+            converter.convert_refs(args.refs, args.refs_prefix)
+        elif addons_paths:
+            converter.convert_batch()
+        else:
+            converter.convert_all()
+        if args.watch:
+            converter.watch(debounce=args.watch_debounce / 1000.0, poll=args.poll)
         return 0
     except KeyboardInterrupt:
         print(f"\n{Fore.YELLOW}Conversion interrupted by user.{Style.RESET_ALL}")
@@ -0,0 +1,22 @@
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import odoo18_converter  # noqa: E402
+
+
+@pytest.fixture
+def converter(tmp_path):
+    """Converter of contents in memory, with every rule enabled"""
+    return odoo18_converter.Odoo18Converter(str(tmp_path), backup=False, convert_python=True,
+                                            advanced_conditions=True)
+
+
+@pytest.fixture
+def example_xml():
+    with open(os.path.join(ROOT, 'test_files', 'example.xml'), encoding='utf-8') as f:
+        return f.read()
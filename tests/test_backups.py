@@ -0,0 +1,65 @@
+import os
+
+import pytest
+
+from odoo18_converter import BackupStore, Odoo18Converter
+
+VIEW = '<odoo><record id="v{}" model="ir.ui.view"><field name="arch" type="xml"><tree/></field></record></odoo>\n'
+CLEAN = '<odoo><record id="clean" model="ir.ui.view"/></odoo>\n'
+
+
+@pytest.fixture
+def tree(tmp_path):
+    source = tmp_path / 'module'
+    (source / 'views').mkdir(parents=True)
+    originals = {}
+    for i in range(3):
+        path = source / 'views' / f"view_{i}.xml"
+        path.write_text(VIEW.format(i), encoding='utf-8')
+        originals[str(path)] = path.read_bytes()
+    (source / 'views' / 'clean.xml').write_text(CLEAN, encoding='utf-8')
+    return source, originals
+
+
+def convert(source):
+    converter = Odoo18Converter(str(source), backup=True, quiet=True)
+    converter.convert_all()
+    return converter.backup_store, converter.run_id
+
+
+def test_rollback_restores_originals(tree):
+    source, originals = tree
+    store, run_id = convert(source)
+    assert all(open(path, 'rb').read() != data for path, data in originals.items())
+    manifest, restored, conflicts = store.rollback(run_id)
+    assert not conflicts
+    assert sorted(restored) == sorted(originals)
+    assert all(open(path, 'rb').read() == data for path, data in originals.items())
+    # Only the files actually changed were backed up
+    assert sorted(entry['path'] for entry in manifest['files']) == sorted(originals)
+
+
+def test_rollback_conflicts_restore_nothing(tree):
+    source, originals = tree
+    store, run_id = convert(source)
+    edited = sorted(originals)[1]
+    with open(edited, 'a', encoding='utf-8') as f:
+        f.write('<!-- edited after the run -->\n')
+    converted = {path: open(path, 'rb').read() for path in originals}
+    
+    _, restored, conflicts = store.rollback(run_id)
+    assert conflicts == [edited]
+    assert restored == []
+    assert all(open(path, 'rb').read() == data for path, data in converted.items())
+    assert not [name for name in os.listdir(os.path.dirname(edited)) if name.startswith('.odoo18-rollback-')]
+    
+    _, restored, conflicts = store.rollback(run_id, force=True)
+    assert not conflicts
+    assert all(open(path, 'rb').read() == data for path, data in originals.items())
+
+
+def test_identical_originals_stored_once(tmp_path):
+    store = BackupStore(str(tmp_path / 'store'))
+    assert store.put(b'same content') == store.put(b'same content')
+    assert store.get(store.put(b'same content')) == b'same content'
+    assert sum(len(files) for _, _, files in os.walk(store.objects_dir)) == 1
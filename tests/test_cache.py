@@ -0,0 +1,24 @@
+import os
+
+from odoo18_converter import ConversionCache
+
+
+def test_overwritten_entry_counted_once(tmp_path):
+    cache = ConversionCache(str(tmp_path), 'fingerprint', max_size=1024 * 1024)
+    key = cache.key('xml', '<odoo/>')
+    cache.put(key, '<odoo></odoo>', {'tree_to_list': 1})
+    for _ in range(10):
+        cache.put(key, '<odoo></odoo>', {'tree_to_list': 1})
+    assert cache.size == os.path.getsize(cache._path(key))
+    assert cache.get(key) == ('<odoo></odoo>', {'tree_to_list': 1})
+
+
+def test_eviction_keeps_recent_entries(tmp_path):
+    cache = ConversionCache(str(tmp_path), 'fingerprint', max_size=4096)
+    keys = []
+    for i in range(64):
+        keys.append(cache.key('xml', str(i)))
+        cache.put(keys[-1], os.urandom(64).hex(), {})
+    assert cache.size <= 4096
+    assert cache.size == cache._disk_usage()
+    assert cache.get(keys[-1]) is not None
@@ -0,0 +1,66 @@
+import pytest
+
+from odoo18_converter import DomainCompiler, DomainError
+
+
+@pytest.fixture
+def domains():
+    return DomainCompiler()
+
+
+@pytest.mark.parametrize('attrs, expected, complex_count', [
+    ("{'invisible': [('state', '=', 'draft')]}", [('invisible', "state == 'draft'")], 0),
+    ("{'invisible': [('a', '=', 1), ('b', '=', 2)]}", [('invisible', "a == 1 and b == 2")], 0),
+    ("{'invisible': ['|', ('a', '=', 1), ('b', '!=', False)]}", [('invisible', "a == 1 or b")], 0),
+    ("{'invisible': ['|', '&', ('a', '=', 1), ('b', '=', 2), ('c', 'in', [1, 2])]}",
+     [('invisible', "(a == 1 and b == 2) or c in [1, 2]")], 1),
+    ("{'invisible': ['&', '|', ('a', '=', 1), ('b', '=', 2), ('c', '=', 3)]}",
+     [('invisible', "(a == 1 or b == 2) and c == 3")], 1),
+    ("{'invisible': ['!', ('a', '=', 1)]}", [('invisible', "not a == 1")], 1),
+    ("{'invisible': []}", [('invisible', "True")], 0),
+    ("{'invisible': [('a', '=', False)]}", [('invisible', "not a")], 0),
+    ("{'readonly': [('user_id', '=', uid)]}", [('readonly', "user_id == uid")], 0),
+    ("{'invisible': [('parent.state', '!=', 'draft')]}", [('invisible', "parent.state != 'draft'")], 0),
+    ("{'required': [('a', 'not in', ['x', 'y'])], 'invisible': [('b', '=', context.get('x'))]}",
+     [('required', "a not in ['x', 'y']"), ('invisible', "b == context.get('x')")], 0),
+])
+def test_compile(domains, attrs, expected, complex_count):
+    attributes, count = domains.compile(attrs)
+    assert list(attributes) == expected
+    assert count == complex_count
+
+
+@pytest.mark.parametrize('attrs', [
+    "{'invisible': [('a', 'ilike', 'x')]}",
+    "{'invisible': [('a', '=', 1)",
+    "{'invisible': ['|', ('a', '=', 1)]}",
+])
+def test_unconvertible(domains, attrs):
+    with pytest.raises(DomainError):
+        domains.compile(attrs)
+    # Failures are memoized too
+    with pytest.raises(DomainError):
+        domains.compile(attrs)
+
+
+def test_memoized_by_normalized_form(domains):
+    domains.compile("{'invisible': [('state', '=', 'draft')]}")
+    domains.compile("{'invisible':[('state','=','draft')]}")
+    domains.compile("{'invisible': [('state', '=', 'draft')]}")
+    assert domains.misses == 1
+    assert domains.hits == 2
+
+
+def test_lru_bounded():
+    domains = DomainCompiler(max_size=4)
+    for i in range(10):
+        domains.compile(f"{{'invisible': [('a', '=', {i})]}}")
+    assert len(domains.entries) <= 4
+
+
+def test_attrs_in_view(converter):
+    result = converter.convert_text(
+        '<odoo><form><field name="a" attrs="{\'invisible\': [\'|\', (\'b\', \'=\', 1), (\'parent.c\', \'=\', uid)], '
+        '\'readonly\': []}"/></form></odoo>')
+    assert '<field name="a" invisible="b == 1 or parent.c == uid" readonly="True"/>' in result.content
+    assert result.changes['attrs_conversion'] == 1
@@ -0,0 +1,108 @@
+import os
+import shutil
+import subprocess
+
+import pytest
+
+from odoo18_converter import GitRepository, Odoo18Converter
+
+pytestmark = pytest.mark.skipif(shutil.which('git') is None, reason="git is not installed")
+
+LEGACY = '<odoo><record id="v{}" model="ir.ui.view"><field name="arch" type="xml"><tree/></field></record></odoo>\n'
+CONVERTED = '<odoo><record id="v{}" model="ir.ui.view"><field name="arch" type="xml"><list/></field></record></odoo>\n'
+
+
+def git(repo, *args, input=None):
+    return subprocess.run(['git', '-C', str(repo)] + list(args), input=input, check=True,
+                          stdout=subprocess.PIPE, stderr=subprocess.PIPE).stdout.decode()
+
+
+@pytest.fixture
+def repo(tmp_path):
+    git(tmp_path, 'init', '-q')
+    git(tmp_path, 'config', 'user.email', 'test@example.com')
+    git(tmp_path, 'config', 'user.name', 'Test')
+    views = tmp_path / 'module' / 'views'
+    views.mkdir(parents=True)
+    for i in range(3):
+        (views / f"view_{i}.xml").write_text(LEGACY.format(i), encoding='utf-8')
+    git(tmp_path, 'add', '.')
+    git(tmp_path, 'commit', '-q', '-m', 'init')
+    return tmp_path
+
+
+def test_write_blobs(repo):
+    repository = GitRepository(str(repo))
+    contents = [b'first\n', b'second\n', b'first\n', b'']
+    blob_ids = repository.write_blobs(contents)
+    assert blob_ids == [git(repo, 'hash-object', '--stdin', input=data).strip() for data in contents]
+    assert blob_ids == [repository.blob_id(data) for data in contents]
+    assert repository.read_blobs(blob_ids) == dict(zip(blob_ids, contents))
+    assert repository.write_blob(b'third\n') == repository.blob_id(b'third\n')
+    git(repo, 'fsck', '--strict')
+
+
+def test_convert_staged(repo):
+    views = repo / 'module' / 'views'
+    (views / 'view_0.xml').write_text(LEGACY.format('0b'), encoding='utf-8')
+    (views / 'view_1.xml').write_text(LEGACY.format('1b'), encoding='utf-8')
+    git(repo, 'add', 'module/views/view_0.xml', 'module/views/view_1.xml')
+    # Partially staged: the working copy has unstaged changes
+    (views / 'view_1.xml').write_text(LEGACY.format('1c'), encoding='utf-8')
+    
+    Odoo18Converter(str(repo), backup=False, quiet=True).convert_staged()
+    
+    assert git(repo, 'show', ':module/views/view_0.xml') == CONVERTED.format('0b')
+    assert git(repo, 'show', ':module/views/view_1.xml') == CONVERTED.format('1b')
+    assert (views / 'view_0.xml').read_text(encoding='utf-8') == CONVERTED.format('0b')
+    assert (views / 'view_1.xml').read_text(encoding='utf-8') == LEGACY.format('1c')
+    # Files that were not staged are left alone
+    assert git(repo, 'show', ':module/views/view_2.xml') == LEGACY.format(2)
+    git(repo, 'fsck', '--strict')
+
+
+def test_convert_staged_dry_run(repo):
+    views = repo / 'module' / 'views'
+    (views / 'view_0.xml').write_text(LEGACY.format('0b'), encoding='utf-8')
+    git(repo, 'add', '.')
+    index = (repo / '.git' / 'index').read_bytes()
+    converter = Odoo18Converter(str(repo), backup=False, quiet=True, dry_run=True)
+    converter.convert_staged()
+    assert converter.stats['files_changed'] == 1
+    assert (repo / '.git' / 'index').read_bytes() == index
+    assert (views / 'view_0.xml').read_text(encoding='utf-8') == LEGACY.format('0b')
+
+
+def test_convert_refs(repo):
+    git(repo, 'branch', 'feature')
+    # The same blob as an XML view and as a Python file: each is converted by its own kind
+    models = repo / 'models'
+    models.mkdir()
+    (models / 'legacy.py').write_text(LEGACY.format(0), encoding='utf-8')
+    git(repo, 'add', '.')
+    git(repo, 'commit', '-q', '-m', 'python')
+    head = git(repo, 'rev-parse', 'HEAD').strip()
+    branch = git(repo, 'symbolic-ref', '--short', 'HEAD').strip()
+    
+    converter = Odoo18Converter(str(repo), backup=False, quiet=True, convert_python=True)
+    converter.convert_refs([branch, 'feature'])
+    
+    converted = 'refs/odoo18/heads/' + branch
+    assert git(repo, 'rev-parse', converted + '^').strip() == head
+    for i in range(3):
+        assert git(repo, 'show', f"{converted}:module/views/view_{i}.xml") == CONVERTED.format(i)
+        assert git(repo, 'show', f"refs/odoo18/heads/feature:module/views/view_{i}.xml") == CONVERTED.format(i)
+    assert git(repo, 'show', f"{converted}:models/legacy.py") == LEGACY.format(0)
+    # The branches, the index and the working tree are left untouched
+    assert git(repo, 'rev-parse', 'HEAD').strip() == head
+    assert git(repo, 'status', '--porcelain') == ''
+    git(repo, 'fsck', '--strict')
+
+
+def test_convert_refs_dry_run(repo):
+    objects = sorted(git(repo, 'cat-file', '--batch-all-objects', '--batch-check').splitlines())
+    converter = Odoo18Converter(str(repo), backup=False, quiet=True, dry_run=True)
+    converter.convert_refs(['HEAD'])
+    assert converter.stats['files_changed'] == 3
+    assert git(repo, 'for-each-ref', 'refs/odoo18/') == ''
+    assert sorted(git(repo, 'cat-file', '--batch-all-objects', '--batch-check').splitlines()) == objects
@@ -0,0 +1,35 @@
+import asyncio
+import warnings
+
+import odoo18_converter
+
+VIEW = '<odoo><list><field name="a" attrs="{\'readonly\': [(\'b\', \'=\', %d)]}"/></list></odoo>'
+
+
+def expected(index):
+    return f'<odoo><list><field name="a" readonly="b == {index}"/></list></odoo>'
+
+
+def test_convert_text():
+    result = odoo18_converter.convert_text(VIEW % 1)
+    assert result.content == expected(1) and result.changed
+    assert result.changes == {'attrs_conversion': 1}
+
+
+def test_convert_many_in_order():
+    items = [VIEW % i for i in range(200)] + [('def f():\n    pass\n', 'python')]
+    results = list(odoo18_converter.convert_many(items, workers=2))
+    assert [result.content for result in results[:-1]] == [expected(i) for i in range(200)]
+    assert not results[-1].changed
+
+
+def test_convert_many_async():
+    async def collect(pool):
+        return [result.content async for result in odoo18_converter.convert_many_async(
+            (VIEW % i for i in range(20)), pool=pool)]
+
+    with warnings.catch_warnings():
+        warnings.simplefilter('error', DeprecationWarning)
+        for workers in (1, 2):
+            with odoo18_converter.ConversionPool(workers=workers) as pool:
+                assert asyncio.run(collect(pool)) == [expected(i) for i in range(20)]
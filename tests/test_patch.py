@@ -0,0 +1,48 @@
+import tempfile
+
+from odoo18_converter import Odoo18Converter
+
+VIEW = '<record id="v{0}" model="ir.ui.view"><field name="arch" type="xml"><tree/></field></record>\n'
+
+
+def write_module(root):
+    views = root / 'module' / 'views'
+    views.mkdir(parents=True)
+    small = '<odoo>\n' + VIEW.format('small') + '</odoo>\n'
+    large = '<odoo>\n' + ''.join(VIEW.format(i) for i in range(200)) + '</odoo>\n'
+    (views / 'small.xml').write_text(small, encoding='utf-8')
+    (views / 'large.xml').write_text(large, encoding='utf-8')
+    return {path: path.read_bytes() for path in views.iterdir()}
+
+
+def test_dry_run_patch(tmp_path, monkeypatch, capsys):
+    source = tmp_path / 'addons'
+    originals = write_module(source)
+    patch = tmp_path / 'odoo18.patch'
+
+    def mkstemp(*args, **kwargs):
+        raise AssertionError("test mode must not create temporary files")
+
+    monkeypatch.setattr(tempfile, 'mkstemp', mkstemp)
+    converter = Odoo18Converter(str(source), backup=False, quiet=True, dry_run=True, patch_file=str(patch),
+                                stream_threshold=4096)
+    converter.convert_all()
+
+    assert converter.stats['files_changed'] == 2
+    assert {path: path.read_bytes() for path in originals} == originals
+    text = patch.read_text(encoding='utf-8')
+    assert "WARNING: 1 file(s) converted in streaming mode are missing from this patch" in text
+    assert "views/large.xml | 200 change(s)" in text
+    assert "+++ b/module/views/small.xml" in text
+    assert "b/module/views/large.xml" not in text
+    assert "Test mode enabled" not in capsys.readouterr().out
+
+
+def test_patch_without_streamed_files(tmp_path):
+    source = tmp_path / 'addons'
+    write_module(source)
+    patch = tmp_path / 'odoo18.patch'
+    Odoo18Converter(str(source), backup=False, quiet=True, dry_run=True, patch_file=str(patch)).convert_all()
+    text = patch.read_text(encoding='utf-8')
+    assert "streaming mode" not in text
+    assert "+++ b/module/views/large.xml" in text
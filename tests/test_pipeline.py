@@ -0,0 +1,88 @@
+import json
+import os
+import threading
+
+import pytest
+
+from odoo18_converter import ConversionPipeline, Odoo18Converter
+
+VIEW = '<odoo><record id="v" model="ir.ui.view"><field name="arch" type="xml"><tree/></field></record></odoo>\n'
+
+
+@pytest.fixture
+def files(tmp_path):
+    paths = []
+    for i in range(64):
+        path = tmp_path / f"view_{i:02d}.xml"
+        path.write_text(VIEW, encoding='utf-8')
+        paths.append((str(path), '.xml'))
+    return paths
+
+
+def run_pipeline(converter, files):
+    """Run a pipeline in a thread, return the exception it raised (None if it hangs)"""
+    outcome = []
+
+    def target():
+        try:
+            ConversionPipeline(converter, readers=2, queue_size=2).run(files)
+            outcome.append(None)
+        except Exception as e:
+            outcome.append(e)
+
+    thread = threading.Thread(target=target, daemon=True)
+    thread.start()
+    thread.join(10)
+    assert outcome, "the pipeline is blocked"
+    return outcome[0]
+
+
+def test_converts_all_files(converter, files):
+    stats = ConversionPipeline(converter, readers=2, queue_size=2).run(files)
+    assert stats['files_changed'] == len(files)
+    assert stats['changes']['tree_to_list'] == len(files)
+
+
+@pytest.mark.parametrize('stage', ['_read_stage', '_transform_stage', '_write_stage', '_record_result'])
+def test_stage_error_is_raised(converter, files, monkeypatch, stage):
+    calls = []
+    original = getattr(converter, stage)
+
+    def failing(*args):
+        calls.append(args)
+        if len(calls) == 3:
+            raise RuntimeError(f"{stage} failed")
+        return original(*args)
+
+    monkeypatch.setattr(converter, stage, failing)
+    error = run_pipeline(converter, files)
+    assert isinstance(error, RuntimeError) and str(error) == f"{stage} failed"
+
+
+def test_dead_worker_is_reported(tmp_path, files, monkeypatch):
+    crashing = files[10][0]
+    original = Odoo18Converter._read_stage
+
+    def read_stage(self, file_path, file_ext):
+        if file_path == crashing:
+            # A worker killed by the kernel, or by a crash in lxml
+            os._exit(1)
+        return original(self, file_path, file_ext)
+
+    monkeypatch.setattr(Odoo18Converter, '_read_stage', read_stage)
+    results = tmp_path / 'results.ndjson'
+    converter = Odoo18Converter(str(tmp_path), backup=False, quiet=True, results_file=str(results))
+    # Whatever the number of CPUs of the machine running the tests
+    converter.workers = 4
+    converter.convert_all()
+
+    assert converter.stats['files_error'] == 1
+    # Files of the chunks lost with the pool may have been written before it broke
+    for path, _ in files:
+        with open(path, encoding='utf-8') as f:
+            assert (f.read() == VIEW) == (path == crashing)
+    with open(results, encoding='utf-8') as f:
+        records = [json.loads(line) for line in f]
+    errors = [record for record in records if record.get('status') == 'error']
+    assert [record['path'] for record in errors] == [crashing]
+    assert len([record for record in records if record.get('type') == 'file']) == len(files)
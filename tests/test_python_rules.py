@@ -0,0 +1,123 @@
+import pytest
+
+HEADER = """from odoo import api, fields, models
+
+
+class Partner(models.Model):
+    _inherit = 'res.partner'
+
+"""
+
+
+def convert(converter, body):
+    result = converter.convert_text(HEADER + body, 'python')
+    assert result.error is None
+    assert result.content.startswith(HEADER)
+    return result.content[len(HEADER):], result.changes
+
+
+def test_name_get_rewritten(converter):
+    content, changes = convert(converter, """    def name_get(self):
+        return [(partner.id, '%s (%s)' % (partner.name, partner.ref)) for partner in self]
+""")
+    assert content == """    @api.depends('name', 'ref')
+    def _compute_display_name(self):
+        for partner in self:
+            partner.display_name = '%s (%s)' % (partner.name, partner.ref)
+"""
+    assert changes == {'python_name_get': 1}
+
+
+def test_name_get_flagged(converter):
+    body = """    def name_get(self):
+        result = []
+        for record in self:
+            result.append((record.id, record.name))
+        return result
+"""
+    content, changes = convert(converter, body)
+    assert content == ("    # TODO Odoo 18: name_get() is no longer called, "
+                       "compute display_name in _compute_display_name() instead\n" + body)
+    assert changes == {'python_name_get': 1}
+
+
+def test_fields_view_get_rewritten(converter):
+    content, changes = convert(converter, """    @api.model
+    def fields_view_get(self, view_id=None, view_type='form', toolbar=False, submenu=False):
+        res = super().fields_view_get(view_id=view_id, view_type=view_type, toolbar=toolbar, submenu=submenu)
+        res['arch'] = res['arch'].replace('Name', 'Label')
+        return res
+""")
+    assert content == """    @api.model
+    def get_view(self, view_id=None, view_type='form', **options):
+        res = super().get_view(view_id=view_id, view_type=view_type, **options)
+        res['arch'] = res['arch'].replace('Name', 'Label')
+        return res
+"""
+    assert changes == {'python_fields_view_get': 1}
+
+
+@pytest.mark.parametrize('statement', [
+    "res['fields']['name']['string'] = 'Label'",
+    "res.get('toolbar', {}).pop('print', None)",
+    "if toolbar:\n            res = dict(res)",
+])
+def test_fields_view_get_flagged(converter, statement):
+    body = f"""    @api.model
+    def fields_view_get(self, view_id=None, view_type='form', toolbar=False, submenu=False):
+        res = super().fields_view_get(view_id, view_type, toolbar, submenu)
+        {statement}
+        return res
+"""
+    content, changes = convert(converter, body)
+    assert content.startswith("    # TODO Odoo 18: fields_view_get() was replaced by get_view(")
+    assert content.split('\n', 1)[1] == body
+    assert changes == {'python_fields_view_get': 1}
+
+
+def test_name_search_rewritten(converter):
+    content, changes = convert(converter, """    @api.model
+    def _name_search(self, name, args=None, operator='ilike', limit=100, name_get_uid=None):
+        args = list(args or [])
+        return super()._name_search(name, args=args, operator=operator, limit=limit, name_get_uid=name_get_uid)
+""")
+    assert content == """    @api.model
+    def _name_search(self, name, domain=None, operator='ilike', limit=100, order=None):
+        domain = list(domain or [])
+        return super()._name_search(name, domain=domain, operator=operator, limit=limit, order=order)
+"""
+    assert changes == {'python_name_search': 1}
+
+
+def test_name_search_flagged(converter):
+    body = """    @api.model
+    def _name_search(self, name, args=None, operator='ilike', limit=100, name_get_uid=None):
+        domain = args or []
+        return super()._name_search(name, args=domain, operator=operator, limit=limit, name_get_uid=name_get_uid)
+"""
+    content, changes = convert(converter, body)
+    assert content == "    # TODO Odoo 18: _name_search() takes a domain parameter instead of args\n" + body
+    assert changes == {'python_name_search': 1}
+
+
+def test_flagged_once(converter):
+    body = """    def name_get(self):
+        return super().name_get()
+"""
+    once, _ = convert(converter, body)
+    twice, changes = convert(converter, once)
+    assert twice == once
+    assert not changes
+
+
+def test_states_removed(converter):
+    content, changes = convert(converter, """    name = fields.Char(states={'draft': [('readonly', False)]}, readonly=True)
+""")
+    assert content == "    name = fields.Char(readonly=True)\n"
+    assert changes == {'python_states_removed': 1}
+
+
+def test_unparsable_module_unchanged(converter):
+    content = HEADER + "    def name_get(self:\n        pass\n"
+    result = converter.convert_text(content, 'python')
+    assert result.content == content and not result.changed
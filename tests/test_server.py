@@ -0,0 +1,80 @@
+import io
+import json
+import os
+import socketserver
+import threading
+
+from odoo18_converter import ConversionClient, ConversionServer
+
+VIEW = '<odoo><form><field name="a" attrs="{\'invisible\': [(\'b\', \'=\', %d)]}"/></form></odoo>\n'
+
+
+def serve(server, requests):
+    output = io.BytesIO()
+    server.serve_stream(io.BytesIO(b''.join(json.dumps(request).encode() + b'\n' for request in requests)), output)
+    return [json.loads(line) for line in output.getvalue().splitlines()]
+
+
+def test_stream_requests(converter):
+    responses = serve(ConversionServer(converter), [
+        {'id': 1, 'method': 'ping'},
+        {'id': 2, 'content': VIEW % 1},
+        {'id': 3, 'method': 'convert_many', 'items': [{'content': VIEW % 2}, {'content': '<odoo/>'}]},
+        {'id': 4, 'method': 'unknown'},
+    ])
+    assert [response['id'] for response in responses] == [1, 2, 3, 4]
+    assert responses[1]['content'] == '<odoo><form><field name="a" invisible="b == 1"/></form></odoo>\n'
+    assert responses[1]['changes'] == {'attrs_conversion': 1}
+    assert [item['changed'] for item in responses[2]['results']] == [True, False]
+    assert 'error' in responses[3]
+
+
+def test_concurrent_clients_share_the_converter(converter):
+    server = ConversionServer(converter)
+    results = {}
+
+    def client(index):
+        results[index] = [server.convert({'content': VIEW % (index * 100 + i)})['content'] for i in range(50)]
+
+    threads = [threading.Thread(target=client, args=(index,)) for index in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    for index, contents in results.items():
+        assert contents == [f'<odoo><form><field name="a" invisible="b == {index * 100 + i}"/></form></odoo>\n'
+                            for i in range(50)]
+
+
+def test_pool_converts_single_requests(converter, monkeypatch):
+    converter.workers = 2
+    with converter._worker_pool() as executor:
+        server = ConversionServer(converter, executor)
+        # The converter of the server process is not used when there is a pool
+        monkeypatch.setattr(server, '_convert', lambda request: {'error': 'converted in the server process'})
+        response = server.convert({'content': VIEW % 1})
+        assert response['content'] == '<odoo><form><field name="a" invisible="b == 1"/></form></odoo>\n'
+        results = server.convert_many([{'content': VIEW % 2}])
+        assert results[0]['changes'] == {'attrs_conversion': 1}
+
+
+def test_socket_server(converter, tmp_path):
+    path = str(tmp_path / 'server.sock')
+    server = ConversionServer(converter)
+    thread = threading.Thread(target=server.serve_socket, args=(path,), daemon=True)
+    thread.start()
+    for _ in range(100):
+        if os.path.exists(path):
+            break
+        thread.join(0.05)
+    client = ConversionClient(path, timeout=10)
+    try:
+        assert client.request({'content': VIEW % 3})['changed'] is True
+        assert client.request({'method': 'shutdown'})['shutdown'] is True
+    finally:
+        client.close()
+    thread.join(10)
+    assert not thread.is_alive()
+    assert not os.path.exists(path)
+    # The class of the standard library is left as it is
+    assert socketserver.ThreadingUnixStreamServer.daemon_threads is False
@@ -0,0 +1,83 @@
+from lxml import etree
+
+
+def settings_view(block):
+    return f"""<odoo>
+    <record id="view_settings" model="ir.ui.view">
+        <field name="model">res.config.settings</field>
+        <field name="arch" type="xml">
+            <xpath expr="//form" position="inside">
+                <div class="app_settings_block" string="Sales" data-key="sale">
+                    {block}
+                </div>
+            </xpath>
+        </field>
+    </record>
+</odoo>"""
+
+
+def arch(content):
+    return etree.fromstring(content.encode('utf-8')).find('.//xpath')
+
+
+def test_example_keeps_every_field(converter, example_xml):
+    result = converter.convert_text(example_xml)
+    app = etree.fromstring(result.content.encode('utf-8')).find(".//app")
+    assert app is not None and app.get('string') == 'Application Settings'
+    setting = app.find('block/setting')
+    assert app.find('block').get('title') == 'Example Settings'
+    assert setting.get('string') == 'Example Setting'
+    assert setting.get('help') == 'Description for the example setting.'
+    assert [field.get('name') for field in setting.iter('field')] == ['example_setting']
+    assert result.changes['settings_structure'] == 1
+
+
+def test_labels_paired_by_for_attribute(converter):
+    content = settings_view("""
+                    <h2>Pricing</h2>
+                    <div class="row mt16 o_settings_container">
+                        <div class="o_setting_box">
+                            <label for="group_discount" string="Discounts"/>
+                            <label for="group_pricelist" string="Pricelists"/>
+                            <field name="group_pricelist"/>
+                            <field name="group_discount"/>
+                        </div>
+                    </div>""")
+    settings = arch(converter.convert_text(content).content).findall('.//setting')
+    assert [(setting.get('string'), setting.find('field').get('name')) for setting in settings] == [
+        ('Pricelists', 'group_pricelist'), ('Discounts', 'group_discount')]
+
+
+def test_field_without_label_is_kept(converter):
+    content = settings_view("""
+                    <h2>Pricing</h2>
+                    <div class="row mt16 o_settings_container">
+                        <field name="group_discount"/>
+                    </div>""")
+    setting = arch(converter.convert_text(content).content).find('.//block/setting')
+    assert setting.find('field').get('name') == 'group_discount'
+    assert setting.get('string') is None
+
+
+def test_unmappable_block_left_unconverted(converter):
+    for block in (
+            # Content that has no place in a <setting>
+            """<div class="row mt16 o_settings_container">
+                        <field name="group_discount"/>
+                        <button name="action_open" type="object" string="Open"/>
+                    </div>""",
+            # Label that cannot be told apart between two fields
+            """<div class="row mt16 o_settings_container">
+                        <label string="Discounts"/>
+                        <field name="group_discount"/>
+                        <field name="group_pricelist"/>
+                    </div>""",
+            # Label without any field
+            """<div class="row mt16 o_settings_container">
+                        <label for="group_discount" string="Discounts"/>
+                    </div>"""):
+        content = settings_view(block)
+        result = converter.convert_text(content)
+        assert 'settings_structure' not in result.changes
+        assert arch(result.content).find('.//app') is None
+        assert etree.tostring(arch(result.content)) == etree.tostring(arch(content))
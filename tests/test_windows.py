@@ -0,0 +1,75 @@
+import pytest
+
+import odoo18_converter
+from odoo18_converter import Odoo18Converter, ProgressReporter
+
+FILLER = ('<record id="filler_{0}" model="ir.ui.view"><field name="arch" type="xml">'
+          '<tree><field name="name" attrs="{{\'invisible\': [(\'state\', \'=\', \'done\')]}}"/></tree>'
+          '</field></record>\n')
+STANDARD = ('<record id="standard" model="ir.ui.view"><field name="arch" type="xml"><form><sheet/>'
+            '<div class="oe_chatter">'
+            '<field name="message_follower_ids" widget="mail_followers"/>'
+            '<field name="activity_ids" widget="mail_activity"/>'
+            '<field name="message_ids" widget="mail_thread"/>'
+            '</div></form></field></record>\n')
+CUSTOM = ('<record id="custom" model="ir.ui.view"><field name="arch" type="xml"><form><sheet/>'
+          '<div class="oe_chatter"><field name="message_ids"/></div>'
+          '</form></field></record>\n')
+
+
+def document(*chatters):
+    """A data file with filler views around the chatter records, each chatter in a window of its own"""
+    parts = ['<?xml version="1.0" encoding="utf-8"?>\n<odoo>\n']
+    index = 0
+    for chatter in chatters:
+        for _ in range(40):
+            parts.append(FILLER.format(index))
+            index += 1
+        parts.append(chatter)
+    parts.extend(FILLER.format(index + i) for i in range(40))
+    parts.append('</odoo>\n')
+    return ''.join(parts)
+
+
+def convert(tmp_path, name, content, **options):
+    source = tmp_path / name
+    source.mkdir()
+    path = source / 'data.xml'
+    path.write_text(content, encoding='utf-8')
+    converter = Odoo18Converter(str(source), backup=False, quiet=True, **options)
+    converter.convert_all()
+    return path.read_text(encoding='utf-8'), converter.stats['changes']
+
+
+@pytest.mark.parametrize('chatters', [
+    (CUSTOM, STANDARD), (STANDARD, CUSTOM), (CUSTOM,), (CUSTOM, CUSTOM), (STANDARD,),
+], ids=['custom-standard', 'standard-custom', 'custom', 'custom-custom', 'standard'])
+def test_streamed_file_is_converted_as_a_whole(tmp_path, monkeypatch, chatters):
+    content = document(*chatters)
+    whole, whole_changes = convert(tmp_path, 'whole', content, stream_threshold=0)
+    monkeypatch.setattr(odoo18_converter, 'STREAM_WINDOW_SIZE', 4096)
+    streamed, streamed_changes = convert(tmp_path, 'streamed', content, stream_threshold=1)
+    assert streamed == whole
+    assert streamed_changes == whole_changes
+    assert whole != content
+
+
+@pytest.mark.parametrize('chatters', [
+    (CUSTOM, STANDARD), (STANDARD, CUSTOM), (CUSTOM,), (CUSTOM, CUSTOM),
+], ids=['custom-standard', 'standard-custom', 'custom', 'custom-custom'])
+def test_split_file_is_converted_as_a_whole(tmp_path, monkeypatch, chatters):
+    content = document(*chatters)
+    sequential, sequential_changes = convert(tmp_path, 'sequential', content)
+    monkeypatch.setattr(odoo18_converter, 'MIN_SPLIT_WINDOW_SIZE', 4096)
+    for workers in (1, 2, 4):
+        source = tmp_path / f"workers_{workers}"
+        source.mkdir()
+        path = source / 'data.xml'
+        path.write_text(content, encoding='utf-8')
+        converter = Odoo18Converter(str(source), backup=False, quiet=True, split_threshold=1)
+        # Whatever the number of CPUs of the machine running the tests
+        converter.workers = workers
+        converter._start_run()
+        converter._process_parallel([], ProgressReporter(1, enabled=False), [(str(path), '.xml')])
+        assert path.read_text(encoding='utf-8') == sequential
+        assert converter.stats['changes'] == sequential_changes